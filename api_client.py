@@ -1,14 +1,31 @@
 # api_client.py
 
+import math
+import os
+import threading
+import time
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+
 import requests
+from requests.adapters import HTTPAdapter
 from urllib.parse import urlencode
 
-API_URL = "https://hiring.base.vn/publicapi/v2/candidate/list"
-OPENING_LIST_URL = "https://hiring.base.vn/publicapi/v2/opening/list"
-OPENING_GET_URL = "https://hiring.base.vn/publicapi/v2/opening/get"
-CANDIDATE_LIST_URL = "https://hiring.base.vn/publicapi/v2/candidate/list"
-CANDIDATE_GET_URL = "https://hiring.base.vn/publicapi/v2/candidate/get"
-CANDIDATE_MESSAGES_URL = "https://hiring.base.vn/publicapi/v2/candidate/messages"
+from response_cache import CachedResponse, endpoint_of, response_cache
+from singleflight import SingleFlight
+from circuit_breaker import circuit_breakers
+import metrics
+from tracing import traced
+import rate_limit
+
+# Gốc của public API; đổi BASE_API_URL để trỏ tới server giả lập (benchmarks/mock_base_server.py)
+BASE_API_URL = os.getenv("BASE_API_URL", "https://hiring.base.vn/publicapi/v2").rstrip("/")
+
+API_URL = f"{BASE_API_URL}/candidate/list"
+OPENING_LIST_URL = f"{BASE_API_URL}/opening/list"
+OPENING_GET_URL = f"{BASE_API_URL}/opening/get"
+CANDIDATE_LIST_URL = f"{BASE_API_URL}/candidate/list"
+CANDIDATE_GET_URL = f"{BASE_API_URL}/candidate/get"
+CANDIDATE_MESSAGES_URL = f"{BASE_API_URL}/candidate/messages"
 
 # Headers cố định cho yêu cầu POST
 FIXED_HEADERS = {
@@ -19,6 +36,198 @@ FIXED_HEADERS = {
     "Connection": "keep-alive"
 }
 
+
+class UpstreamError(Exception):
+    """Base.vn trả về mã trạng thái khác 200 (giữ lại status_code và nội dung phản hồi)."""
+
+    def __init__(self, status_code, text):
+        super().__init__(f"Base.vn API trả về mã trạng thái {status_code}")
+        self.status_code = status_code
+        self.text = text
+
+
+def env_int(name, default):
+    """Số nguyên từ biến môi trường `name`; giá trị thiếu hoặc sai dùng `default`."""
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def env_float(name, default):
+    """Số thực từ biến môi trường `name`; giá trị thiếu hoặc sai dùng `default`."""
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+# Số yêu cầu song song tối đa khi tải nhiều trang/nhiều ứng viên
+DEFAULT_MAX_CONCURRENCY = env_int("BASE_API_MAX_CONCURRENCY", 8)
+
+
+class BaseClient:
+    """
+    Client dùng chung cho Base.vn: giữ một requests.Session với connection pool
+    keep-alive để các lời gọi liên tiếp tái sử dụng kết nối TCP/TLS đã mở.
+
+    - pool_connections: số host pool được giữ lại
+    - pool_maxsize: số kết nối tối đa giữ trong pool cho mỗi host
+    - pool_block: True thì chờ khi pool của host đã đầy thay vì mở kết nối tạm
+    - connect_timeout / read_timeout: timeout (giây) cho mỗi yêu cầu
+    """
+
+    def __init__(self, pool_connections=None, pool_maxsize=None, pool_block=None,
+                 connect_timeout=None, read_timeout=None):
+        if pool_connections is None:
+            pool_connections = env_int("BASE_API_POOL_CONNECTIONS", 4)
+        if pool_maxsize is None:
+            pool_maxsize = env_int("BASE_API_POOL_MAXSIZE", 20)
+        if pool_block is None:
+            pool_block = os.getenv("BASE_API_POOL_BLOCK", "false").lower() in ("1", "true", "yes")
+        if connect_timeout is None:
+            connect_timeout = env_float("BASE_API_CONNECT_TIMEOUT", 5.0)
+        if read_timeout is None:
+            read_timeout = env_float("BASE_API_READ_TIMEOUT", 30.0)
+
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+        self.timeout = (connect_timeout, read_timeout)
+
+        self.session = requests.Session()
+        self.session.headers.update(FIXED_HEADERS)
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def post(self, url, payload_params):
+        """Gửi POST form-encoded qua session dùng chung, trả về Response của requests."""
+        return self.session.post(
+            url,
+            data=urlencode(payload_params),
+            timeout=self.timeout
+        )
+
+    def close(self):
+        self.session.close()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """Trả về BaseClient dùng chung, khởi tạo lần đầu từ biến môi trường."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = BaseClient()
+    return _client
+
+
+def configure_client(**kwargs):
+    """
+    Thay client dùng chung bằng một client mới với cấu hình tùy chỉnh
+    (xem tham số của BaseClient). Client cũ sẽ được đóng.
+    """
+    global _client
+    new_client = BaseClient(**kwargs)
+    with _client_lock:
+        old_client, _client = _client, new_client
+    if old_client is not None:
+        old_client.close()
+    return new_client
+
+
+def close_client():
+    """Đóng client dùng chung (ví dụ khi server shutdown)."""
+    global _client
+    with _client_lock:
+        old_client, _client = _client, None
+    if old_client is not None:
+        old_client.close()
+
+
+# Gộp các yêu cầu giống hệt nhau đang chạy đồng thời thành một lời gọi lên Base.vn
+inflight = SingleFlight()
+
+
+@traced("upstream")
+def _post(url, payload_params, error_label):
+    endpoint = endpoint_of(url)
+    cache_key = response_cache.key_for(endpoint, payload_params)
+    ttl = response_cache.ttl_for(endpoint)
+    stale = None
+    if ttl > 0:
+        cached, fresh = response_cache.get_stale(cache_key)
+        if fresh:
+            return cached
+        stale = cached
+    breaker = circuit_breakers.get(endpoint)
+
+    def send():
+        attempt = 0
+        while True:
+            rate_limit.rate_limiter.acquire()
+            started = time.perf_counter()
+            try:
+                response = get_client().post(url, payload_params)
+            except requests.exceptions.RequestException as e:
+                metrics.observe_upstream(endpoint, "error", time.perf_counter() - started)
+                delay = rate_limit.retry_policy.next_delay(attempt)
+                if delay is None:
+                    # Xử lý các lỗi kết nối/yêu cầu cơ bản
+                    raise ConnectionError(f"{error_label}: {e}")
+            else:
+                metrics.observe_upstream(endpoint, response.status_code, time.perf_counter() - started)
+                retry_after = rate_limit.parse_retry_after(response.headers.get("Retry-After"))
+                rate_limit.rate_limiter.on_response(response.status_code, retry_after)
+                delay = rate_limit.retry_policy.next_delay(attempt, response.status_code, retry_after)
+                if delay is None:
+                    return response
+            time.sleep(delay)
+            attempt += 1
+
+    def call_upstream():
+        # Breaker ghi nhận một kết quả cho cả lời gọi, sau khi đã hết lượt thử lại
+        breaker.before_call()
+        try:
+            response = send()
+        except ConnectionError:
+            breaker.record_failure()
+            raise
+        except BaseException:
+            breaker.release()
+            raise
+        breaker.record_status(response.status_code)
+
+        if ttl > 0 and response.status_code == 200:
+            response_cache.set(cache_key, CachedResponse.from_response(response), ttl, response_cache.stale_ttl)
+        return response
+
+    if stale is not None:
+        # Stale-while-revalidate: trả ngay bản cũ, làm mới ở nền (một lần cho mỗi khóa)
+        if not inflight.pending(cache_key):
+            threading.Thread(target=_refresh, args=(cache_key, call_upstream), daemon=True).start()
+        return stale.as_stale()
+
+    return inflight.do(cache_key, call_upstream)
+
+
+def _refresh(cache_key, call_upstream):
+    try:
+        inflight.do(cache_key, call_upstream)
+    except Exception:
+        # Lỗi đã được circuit breaker ghi nhận; lần gọi sau vẫn dùng bản stale
+        pass
+
+
 def fetch_candidates(access_token, opening_id, page, num_per_page, stage):
     """
     Thực hiện cuộc gọi API POST đến Base.vn để lấy danh sách ứng viên.
@@ -32,21 +241,8 @@ def fetch_candidates(access_token, opening_id, page, num_per_page, stage):
         "num_per_page": num_per_page,
         "stage": stage
     }
-    
-    # Mã hóa payload
-    payload = urlencode(payload_params)
 
-    try:
-        response = requests.request(
-            "POST", 
-            API_URL, 
-            data=payload, 
-            headers=FIXED_HEADERS
-        )
-        return response
-    except requests.exceptions.RequestException as e:
-        # Xử lý các lỗi kết nối/yêu cầu cơ bản
-        raise ConnectionError(f"Lỗi kết nối API: {e}")
+    return _post(API_URL, payload_params, "Lỗi kết nối API")
 
 
 def fetch_openings_list(access_token, page=1, num_per_page=50, order_by="starred"):
@@ -61,18 +257,7 @@ def fetch_openings_list(access_token, page=1, num_per_page=50, order_by="starred
         "order_by": order_by
     }
 
-    payload = urlencode(payload_params)
-
-    try:
-        response = requests.request(
-            "POST",
-            OPENING_LIST_URL,
-            data=payload,
-            headers=FIXED_HEADERS
-        )
-        return response
-    except requests.exceptions.RequestException as e:
-        raise ConnectionError(f"Lỗi kết nối API (opening/list): {e}")
+    return _post(OPENING_LIST_URL, payload_params, "Lỗi kết nối API (opening/list)")
 
 
 def fetch_opening(access_token, opening_id):
@@ -83,18 +268,8 @@ def fetch_opening(access_token, opening_id):
         "access_token": access_token,
         "id": opening_id
     }
-    payload = urlencode(payload_params)
 
-    try:
-        response = requests.request(
-            "POST",
-            OPENING_GET_URL,
-            data=payload,
-            headers=FIXED_HEADERS
-        )
-        return response
-    except requests.exceptions.RequestException as e:
-        raise ConnectionError(f"Lỗi kết nối API (opening/get): {e}")
+    return _post(OPENING_GET_URL, payload_params, "Lỗi kết nối API (opening/get)")
 
 
 def fetch_candidate_detail(access_token, candidate_id):
@@ -103,18 +278,8 @@ def fetch_candidate_detail(access_token, candidate_id):
         "access_token": access_token,
         "id": candidate_id
     }
-    payload = urlencode(payload_params)
 
-    try:
-        response = requests.request(
-            "POST",
-            CANDIDATE_GET_URL,
-            data=payload,
-            headers=FIXED_HEADERS
-        )
-        return response
-    except requests.exceptions.RequestException as e:
-        raise ConnectionError(f"Lỗi kết nối API (candidate/get): {e}")
+    return _post(CANDIDATE_GET_URL, payload_params, "Lỗi kết nối API (candidate/get)")
 
 
 def fetch_candidate_messages(access_token, candidate_id):
@@ -123,15 +288,90 @@ def fetch_candidate_messages(access_token, candidate_id):
         "access_token": access_token,
         "id": candidate_id
     }
-    payload = urlencode(payload_params)
 
+    return _post(CANDIDATE_MESSAGES_URL, payload_params, "Lỗi kết nối API (candidate/messages)")
+
+
+def page_count(json_data, num_per_page, items_key=None):
+    """
+    Số trang theo `total` của trang 1. Nếu có items_key và trang 1 chứa ít mục hơn
+    num_per_page dù còn trang sau (Base.vn giới hạn kích thước trang phía server),
+    số trang được tính theo số mục thực nhận để không bỏ sót các trang cuối.
+    """
     try:
-        response = requests.request(
-            "POST",
-            CANDIDATE_MESSAGES_URL,
-            data=payload,
-            headers=FIXED_HEADERS
-        )
-        return response
-    except requests.exceptions.RequestException as e:
-        raise ConnectionError(f"Lỗi kết nối API (candidate/messages): {e}")
\ No newline at end of file
+        total = int(json_data.get("total") or 0)
+    except (TypeError, ValueError):
+        return 1
+    if items_key is not None:
+        received = len(json_data.get(items_key) or [])
+        if 0 < received < min(num_per_page, total):
+            num_per_page = received
+    return max(1, math.ceil(total / num_per_page))
+
+
+def response_json(response):
+    """Trả về JSON của phản hồi; ném UpstreamError nếu mã trạng thái khác 200."""
+    if response.status_code != 200:
+        raise UpstreamError(response.status_code, response.text)
+    return response.json()
+
+
+def fetch_all_pages(fetch_page, items_key, num_per_page, max_concurrency=None):
+    """
+    Lấy mọi trang của một endpoint phân trang: tải trang 1 để biết `total`,
+    rồi tải các trang còn lại song song bằng thread (tối đa `max_concurrency`)
+    và gộp `items_key` của mọi trang vào một kết quả.
+
+    fetch_page(page) phải trả về Response của trang tương ứng.
+    """
+    if max_concurrency is None:
+        max_concurrency = DEFAULT_MAX_CONCURRENCY
+
+    first_page = response_json(fetch_page(1))
+    num_pages = page_count(first_page, num_per_page, items_key)
+
+    items = list(first_page.get(items_key) or [])
+    if num_pages > 1:
+        executor = ThreadPoolExecutor(max_workers=max_concurrency)
+        try:
+            futures = [
+                executor.submit(lambda page: response_json(fetch_page(page)), page)
+                for page in range(2, num_pages + 1)
+            ]
+            done, not_done = wait(futures, return_when=FIRST_EXCEPTION)
+            if not_done:
+                # Có trang lỗi: ném lỗi ngay thay vì chờ các trang còn lại
+                for future in done:
+                    future.result()
+            for future in futures:
+                items.extend(future.result().get(items_key) or [])
+        finally:
+            # Hủy các trang chưa bắt đầu và không chờ các trang đang tải (cùng lượt thử lại/backoff của chúng)
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    merged = dict(first_page)
+    merged[items_key] = items
+    merged["count"] = len(items)
+    merged["page"] = 1
+    merged["num_pages"] = num_pages
+    return merged
+
+
+def fetch_all_candidates(access_token, opening_id, stage, num_per_page=100, max_concurrency=None):
+    """Lấy toàn bộ ứng viên của một opening/stage (các trang được tải song song)."""
+    return fetch_all_pages(
+        lambda page: fetch_candidates(access_token, opening_id, page, num_per_page, stage),
+        "candidates",
+        num_per_page,
+        max_concurrency,
+    )
+
+
+def fetch_all_openings(access_token, num_per_page=100, order_by="starred", max_concurrency=None):
+    """Lấy toàn bộ opening (các trang được tải song song)."""
+    return fetch_all_pages(
+        lambda page: fetch_openings_list(access_token, page=page, num_per_page=num_per_page, order_by=order_by),
+        "openings",
+        num_per_page,
+        max_concurrency,
+    )
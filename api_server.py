@@ -4,24 +4,39 @@ FastAPI Server - Web API hoàn chỉnh cho việc truy vấn Base.vn Candidate A
 """
 
 from fastapi import FastAPI, HTTPException, Query
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from pydantic import BaseModel, Field
 from typing import Optional, Dict, Any, List
 import os
 from dotenv import load_dotenv
-from api_client import fetch_candidates
-from data_processor import process_candidate_data
+from contextlib import asynccontextmanager
+from async_api_client import fetch_candidates, close_client
+from data_processor import process_candidate_records
+from json_backend import FastJSONResponse, decode_response
+import metrics
+from tracing import ServerTimingMiddleware
 import json
 
 # Load environment variables
 load_dotenv()
 
+@asynccontextmanager
+async def lifespan(app):
+    yield
+    # Đóng connection pool tới Base.vn khi server shutdown
+    await close_client()
+
+
 # Khởi tạo FastAPI app
 app = FastAPI(
     title="Base.vn Candidate API Wrapper",
     description="API hoàn chỉnh để truy vấn danh sách ứng viên từ Base.vn",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse
 )
+app.add_middleware(metrics.MetricsMiddleware)
+app.add_middleware(ServerTimingMiddleware)
 
 
 # Pydantic Models cho request/response validation
@@ -59,7 +74,8 @@ async def root():
         "message": "Base.vn Candidate API Wrapper",
         "version": "1.0.0",
         "docs": "/docs",
-        "health": "/health"
+        "health": "/health",
+        "metrics": "/metrics"
     }
 
 
@@ -74,6 +90,14 @@ async def health_check():
     )
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics_endpoint():
+    """
+    Metrics dạng Prometheus: request theo route, độ trễ Base.vn, thời gian xử lý, cache/pool
+    """
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+
 @app.post("/api/v1/candidates", response_model=CandidateResponse)
 async def get_candidates(request: CandidateQueryRequest):
     """
@@ -87,7 +111,7 @@ async def get_candidates(request: CandidateQueryRequest):
     """
     try:
         # Gọi API Base.vn
-        response = fetch_candidates(
+        response = await fetch_candidates(
             access_token=request.access_token,
             opening_id=request.opening_id,
             page=request.page,
@@ -105,20 +129,17 @@ async def get_candidates(request: CandidateQueryRequest):
             )
         
         # Parse JSON response
-        json_data = response.json()
-        
-        # Xử lý dữ liệu
-        processed_data = process_candidate_data(json_data)
+        json_data = decode_response(response)
         
-        # Chuyển DataFrame thành dict để trả về JSON
-        candidates_list = processed_data["dataframe"].to_dict('records') if not processed_data["dataframe"].empty else []
+        # Xử lý dữ liệu thành danh sách record (không qua DataFrame)
+        processed_data = process_candidate_records(json_data)
         
         return CandidateResponse(
             success=True,
             message="Lấy danh sách ứng viên thành công",
             data={
                 "metrics": processed_data["metrics"],
-                "candidates": candidates_list,
+                "candidates": processed_data["records"],
                 "count": processed_data["count_candidates"]
             },
             status_code=200
@@ -1,9 +1,14 @@
 # app.py
 
 import os
+import html
 import json
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
+import re
+import unicodedata
 
 import requests
 import streamlit as st
@@ -11,17 +16,49 @@ import streamlit.components.v1 as components
 from dotenv import dotenv_values, load_dotenv, set_key
 
 from api_client import (
+    UpstreamError,
     fetch_candidate_detail,
     fetch_candidate_messages,
+    fetch_all_openings,
     fetch_candidates,
-    fetch_openings_list,
     fetch_opening,
+    page_count,
 )
 from data_processor import process_candidate_data
+from response_cache import response_cache, token_hash
+from text_utils import html_to_text
 
 
 ENV_PATH = Path(__file__).resolve().parent / ".env"
 
+
+def _env_seconds(name, default):
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+# TTL (giây) của cache dữ liệu dùng chung giữa mọi phiên Streamlit trên cùng server
+UI_CACHE_TTL_OPENINGS = _env_seconds("UI_CACHE_TTL_OPENINGS", 600)
+UI_CACHE_TTL_CANDIDATES = _env_seconds("UI_CACHE_TTL_CANDIDATES", 60)
+UI_CACHE_TTL_DETAIL = _env_seconds("UI_CACHE_TTL_DETAIL", 300)
+UI_CACHE_TTL_MESSAGES = _env_seconds("UI_CACHE_TTL_MESSAGES", 120)
+UI_CACHE_MAX_ENTRIES = _env_seconds("UI_CACHE_MAX_ENTRIES", 1000)
+# Số opening tối đa hiển thị trong dropdown sau khi lọc theo ô tìm kiếm
+OPENING_SEARCH_LIMIT = _env_seconds("OPENING_SEARCH_LIMIT", 50)
+# Số trang ứng viên giữ trong bộ nhớ của mỗi phiên (LRU)
+CANDIDATE_PAGE_CACHE_SIZE = _env_seconds("CANDIDATE_PAGE_CACHE_SIZE", 10)
+# Số tin nhắn hiển thị thêm mỗi lần bấm "Xem thêm"
+MESSAGES_PAGE_SIZE = max(1, _env_seconds("MESSAGES_PAGE_SIZE", 20))
+# Độ dài đoạn xem trước của nội dung tin nhắn (ký tự)
+MESSAGE_PREVIEW_CHARS = 160
+
+_IMG_WITHOUT_LOADING_RE = re.compile(r"<img\b(?![^>]*\bloading\s*=)", re.IGNORECASE)
+
+# Thread nền dùng chung để tải trước trang ứng viên kế tiếp
+_prefetch_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="candidate-prefetch")
+
 # Define SimpleResp at module level
 class SimpleResp:
     def __init__(self, status_code, json_data, text):
@@ -32,6 +69,271 @@ class SimpleResp:
     def json(self):
         return self._json
 
+
+def _json_or_raise(response):
+    """Trả về JSON của phản hồi 200; mã khác ném UpstreamError để st.cache_data không lưu lỗi."""
+    if response.status_code != 200:
+        raise UpstreamError(response.status_code, response.text)
+    return response.json()
+
+
+# Các hàm cache dưới đây nhận token_key (hash của token) làm một phần khóa cache;
+# bản thân token truyền qua tham số có dấu "_" nên Streamlit không băm/lưu nó.
+# Kết quả dùng chung giữa các phiên, nên nhiều người dùng cùng token và cùng tham số
+# chỉ gọi Base.vn một lần trong mỗi TTL.
+
+@st.cache_data(ttl=UI_CACHE_TTL_OPENINGS, max_entries=UI_CACHE_MAX_ENTRIES, show_spinner=False)
+def cached_openings(token_key, _access_token, num_per_page=100):
+    # Mọi trang opening, tải song song (fetch_all_openings ném UpstreamError nếu một trang lỗi)
+    return fetch_all_openings(_access_token, num_per_page=num_per_page)
+
+
+@st.cache_data(ttl=UI_CACHE_TTL_CANDIDATES, max_entries=UI_CACHE_MAX_ENTRIES, show_spinner=False)
+def cached_candidates_page(token_key, _access_token, opening_id, stage, page, num_per_page):
+    return _json_or_raise(fetch_candidates(_access_token, opening_id, page, num_per_page, stage))
+
+
+@st.cache_data(ttl=UI_CACHE_TTL_DETAIL, max_entries=UI_CACHE_MAX_ENTRIES, show_spinner=False)
+def cached_candidate_detail(token_key, _access_token, candidate_id):
+    return _json_or_raise(fetch_candidate_detail(_access_token, candidate_id))
+
+
+@st.cache_data(ttl=UI_CACHE_TTL_MESSAGES, max_entries=UI_CACHE_MAX_ENTRIES, show_spinner=False)
+def cached_candidate_messages(token_key, _access_token, candidate_id):
+    return _json_or_raise(fetch_candidate_messages(_access_token, candidate_id))
+
+
+CACHED_FETCHERS = (cached_openings, cached_candidates_page, cached_candidate_detail, cached_candidate_messages)
+
+
+def clear_data_caches():
+    """
+    Xóa toàn bộ dữ liệu Base.vn đã cache (cho mọi phiên), gồm cả cache phản hồi
+    của api_client: nếu không, lần tải lại vẫn nhận bản cũ từ đó thay vì gọi Base.vn.
+    """
+    for fetcher in CACHED_FETCHERS:
+        fetcher.clear()
+    response_cache.clear()
+
+
+def cached_response(fetcher, access_token, *args):
+    """
+    Gọi một hàm cache và trả về đối tượng giống Response (status_code, json(), text)
+    để phần hiển thị phía sau giữ nguyên.
+    """
+    try:
+        data = fetcher(token_hash(access_token), access_token, *args)
+    except UpstreamError as e:
+        return SimpleResp(e.status_code, {}, e.text)
+    return SimpleResp(200, data, "")
+
+
+def _normalize_search_text(text):
+    """Chữ thường, bỏ dấu tiếng Việt (kể cả đ) để tìm kiếm không phân biệt dấu."""
+    text = unicodedata.normalize("NFD", str(text).lower().replace("đ", "d"))
+    return "".join(ch for ch in text if not unicodedata.combining(ch))
+
+
+def build_opening_index(opening_options):
+    """[(chuỗi đã chuẩn hóa, key)] cho mỗi opening, tính một lần khi tải danh sách."""
+    return [(_normalize_search_text(key), key) for key in opening_options]
+
+
+def search_openings(opening_index, query, limit=OPENING_SEARCH_LIMIT):
+    """
+    Lọc opening theo mọi từ trong `query` (không phân biệt hoa thường/dấu, khớp ID hoặc tên).
+    Trả về (các key khớp, tối đa `limit`, ưu tiên key bắt đầu bằng từ đầu tiên; tổng số khớp).
+    Truy vấn rỗng trả về mọi opening theo thứ tự gốc: `limit` chỉ áp dụng cho kết quả tìm kiếm.
+    """
+    words = _normalize_search_text(query).split()
+    if not words:
+        return [key for _, key in opening_index], len(opening_index)
+
+    matches = [(text, key) for text, key in opening_index if all(word in text for word in words)]
+    # "ID - Tên": ưu tiên ID khớp chính xác, rồi tên bắt đầu bằng từ đầu tiên
+    matches.sort(key=lambda item: (
+        item[0].split(" - ", 1)[0] != words[0],
+        not item[0].split(" - ", 1)[-1].startswith(words[0]),
+    ))
+    return [key for _, key in matches[:limit]], len(matches)
+
+
+def load_candidate_page(access_token, opening_id, stage, page, num_per_page, use_proxy=False, shared_cache=True):
+    """
+    Tải một trang danh sách ứng viên, trả về đối tượng giống Response.
+
+    - use_proxy: gọi endpoint /candidates của FastAPI proxy local thay vì Base.vn
+    - shared_cache: đi qua st.cache_data; tắt khi gọi từ thread nền (ngoài phiên Streamlit)
+    """
+    if use_proxy:
+        proxy_url = os.getenv("LOCAL_PROXY_URL", "http://127.0.0.1:8000/candidates")
+        proxy_payload = {
+            "access_token": access_token,
+            "opening_id": opening_id,
+            "page": page,
+            "num_per_page": num_per_page,
+            "stage": stage
+        }
+        proxy_resp = requests.post(proxy_url, data=proxy_payload)
+        # proxy returns JSON with processed data and raw
+        if proxy_resp.status_code == 200:
+            proxy_json = proxy_resp.json()
+            # adapt shape used later: set response-like object
+            return SimpleResp(200, proxy_json.get("raw", {}), json.dumps(proxy_json))
+        return SimpleResp(proxy_resp.status_code, {}, proxy_resp.text)
+
+    if shared_cache:
+        return cached_response(
+            cached_candidates_page, access_token, str(opening_id), str(stage), int(page), int(num_per_page)
+        )
+    try:
+        return SimpleResp(200, _json_or_raise(fetch_candidates(access_token, opening_id, page, num_per_page, stage)), "")
+    except UpstreamError as e:
+        return SimpleResp(e.status_code, {}, e.text)
+
+
+class CandidatePageBrowser:
+    """
+    Duyệt danh sách ứng viên theo trang cho một bộ tham số truy vấn (lưu trong session_state).
+
+    - Các trang đã tải (JSON + kết quả process_candidate_data) nằm trong một LRU
+      giới hạn `max_pages` trang
+    - prefetch(page) tải trước một trang bằng thread nền; get(page) dùng lại kết quả
+      đó (hoặc chờ nếu đang tải) thay vì gọi API lần nữa
+    """
+
+    def __init__(self, access_token, opening_id, stage, num_per_page, use_proxy=False,
+                 max_pages=CANDIDATE_PAGE_CACHE_SIZE):
+        self.query = {
+            "access_token": access_token,
+            "opening_id": opening_id,
+            "stage": stage,
+            "num_per_page": int(num_per_page),
+            "use_proxy": use_proxy,
+        }
+        self.max_pages = max(1, max_pages)
+        self.pages = OrderedDict()
+        self.pending = {}
+        self.num_pages = None
+
+    def _store(self, page, response):
+        if response.status_code != 200:
+            return None
+        json_data = response.json()
+        processed = process_candidate_data(json_data)
+        self.pages[page] = (json_data, processed)
+        self.pages.move_to_end(page)
+        while len(self.pages) > self.max_pages:
+            self.pages.popitem(last=False)
+        if page == 1 or self.num_pages is None:
+            # Theo số ứng viên thực nhận ở trang đầu: Base.vn có thể trả ít hơn num_per_page mỗi trang
+            self.num_pages = page_count(json_data, self.query["num_per_page"], "candidates")
+        return processed
+
+    def _collect_prefetched(self):
+        """Chuyển các trang tải trước đã xong vào LRU; lỗi khi tải trước bị bỏ qua (get sẽ tải lại)."""
+        for page, future in list(self.pending.items()):
+            if future.done():
+                del self.pending[page]
+                try:
+                    self._store(page, future.result())
+                except Exception:
+                    pass
+
+    def is_loaded(self, page):
+        return page in self.pages or page in self.pending
+
+    def get(self, page):
+        """(response, processed) của trang `page`; processed là None nếu API lỗi."""
+        self._collect_prefetched()
+        if page in self.pages:
+            self.pages.move_to_end(page)
+            json_data, processed = self.pages[page]
+            return SimpleResp(200, json_data, ""), processed
+
+        future = self.pending.pop(page, None)
+        response = None
+        if future is not None:
+            try:
+                response = future.result()
+            except Exception:
+                response = None
+        if response is None or response.status_code != 200:
+            response = load_candidate_page(page=page, **self.query)
+        return response, self._store(page, response)
+
+    def prefetch(self, page):
+        if page < 1 or (self.num_pages is not None and page > self.num_pages) or self.is_loaded(page):
+            return
+        self.pending[page] = _prefetch_executor.submit(
+            load_candidate_page, page=page, shared_cache=False, **self.query
+        )
+
+
+def display_candidate_browser(browser):
+    """Hiển thị trang hiện tại của CandidatePageBrowser với nút chuyển trang."""
+    page = st.session_state.get("candidate_page", 1)
+
+    nav_prev, nav_info, nav_next = st.columns([1, 2, 1])
+    with nav_prev:
+        if st.button("◀ Trang trước", disabled=page <= 1, key="candidate_prev"):
+            page -= 1
+    with nav_next:
+        if st.button("Trang sau ▶", disabled=browser.num_pages is not None and page >= browser.num_pages,
+                     key="candidate_next"):
+            page += 1
+    st.session_state["candidate_page"] = page
+
+    with st.spinner(f"Đang tải trang {page}..."):
+        response, processed_data = browser.get(page)
+
+    with nav_info:
+        total_pages = browser.num_pages or "?"
+        st.markdown(f"**Trang {page}/{total_pages}** · {len(browser.pages)} trang trong bộ nhớ")
+
+    st.subheader("Kết quả Phản hồi")
+    st.write(f"**Mã Trạng thái (Status Code):** `{response.status_code}`")
+
+    if processed_data is None:
+        st.error(f"Lỗi: API trả về mã trạng thái {response.status_code}.")
+        st.code(response.text, language="text")
+        return
+
+    # Tải trước trang kế tiếp trong lúc người dùng xem trang này
+    browser.prefetch(page + 1)
+
+    # Hiển thị kết quả
+    display_metrics(processed_data["metrics"])
+
+    st.subheader(f"Danh sách Ứng viên (Tìm thấy: {processed_data['count_candidates']})")
+
+    if not processed_data["dataframe"].empty:
+        st.dataframe(processed_data["dataframe"], width="stretch")
+    else:
+        st.warning("Không tìm thấy ứng viên nào.")
+
+    if st.checkbox("Xem toàn bộ JSON phản hồi thô"):
+        st.json(response.json())
+
+
+def display_refresh_control():
+    """Nút làm mới dữ liệu ở sidebar."""
+    with st.sidebar:
+        st.subheader("🗄️ Cache dữ liệu")
+        st.caption(
+            f"Dữ liệu Base.vn được cache dùng chung: openings {UI_CACHE_TTL_OPENINGS}s, "
+            f"ứng viên {UI_CACHE_TTL_CANDIDATES}s, chi tiết {UI_CACHE_TTL_DETAIL}s, "
+            f"tin nhắn {UI_CACHE_TTL_MESSAGES}s."
+        )
+        if st.button("🔄 Làm mới dữ liệu", help="Bỏ cache và tải lại từ Base.vn ở lần truy vấn tiếp theo"):
+            clear_data_caches()
+            st.session_state.pop("openings", None)
+            st.session_state.pop("openings_index", None)
+            st.session_state.pop("candidate_browser", None)
+            st.session_state.pop("messages_result", None)
+            st.success("Đã xóa cache dữ liệu.")
+
+
 def display_metrics(metrics):
     """Hiển thị các chỉ số tổng quan."""
     col_total, col_count, col_page = st.columns(3)
@@ -218,8 +520,13 @@ def display_candidate_detail_view(json_data):
         st.markdown("</div>", unsafe_allow_html=True)
 
 
-def display_candidate_messages_view(json_data):
-    """Render giao diện danh sách tin nhắn ứng viên."""
+def parse_candidate_messages(json_data):
+    """
+    Chuẩn bị sẵn mọi thứ cần để hiển thị tin nhắn (tiêu đề, người gửi, thời gian,
+    HTML nội dung với ảnh tải lười, đoạn xem trước...). Chỉ gọi một lần khi lấy tin
+    nhắn; kết quả nằm trong session_state nên các lần rerun (ví dụ bấm "Xem thêm")
+    không xử lý lại.
+    """
     messages = []
     meta = {}
     if isinstance(json_data, dict):
@@ -230,6 +537,56 @@ def display_candidate_messages_view(json_data):
             messages = data_block.get("messages") or []
             if not meta:
                 meta = {k: v for k, v in data_block.items() if k != "messages"}
+
+    parsed = []
+    for idx, message in enumerate(messages, start=1):
+        user = message.get("user") or {}
+        content_html = message.get("content") or message.get("body") or ""
+        if isinstance(content_html, str):
+            content_html = content_html.replace("\\r\\n", "\n")
+        content_html = content_html or "<p>Không có nội dung.</p>"
+        preview = html_to_text(content_html)
+        if len(preview) > MESSAGE_PREVIEW_CHARS:
+            preview = preview[:MESSAGE_PREVIEW_CHARS].rstrip() + "…"
+
+        parsed.append({
+            "index": idx,
+            "key": f"{message.get('id') or '-'}-{idx}",
+            "subject": _format_text(message.get("subject") or "Không có tiêu đề"),
+            "author_name": _format_text(
+                user.get("name") or user.get("username") or user.get("email") or "Không rõ"
+            ),
+            "author_type": _format_text(user.get("type") or ""),
+            "time_sent": _format_timestamp(message.get("since")),
+            "thread_id": _format_text(message.get("thread_id") or "-"),
+            "message_id": _format_text(message.get("id") or "-"),
+            # Ảnh trong nội dung chỉ tải khi cuộn tới
+            "content_html": _IMG_WITHOUT_LOADING_RE.sub('<img loading="lazy"', str(content_html)),
+            "preview": preview,
+            "attachments": [
+                (
+                    _format_text(attachment.get("name") or attachment.get("filename") or "Tệp"),
+                    attachment.get("url") or attachment.get("download_url"),
+                )
+                for attachment in message.get("attachments") or []
+            ],
+            "tracking_events": [
+                (_format_text(event.get("event") or "unknown"), _format_timestamp(event.get("since")))
+                for event in message.get("tracking_events") or []
+            ],
+        })
+    return {"meta": meta, "messages": parsed}
+
+
+def display_candidate_messages_view(parsed, shown=MESSAGES_PAGE_SIZE):
+    """
+    Render giao diện danh sách tin nhắn ứng viên từ kết quả parse_candidate_messages.
+
+    Chỉ `shown` tin nhắn đầu được render; nội dung mỗi tin nhắn thu gọn thành đoạn
+    xem trước và chỉ tạo iframe HTML khi người dùng mở ra.
+    """
+    messages = parsed["messages"]
+    meta = parsed["meta"]
     if not messages:
         st.info("Không có tin nhắn để hiển thị.")
         return
@@ -238,9 +595,11 @@ def display_candidate_messages_view(json_data):
         """
         <style>
         .message-card {background:#ffffff; border:1px solid #e2e8f0; border-radius:14px; padding:1.2rem; margin-bottom:1rem; box-shadow:0 1px 2px rgba(15,23,42,0.05);}
+        .message-card-header {display:flex; justify-content:space-between; gap:1rem;}
         .message-title {font-size:1.05rem; font-weight:600; color:#0f172a; margin-bottom:0.35rem;}
         .message-meta {font-size:0.9rem; color:#475569; margin-bottom:0.2rem;}
-        .message-meta.align-right {text-align:right;}
+        .message-meta.align-right {text-align:right; white-space:nowrap;}
+        .message-preview {color:#334155; margin-top:0.5rem;}
         .message-body {font-family:'Segoe UI',sans-serif; color:#0f172a; line-height:1.55;}
         .message-body img {max-width:100%; border-radius:10px; margin:0.3rem 0;}
         .message-body ul {padding-left:1.2rem;}
@@ -270,74 +629,62 @@ def display_candidate_messages_view(json_data):
             f"**Thời gian cập nhật**\n\n{_format_timestamp(meta.get('since'))}"
         )
 
-    for idx, message in enumerate(messages, start=1):
-        user = message.get("user") or {}
-        author_name = user.get("name") or user.get("username") or user.get("email") or "Không rõ"
-        author_type = user.get("type") or ""
-        subject = message.get("subject") or "Không có tiêu đề"
-        time_sent = _format_timestamp(message.get("since"))
-        thread_id = message.get("thread_id") or "-"
-        message_id = message.get("id") or "-"
-
-        st.markdown("<div class='message-card'>", unsafe_allow_html=True)
-        header_cols = st.columns([3, 1])
-        with header_cols[0]:
-            st.markdown(
-                f"<div class='message-title'>{idx}. {_format_text(subject)}</div>",
-                unsafe_allow_html=True,
-            )
-            st.markdown(
-                f"<div class='message-meta'>Từ: {_format_text(author_name)}"
-                f" · Loại: {_format_text(author_type)}</div>",
-                unsafe_allow_html=True,
-            )
-            st.markdown(
-                f"<div class='message-meta'>Message ID: {_format_text(message_id)} · Thread: {_format_text(thread_id)}</div>",
-                unsafe_allow_html=True,
-            )
-        with header_cols[1]:
-            st.markdown(
-                f"<div class='message-meta align-right'>Thời gian: {time_sent}</div>",
-                unsafe_allow_html=True,
-            )
-
-        content_html = message.get("content") or message.get("body") or ""
-        if isinstance(content_html, str):
-            content_html = content_html.replace("\\r\\n", "\n")
-        content_html = content_html or "<p>Không có nội dung.</p>"
-
-        components.html(
+    for message in messages[:shown]:
+        # Phần đầu thẻ gộp thành một khối HTML để giảm số element Streamlit mỗi tin nhắn
+        st.markdown(
             f"""
-            <div class='message-body'>
-                {content_html}
+            <div class='message-card'>
+                <div class='message-card-header'>
+                    <div>
+                        <div class='message-title'>{message['index']}. {message['subject']}</div>
+                        <div class='message-meta'>Từ: {message['author_name']} · Loại: {message['author_type']}</div>
+                        <div class='message-meta'>Message ID: {message['message_id']} · Thread: {message['thread_id']}</div>
+                    </div>
+                    <div class='message-meta align-right'>Thời gian: {message['time_sent']}</div>
+                </div>
+                <div class='message-preview'>{html.escape(message['preview'])}</div>
             </div>
             """,
-            height=420,
-            scrolling=True,
+            unsafe_allow_html=True,
         )
 
-        attachments = message.get("attachments") or []
-        if attachments:
+        if st.toggle("Xem nội dung", key=f"message_body_{message['key']}"):
+            components.html(
+                f"""
+                <div class='message-body'>
+                    {message['content_html']}
+                </div>
+                """,
+                height=420,
+                scrolling=True,
+            )
+
+        if message["attachments"]:
             st.markdown("**Tệp đính kèm**")
-            for attachment in attachments:
-                name = attachment.get("name") or attachment.get("filename") or "Tệp"
-                url = attachment.get("url") or attachment.get("download_url")
+            for name, url in message["attachments"]:
                 if url:
-                    st.markdown(f"- [{_format_text(name)}]({url})")
+                    st.markdown(f"- [{name}]({url})")
                 else:
-                    st.markdown(f"- {_format_text(name)}")
+                    st.markdown(f"- {name}")
 
-        tracking_events = message.get("tracking_events") or []
-        if tracking_events:
+        if message["tracking_events"]:
             with st.expander("Lịch sử gửi/đọc"):
-                for event in tracking_events:
-                    event_name = event.get("event") or "unknown"
-                    event_time = _format_timestamp(event.get("since"))
-                    st.markdown(
-                        f"- **{_format_text(event_name)}** · {event_time}"
-                    )
+                st.markdown("\n".join(
+                    f"- **{event_name}** · {event_time}" for event_name, event_time in message["tracking_events"]
+                ))
+
+    remaining = len(messages) - shown
+    if remaining > 0:
+        st.caption(f"Đang hiển thị {shown}/{len(messages)} tin nhắn.")
+        more_col, all_col = st.columns(2)
+        if more_col.button(f"⬇️ Xem thêm {min(MESSAGES_PAGE_SIZE, remaining)} tin nhắn", key="messages_more"):
+            st.session_state["messages_shown"] = shown + MESSAGES_PAGE_SIZE
+            st.rerun()
+        if all_col.button("Hiển thị tất cả", key="messages_all"):
+            st.session_state["messages_shown"] = len(messages)
+            st.rerun()
+
 
-        st.markdown("</div>", unsafe_allow_html=True)
 def main():
     env_values = load_env_file()
     env_num_per_page = env_values.get("NUM_PER_PAGE") or os.getenv("NUM_PER_PAGE")
@@ -348,6 +695,7 @@ def main():
 
     st.title("Ứng dụng Truy vấn Base.vn Candidate List API")
     st.markdown("---")
+    display_refresh_control()
 
     env_status = st.empty()
     if ENV_PATH.exists():
@@ -424,7 +772,7 @@ def main():
     if load_openings and access_token:
         with st.spinner("Đang tải danh sách openings..."):
             try:
-                resp = fetch_openings_list(access_token, page=1, num_per_page=100)
+                resp = cached_response(cached_openings, access_token, 100)
                 if resp.status_code == 200:
                     data = resp.json()
                     openings_data = data.get("openings", [])
@@ -434,9 +782,17 @@ def main():
                         for opening in openings_data:
                             key = f"{opening.get('id')} - {opening.get('name', 'N/A')}"
                             opening_options[key] = opening
-                        st.success(f"✅ Đã tải {len(openings_data)} openings")
+                        try:
+                            total = int(data.get("total") or 0)
+                        except (TypeError, ValueError):
+                            total = 0
+                        if total > len(openings_data):
+                            st.warning(f"⚠️ Chỉ tải được {len(openings_data)}/{total} openings từ Base.vn")
+                        else:
+                            st.success(f"✅ Đã tải {len(openings_data)} openings")
                         # Lưu vào session state
                         st.session_state['openings'] = opening_options
+                        st.session_state['openings_index'] = build_opening_index(opening_options)
                     else:
                         st.warning("Không tìm thấy opening nào")
                 else:
@@ -448,16 +804,31 @@ def main():
     if 'openings' in st.session_state:
         opening_options = st.session_state['openings']
 
+    # Ô tìm kiếm nằm ngoài form để dropdown được lọc ngay khi gõ (Enter)
+    opening_keys = list(opening_options.keys())
+    if opening_options:
+        opening_index = st.session_state.get('openings_index') or build_opening_index(opening_options)
+        opening_query = st.text_input(
+            "🔍 Tìm opening (ID hoặc tên):",
+            key="opening_query",
+            help="Không phân biệt hoa thường và dấu; dropdown chỉ hiển thị các opening khớp",
+        )
+        opening_keys, match_count = search_openings(opening_index, opening_query)
+        if match_count > len(opening_keys):
+            st.caption(f"Hiển thị {len(opening_keys)}/{match_count} openings khớp, gõ thêm để thu hẹp.")
+        elif opening_query:
+            st.caption(f"{match_count}/{len(opening_options)} openings khớp.")
+
     # Form chính để query candidates
     with st.form("candidate_query_form"):
         col1, col2 = st.columns(2)
         
         with col1:
-            if opening_options:
+            if opening_keys:
                 # Dropdown để chọn opening
                 selected_opening_key = st.selectbox(
                     "🎯 Chọn Opening:",
-                    options=list(opening_options.keys()),
+                    options=opening_keys,
                     help="Chọn vị trí tuyển dụng từ danh sách"
                 )
                 
@@ -482,7 +853,10 @@ def main():
                     )
                     st.info("ℹ️ Opening này chưa có stages, vui lòng nhập thủ công")
             else:
-                st.info("👆 Nhấn 'Tải danh sách Opening & Stage' ở trên để load dropdown")
+                if opening_options:
+                    st.warning("Không có opening nào khớp từ khóa tìm kiếm, nhập ID thủ công")
+                else:
+                    st.info("👆 Nhấn 'Tải danh sách Opening & Stage' ở trên để load dropdown")
                 opening_id = st.text_input(
                     "Opening ID:",
                     value=env_values.get("OPENING_ID") or os.getenv("OPENING_ID", "9346"),
@@ -521,57 +895,16 @@ def main():
 
     # --- 2. Logic Gọi API và Xử lý ---
     if submitted:
-        st.info("Đang gửi yêu cầu và xử lý dữ liệu...")
-        
-        try:
-            # Nếu chọn dùng proxy local, gọi endpoint /candidates trên FastAPI server
-            if use_local_proxy:
-                proxy_url = os.getenv("LOCAL_PROXY_URL", "http://127.0.0.1:8000/candidates")
-                proxy_payload = {
-                    "access_token": access_token,
-                    "opening_id": opening_id,
-                    "page": page,
-                    "num_per_page": num_per_page,
-                    "stage": stage
-                }
-                proxy_resp = requests.post(proxy_url, data=proxy_payload)
-                # proxy returns JSON with processed data and raw
-                if proxy_resp.status_code == 200:
-                    proxy_json = proxy_resp.json()
-                    # adapt shape used later: set response-like object
-                    response = SimpleResp(200, proxy_json.get("raw", {}), json.dumps(proxy_json))
-                else:
-                    response = SimpleResp(proxy_resp.status_code, {}, proxy_resp.text)
-            else:
-                # Gọi hàm API từ module api_client.py trực tiếp
-                response = fetch_candidates(access_token, opening_id, page, num_per_page, stage)
-            
-            st.subheader("Kết quả Phản hồi")
-            st.write(f"**Mã Trạng thái (Status Code):** `{response.status_code}`")
-
-            if response.status_code == 200:
-                json_data = response.json()
-
-                # Xử lý và trích xuất dữ liệu từ module data_processor.py
-                processed_data = process_candidate_data(json_data)
-                
-                # Hiển thị kết quả
-                display_metrics(processed_data["metrics"])
-                
-                st.subheader(f"Danh sách Ứng viên (Tìm thấy: {processed_data['count_candidates']})")
-                
-                if not processed_data["dataframe"].empty:
-                    st.dataframe(processed_data["dataframe"], width="stretch")
-                else:
-                    st.warning("Không tìm thấy ứng viên nào.")
-                    
-                if st.checkbox("Xem toàn bộ JSON phản hồi thô"):
-                    st.json(json_data)
-                    
-            else:
-                st.error(f"Lỗi: API trả về mã trạng thái {response.status_code}.")
-                st.code(response.text, language="text")
+        # Mỗi lần gửi form tạo trình duyệt mới cho bộ tham số này; chuyển trang sau đó không cần gửi lại form
+        st.session_state["candidate_browser"] = CandidatePageBrowser(
+            access_token, opening_id, stage, num_per_page, use_proxy=use_local_proxy
+        )
+        st.session_state["candidate_page"] = int(page)
 
+    browser = st.session_state.get("candidate_browser")
+    if browser is not None:
+        try:
+            display_candidate_browser(browser)
         except ConnectionError as e:
             st.error(str(e))
         except json.JSONDecodeError:
@@ -606,7 +939,7 @@ def main():
                 params = {"access_token": access_token_detail}
                 response = requests.post(proxy_url, params=params)
             else:
-                response = fetch_candidate_detail(access_token_detail, candidate_id_detail)
+                response = cached_response(cached_candidate_detail, access_token_detail, candidate_id_detail.strip())
             
             st.subheader("Kết quả Phản hồi")
             st.write(f"**Mã Trạng thái (Status Code):** `{response.status_code}`")
@@ -649,31 +982,30 @@ def main():
         submitted_messages = st.form_submit_button("💬 Lấy Tin nhắn")
     
     if submitted_messages and candidate_id_messages:
-        st.info("Đang lấy tin nhắn ứng viên...")
-        
+        st.session_state.pop("messages_result", None)
+        st.session_state["messages_shown"] = MESSAGES_PAGE_SIZE
+
         try:
-            if use_proxy_messages:
-                proxy_url = os.getenv("LOCAL_PROXY_URL", f"http://127.0.0.1:8000/candidate/{candidate_id_messages}/messages")
-                if not proxy_url.startswith("http://127.0.0.1:8000/candidate/"):
-                    proxy_url = f"http://127.0.0.1:8000/candidate/{candidate_id_messages}/messages"
-                params = {"access_token": access_token_messages}
-                response = requests.post(proxy_url, params=params)
-            else:
-                response = fetch_candidate_messages(access_token_messages, candidate_id_messages)
-            
-            st.subheader("Kết quả Phản hồi")
-            st.write(f"**Mã Trạng thái (Status Code):** `{response.status_code}`")
-            
-            if response.status_code == 200:
-                json_data = response.json()
-                st.success("✅ Lấy tin nhắn ứng viên thành công!")
-                display_candidate_messages_view(json_data)
-                with st.expander("Xem JSON gốc"):
-                    st.json(json_data)
-            else:
-                st.error(f"Lỗi: API trả về mã trạng thái {response.status_code}.")
-                st.code(response.text, language="text")
-        
+            with st.spinner("Đang lấy tin nhắn ứng viên..."):
+                if use_proxy_messages:
+                    proxy_url = os.getenv("LOCAL_PROXY_URL", f"http://127.0.0.1:8000/candidate/{candidate_id_messages}/messages")
+                    if not proxy_url.startswith("http://127.0.0.1:8000/candidate/"):
+                        proxy_url = f"http://127.0.0.1:8000/candidate/{candidate_id_messages}/messages"
+                    params = {"access_token": access_token_messages}
+                    response = requests.post(proxy_url, params=params)
+                else:
+                    response = cached_response(cached_candidate_messages, access_token_messages, candidate_id_messages.strip())
+
+                json_data = response.json() if response.status_code == 200 else None
+                # Giữ kết quả trong session để "Xem thêm" chỉ render thêm, không gọi lại API
+                st.session_state["messages_result"] = {
+                    "candidate_id": candidate_id_messages.strip(),
+                    "status_code": response.status_code,
+                    "text": response.text,
+                    "json": json_data,
+                    "parsed": parse_candidate_messages(json_data) if json_data is not None else None,
+                }
+
         except ConnectionError as e:
             st.error(str(e))
         except json.JSONDecodeError:
@@ -683,6 +1015,22 @@ def main():
     elif submitted_messages and not candidate_id_messages:
         st.warning("⚠️ Vui lòng nhập Candidate ID")
 
+    messages_result = st.session_state.get("messages_result")
+    if messages_result is not None:
+        st.subheader("Kết quả Phản hồi")
+        st.write(f"**Mã Trạng thái (Status Code):** `{messages_result['status_code']}`")
+
+        if messages_result["parsed"] is not None:
+            st.success("✅ Lấy tin nhắn ứng viên thành công!")
+            display_candidate_messages_view(
+                messages_result["parsed"], st.session_state.get("messages_shown", MESSAGES_PAGE_SIZE)
+            )
+            with st.expander("Xem JSON gốc"):
+                st.json(messages_result["json"])
+        else:
+            st.error(f"Lỗi: API trả về mã trạng thái {messages_result['status_code']}.")
+            st.code(messages_result["text"], language="text")
+
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
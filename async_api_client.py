@@ -0,0 +1,440 @@
+# async_api_client.py
+"""
+Phiên bản asyncio của api_client: cùng 5 thao tác với Base.vn nhưng dùng
+httpx.AsyncClient có connection pool, để các route FastAPI có thể await
+mà không chặn event loop.
+"""
+
+import asyncio
+import time
+from collections import deque
+
+import httpx
+from urllib.parse import urlencode
+
+from api_client import (
+    API_URL,
+    OPENING_LIST_URL,
+    OPENING_GET_URL,
+    CANDIDATE_GET_URL,
+    CANDIDATE_MESSAGES_URL,
+    DEFAULT_MAX_CONCURRENCY,
+    FIXED_HEADERS,
+    UpstreamError,
+    env_float,
+    env_int,
+    page_count,
+)
+from response_cache import CachedResponse, endpoint_of, response_cache
+from singleflight import AsyncSingleFlight
+from circuit_breaker import circuit_breakers
+import metrics
+from tracing import traced
+from json_backend import decode_response
+import rate_limit
+
+
+class AsyncBaseClient:
+    """
+    Client async dùng chung cho Base.vn, bọc một httpx.AsyncClient.
+
+    - max_connections: tổng số kết nối đồng thời tối đa
+    - max_keepalive_connections: số kết nối keep-alive giữ lại trong pool
+    - keepalive_expiry: thời gian (giây) giữ một kết nối rảnh
+    - connect_timeout / read_timeout / pool_timeout: timeout (giây)
+    """
+
+    def __init__(self, max_connections=None, max_keepalive_connections=None,
+                 keepalive_expiry=None, connect_timeout=None, read_timeout=None,
+                 pool_timeout=None):
+        if max_connections is None:
+            max_connections = env_int("BASE_API_MAX_CONNECTIONS", 200)
+        if max_keepalive_connections is None:
+            max_keepalive_connections = env_int("BASE_API_POOL_MAXSIZE", 20)
+        if keepalive_expiry is None:
+            keepalive_expiry = env_float("BASE_API_KEEPALIVE_EXPIRY", 30.0)
+        if connect_timeout is None:
+            connect_timeout = env_float("BASE_API_CONNECT_TIMEOUT", 5.0)
+        if read_timeout is None:
+            read_timeout = env_float("BASE_API_READ_TIMEOUT", 30.0)
+        if pool_timeout is None:
+            pool_timeout = env_float("BASE_API_POOL_TIMEOUT", 10.0)
+
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.timeout = httpx.Timeout(
+            read_timeout,
+            connect=connect_timeout,
+            pool=pool_timeout,
+        )
+        self.client = httpx.AsyncClient(
+            headers=FIXED_HEADERS,
+            limits=self.limits,
+            timeout=self.timeout,
+        )
+
+    async def post(self, url, payload_params):
+        """Gửi POST form-encoded qua client dùng chung, trả về httpx.Response."""
+        return await self.client.post(url, content=urlencode(payload_params))
+
+    async def aclose(self):
+        await self.client.aclose()
+
+
+# httpx.AsyncClient gắn với event loop đã tạo ra nó, nên ghi nhớ loop tương ứng
+_client = None
+_client_loop = None
+# Giữ tham chiếu tới các task đang đóng client cũ để chúng không bị thu hồi giữa chừng
+_closing = set()
+
+
+async def _aclose_quietly(client):
+    try:
+        await client.aclose()
+    except Exception:
+        # Kết nối của loop đã đóng không còn đóng sạch được; chỉ cần client được đánh dấu đóng
+        pass
+
+
+def _discard_client(client, loop):
+    """Đóng client của một event loop khác (loop cũ) mà không chặn loop hiện tại."""
+    if not loop.is_closed() and loop.is_running():
+        # Loop cũ vẫn chạy (ở thread khác): đóng client trên chính loop đó
+        asyncio.run_coroutine_threadsafe(_aclose_quietly(client), loop)
+        return
+    task = asyncio.get_running_loop().create_task(_aclose_quietly(client))
+    _closing.add(task)
+    task.add_done_callback(_closing.discard)
+
+
+def get_client():
+    """Trả về AsyncBaseClient dùng chung cho event loop hiện tại (client của loop cũ được đóng)."""
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client_loop is not loop:
+        if _client is not None:
+            _discard_client(_client, _client_loop)
+        _client = AsyncBaseClient()
+        _client_loop = loop
+    return _client
+
+
+def configure_client(**kwargs):
+    """
+    Thay client dùng chung bằng client mới với cấu hình tùy chỉnh
+    (xem tham số của AsyncBaseClient). Phải gọi bên trong event loop.
+    Client cũ cần được đóng bằng close_client() trước khi thay nếu còn dùng.
+    """
+    global _client, _client_loop
+    _client = AsyncBaseClient(**kwargs)
+    _client_loop = asyncio.get_running_loop()
+    return _client
+
+
+async def close_client():
+    """Đóng client dùng chung (gọi khi server shutdown)."""
+    global _client, _client_loop
+    client, _client, _client_loop = _client, None, None
+    if client is not None:
+        await client.aclose()
+
+
+# Gộp các yêu cầu giống hệt nhau đang chạy đồng thời thành một lời gọi lên Base.vn
+inflight = AsyncSingleFlight()
+
+
+@traced("upstream")
+async def _post(url, payload_params, error_label):
+    endpoint = endpoint_of(url)
+    cache_key = response_cache.key_for(endpoint, payload_params)
+    ttl = response_cache.ttl_for(endpoint)
+    stale = None
+    if ttl > 0:
+        cached, fresh = response_cache.get_stale(cache_key)
+        if fresh:
+            return cached
+        stale = cached
+    breaker = circuit_breakers.get(endpoint)
+
+    async def send():
+        attempt = 0
+        while True:
+            await rate_limit.rate_limiter.acquire_async()
+            started = time.perf_counter()
+            try:
+                response = await get_client().post(url, payload_params)
+            except httpx.HTTPError as e:
+                metrics.observe_upstream(endpoint, "error", time.perf_counter() - started)
+                delay = rate_limit.retry_policy.next_delay(attempt)
+                if delay is None:
+                    # Xử lý các lỗi kết nối/yêu cầu cơ bản
+                    raise ConnectionError(f"{error_label}: {e}")
+            else:
+                metrics.observe_upstream(endpoint, response.status_code, time.perf_counter() - started)
+                retry_after = rate_limit.parse_retry_after(response.headers.get("Retry-After"))
+                rate_limit.rate_limiter.on_response(response.status_code, retry_after)
+                delay = rate_limit.retry_policy.next_delay(attempt, response.status_code, retry_after)
+                if delay is None:
+                    return response
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def call_upstream():
+        # Breaker ghi nhận một kết quả cho cả lời gọi, sau khi đã hết lượt thử lại
+        breaker.before_call()
+        try:
+            response = await send()
+        except ConnectionError:
+            breaker.record_failure()
+            raise
+        except BaseException:
+            breaker.release()
+            raise
+        breaker.record_status(response.status_code)
+
+        if ttl > 0 and response.status_code == 200:
+            response_cache.set(cache_key, CachedResponse.from_response(response), ttl, response_cache.stale_ttl)
+        return response
+
+    if stale is not None:
+        # Stale-while-revalidate: trả ngay bản cũ, làm mới ở nền (một lần cho mỗi khóa)
+        if not inflight.pending(cache_key):
+            task = asyncio.get_running_loop().create_task(_refresh(cache_key, call_upstream))
+            _background.add(task)
+            task.add_done_callback(_background.discard)
+        return stale.as_stale()
+
+    return await inflight.do(cache_key, call_upstream)
+
+
+# Giữ tham chiếu tới các task làm mới nền để chúng không bị thu gom giữa chừng
+_background = set()
+
+
+async def _refresh(cache_key, call_upstream):
+    try:
+        await inflight.do(cache_key, call_upstream)
+    except Exception:
+        # Lỗi đã được circuit breaker ghi nhận; lần gọi sau vẫn dùng bản stale
+        pass
+
+
+async def fetch_candidates(access_token, opening_id, page, num_per_page, stage):
+    """Gọi endpoint /candidate/list để lấy danh sách ứng viên."""
+    payload_params = {
+        "access_token": access_token,
+        "opening_id": opening_id,
+        "page": page,
+        "num_per_page": num_per_page,
+        "stage": stage
+    }
+
+    return await _post(API_URL, payload_params, "Lỗi kết nối API")
+
+
+async def fetch_openings_list(access_token, page=1, num_per_page=50, order_by="starred"):
+    """Gọi endpoint /opening/list để lấy danh sách opening."""
+    payload_params = {
+        "access_token": access_token,
+        "page": page,
+        "num_per_page": num_per_page,
+        "order_by": order_by
+    }
+
+    return await _post(OPENING_LIST_URL, payload_params, "Lỗi kết nối API (opening/list)")
+
+
+async def fetch_opening(access_token, opening_id):
+    """Gọi endpoint /opening/get để lấy chi tiết opening theo id."""
+    payload_params = {
+        "access_token": access_token,
+        "id": opening_id
+    }
+
+    return await _post(OPENING_GET_URL, payload_params, "Lỗi kết nối API (opening/get)")
+
+
+async def fetch_candidate_detail(access_token, candidate_id):
+    """Gọi endpoint /candidate/get để lấy chi tiết ứng viên."""
+    payload_params = {
+        "access_token": access_token,
+        "id": candidate_id
+    }
+
+    return await _post(CANDIDATE_GET_URL, payload_params, "Lỗi kết nối API (candidate/get)")
+
+
+async def fetch_candidate_messages(access_token, candidate_id):
+    """Gọi endpoint /candidate/messages để lấy lịch sử tin nhắn/notes của ứng viên."""
+    payload_params = {
+        "access_token": access_token,
+        "id": candidate_id
+    }
+
+    return await _post(CANDIDATE_MESSAGES_URL, payload_params, "Lỗi kết nối API (candidate/messages)")
+
+
+async def _fetch_candidates_page(access_token, opening_id, page, num_per_page, stage):
+    """Lấy một trang ứng viên và trả về JSON; ném UpstreamError nếu mã trạng thái khác 200."""
+    resp = await fetch_candidates(access_token, opening_id, page, num_per_page, stage)
+    if resp.status_code != 200:
+        raise UpstreamError(resp.status_code, resp.text)
+    return decode_response(resp)
+
+
+async def fetch_all_candidates(access_token, opening_id, stage, num_per_page=100, max_concurrency=None):
+    """
+    Lấy toàn bộ ứng viên của một opening/stage.
+
+    Tải trang 1 để biết `total`, sau đó tải các trang còn lại song song
+    (tối đa `max_concurrency` yêu cầu cùng lúc) và gộp thành một kết quả có
+    cùng dạng với phản hồi của /candidate/list.
+    """
+    if max_concurrency is None:
+        max_concurrency = DEFAULT_MAX_CONCURRENCY
+
+    first_page = await _fetch_candidates_page(access_token, opening_id, 1, num_per_page, stage)
+    num_pages = page_count(first_page, num_per_page, "candidates")
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def fetch_page(page):
+        async with semaphore:
+            return await _fetch_candidates_page(access_token, opening_id, page, num_per_page, stage)
+
+    tasks = [asyncio.ensure_future(fetch_page(page)) for page in range(2, num_pages + 1)]
+    try:
+        other_pages = await asyncio.gather(*tasks)
+    finally:
+        # Một trang lỗi (hoặc người gọi bị hủy): hủy các trang còn lại thay vì để chúng chạy tiếp vô ích
+        for task in tasks:
+            task.cancel()
+
+    candidates = list(first_page.get("candidates") or [])
+    for page_data in other_pages:
+        candidates.extend(page_data.get("candidates") or [])
+
+    merged = dict(first_page)
+    merged["candidates"] = candidates
+    merged["count"] = len(candidates)
+    merged["page"] = 1
+    merged["num_pages"] = num_pages
+    return merged
+
+
+async def iter_candidate_pages(access_token, opening_id, stage, num_per_page=100, max_concurrency=None):
+    """
+    Async generator trả về lần lượt JSON của từng trang ứng viên theo đúng thứ tự.
+
+    Trong lúc trang hiện tại được xử lý, tối đa `max_concurrency` trang kế tiếp
+    đã được tải trước, nên bộ nhớ chỉ giữ một cửa sổ trang cố định dù opening
+    có bao nhiêu ứng viên.
+    """
+    if max_concurrency is None:
+        max_concurrency = DEFAULT_MAX_CONCURRENCY
+
+    first_page = await _fetch_candidates_page(access_token, opening_id, 1, num_per_page, stage)
+    num_pages = page_count(first_page, num_per_page, "candidates")
+    yield first_page
+
+    pending = deque()
+    next_page = 2
+    try:
+        while next_page <= num_pages or pending:
+            while next_page <= num_pages and len(pending) < max_concurrency:
+                pending.append(asyncio.ensure_future(
+                    _fetch_candidates_page(access_token, opening_id, next_page, num_per_page, stage)
+                ))
+                next_page += 1
+            yield await pending.popleft()
+    finally:
+        # Người dùng ngắt giữa chừng (ví dụ client đóng kết nối): hủy các trang đang tải trước
+        for task in pending:
+            task.cancel()
+
+
+async def _fetch_json(fetcher, access_token, item_id):
+    """Gọi một fetcher theo id và trả về JSON; ném UpstreamError nếu mã trạng thái khác 200."""
+    resp = await fetcher(access_token, item_id)
+    if resp.status_code != 200:
+        raise UpstreamError(resp.status_code, resp.text)
+    return decode_response(resp)
+
+
+async def iter_bounded(items, coro_fn, max_concurrency=None):
+    """
+    Async generator chạy coro_fn(item) cho từng item, tối đa `max_concurrency`
+    lời gọi cùng lúc, và trả về (item, kết quả, lỗi) theo thứ tự hoàn thành.
+    Lỗi của từng item (kết nối, mã trạng thái, JSON) không làm dừng các item khác.
+    """
+    if max_concurrency is None:
+        max_concurrency = DEFAULT_MAX_CONCURRENCY
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def run(item):
+        async with semaphore:
+            try:
+                return item, await coro_fn(item), None
+            except (ConnectionError, UpstreamError, ValueError) as e:
+                return item, None, e
+
+    tasks = [asyncio.ensure_future(run(item)) for item in items]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def bulk_result(item_id, data, error):
+    """Kết quả cho một id trong các thao tác hàng loạt."""
+    if error is None:
+        return {"id": item_id, "ok": True, "data": data}
+    result = {"id": item_id, "ok": False, "error": str(error)}
+    if isinstance(error, UpstreamError):
+        result["status_code"] = error.status_code
+        result["error"] = error.text
+    return result
+
+
+async def fetch_candidate_details_bulk(access_token, candidate_ids, max_concurrency=None):
+    """
+    Lấy chi tiết nhiều ứng viên song song (tối đa `max_concurrency` yêu cầu
+    cùng lúc). Trả về list kết quả theo thứ tự `candidate_ids`, mỗi phần tử
+    có dạng {"id", "ok", "data"} hoặc {"id", "ok": False, "error", "status_code"}.
+    """
+    candidate_ids = list(dict.fromkeys(candidate_ids))
+    results = {}
+    async for candidate_id, data, error in iter_bounded(
+        candidate_ids,
+        lambda candidate_id: _fetch_json(fetch_candidate_detail, access_token, candidate_id),
+        max_concurrency,
+    ):
+        results[candidate_id] = bulk_result(candidate_id, data, error)
+    return [results[candidate_id] for candidate_id in candidate_ids]
+
+
+async def iter_candidate_messages_bulk(access_token, candidate_ids, max_concurrency=None):
+    """
+    Async generator lấy lịch sử tin nhắn của nhiều ứng viên song song và trả về
+    kết quả của từng ứng viên ngay khi hoàn thành (dạng như bulk_result).
+    """
+    candidate_ids = list(dict.fromkeys(candidate_ids))
+    async for candidate_id, data, error in iter_bounded(
+        candidate_ids,
+        lambda candidate_id: _fetch_json(fetch_candidate_messages, access_token, candidate_id),
+        max_concurrency,
+    ):
+        yield bulk_result(candidate_id, data, error)
+
+
+async def list_candidate_ids(access_token, opening_id, stage, num_per_page=100, max_concurrency=None):
+    """Lấy id của toàn bộ ứng viên thuộc một opening/stage."""
+    candidate_ids = []
+    async for page_data in iter_candidate_pages(access_token, opening_id, stage, num_per_page, max_concurrency):
+        candidate_ids.extend(c.get("id") for c in page_data.get("candidates") or [] if c.get("id") is not None)
+    return candidate_ids
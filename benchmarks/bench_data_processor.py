@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark process_candidate_data: so sánh cách tạo DataFrame cũ (list các
+dict theo từng ứng viên) với cách trích xuất theo cột hiện tại, và đường
+JSON của API (DataFrame rồi to_dict so với process_candidate_records).
+
+Chạy: python benchmarks/bench_data_processor.py [--sizes 10000 100000] [--repeat 5]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from benchmarks.synthetic import make_candidates_payload
+from data_processor import process_candidate_data, process_candidate_records
+
+
+def legacy_process_candidate_data(json_data):
+    """Cài đặt cũ theo từng dòng, giữ lại để đối chiếu kết quả và tốc độ."""
+    candidates_list = json_data.get('candidates', [])
+    display_data = []
+    for c in candidates_list:
+        cvs = c.get('cvs', [])
+        cv_link = cvs[0] if cvs and len(cvs) > 0 else 'Không có'
+        display_data.append({
+            "ID": c.get('id'),
+            "Họ & Tên": c.get('name'),
+            "Email": c.get('email'),
+            "SĐT": c.get('phone'),
+            "Vị trí ứng tuyển": c.get('opening_export', {}).get('name', 'N/A'),
+            "Giai đoạn": c.get('stage_name', 'N/A'),
+            "Nguồn": c.get('source', 'N/A'),
+            "CV Link": cv_link
+        })
+    return pd.DataFrame(display_data)
+
+
+def dataframe_to_records(json_data):
+    """Đường cũ của các endpoint: tạo DataFrame rồi chuyển ngược thành record."""
+    return process_candidate_data(json_data)["dataframe"].to_dict('records')
+
+
+def best_of(fn, arg, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(arg)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'candidates':>12} {'legacy (ms)':>12} {'columnar (ms)':>14} {'speedup':>8}"
+          f" {'df+to_dict (ms)':>16} {'records (ms)':>13} {'speedup':>8}")
+    for size in args.sizes:
+        payload = make_candidates_payload(size)
+
+        # Kết quả phải giống hệt cài đặt cũ
+        pd.testing.assert_frame_equal(
+            legacy_process_candidate_data(payload),
+            process_candidate_data(payload)["dataframe"],
+        )
+        assert process_candidate_records(payload)["records"] == dataframe_to_records(payload)
+
+        legacy = best_of(legacy_process_candidate_data, payload, args.repeat)
+        columnar = best_of(process_candidate_data, payload, args.repeat)
+        via_dataframe = best_of(dataframe_to_records, payload, args.repeat)
+        records = best_of(process_candidate_records, payload, args.repeat)
+        print(f"{size:>12} {legacy * 1000:>12.1f} {columnar * 1000:>14.1f} {legacy / columnar:>7.2f}x"
+              f" {via_dataframe * 1000:>16.1f} {records * 1000:>13.1f} {via_dataframe / records:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
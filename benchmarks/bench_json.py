@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Benchmark JSON cho proxy: giải mã body upstream và mã hóa phản hồi
+/candidates với module json chuẩn (qua jsonable_encoder như FastAPI mặc
+định) so với orjson.
+
+Chạy: python benchmarks/bench_json.py [--sizes 100 1000 10000] [--repeat 5]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+import json_backend
+from benchmarks.synthetic import make_candidates_payload
+from data_processor import process_candidate_records
+
+
+def best_of(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def response_body(json_data):
+    processed = process_candidate_records(json_data)
+    return {
+        "metrics": processed["metrics"],
+        "count_candidates": processed["count_candidates"],
+        "candidates_table": processed["records"],
+        "raw": json_data,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    if json_backend.orjson is None:
+        print("orjson chưa được cài (pip install orjson) - không có gì để so sánh")
+        return 1
+
+    print(f"{'candidates':>10} {'body (KB)':>10} {'decode std':>11} {'decode orjson':>14}"
+          f" {'encode std':>11} {'encode orjson':>14} {'total speedup':>14}")
+    for size in args.sizes:
+        raw_bytes = json.dumps(make_candidates_payload(size)).encode("utf-8")
+        body = response_body(json.loads(raw_bytes))
+
+        json_backend.set_backend("std")
+        decode_std = best_of(lambda: json_backend.loads(raw_bytes), args.repeat)
+        # Đường mặc định của FastAPI: jsonable_encoder rồi JSONResponse
+        encode_std = best_of(lambda: JSONResponse(jsonable_encoder(body)), args.repeat)
+
+        json_backend.set_backend("orjson")
+        decode_fast = best_of(lambda: json_backend.loads(raw_bytes), args.repeat)
+        encode_fast = best_of(lambda: json_backend.FastJSONResponse(body), args.repeat)
+
+        assert json.loads(json_backend.dumps(body)) == json.loads(JSONResponse(body).body)
+
+        speedup = (decode_std + encode_std) / (decode_fast + encode_fast)
+        print(f"{size:>10} {len(raw_bytes) / 1024:>10.0f} {decode_std * 1000:>9.2f}ms {decode_fast * 1000:>12.2f}ms"
+              f" {encode_std * 1000:>9.2f}ms {encode_fast * 1000:>12.2f}ms {speedup:>13.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
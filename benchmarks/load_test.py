@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Load test offline cho web_api.py và api_server.py với server Base.vn giả lập.
+
+Khởi động benchmarks/mock_base_server.py và server cần đo (uvicorn, trỏ
+BASE_API_URL tới server giả lập), gửi request với độ song song cấu hình
+được, rồi báo cáo RPS, độ trễ p50/p95/p99, số lỗi và bộ nhớ (RSS) của server.
+
+Chạy: python benchmarks/load_test.py [--scenarios candidates candidate_detail]
+      [--concurrency 1 10 50] [--requests 500] [--latency-ms 50] [--json out.json]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+OPENING_ID = "9346"
+STAGE_ID = "75440"
+FIRST_CANDIDATE_ID = 100000
+
+# Tên kịch bản -> (server, method, hàm tạo (path, params) từ rng và cấu hình)
+SCENARIOS = {
+    "candidates": ("web_api", "POST", lambda rng, cfg: ("/candidates", {
+        "access_token": "bench", "opening_id": OPENING_ID, "stage": STAGE_ID,
+        "page": rng.randint(1, cfg.pages), "num_per_page": cfg.num_per_page,
+    })),
+    "candidates_lite": ("web_api", "POST", lambda rng, cfg: ("/candidates", {
+        "access_token": "bench", "opening_id": OPENING_ID, "stage": STAGE_ID,
+        "page": rng.randint(1, cfg.pages), "num_per_page": cfg.num_per_page, "include_raw": "false",
+    })),
+    "candidates_all": ("web_api", "POST", lambda rng, cfg: ("/candidates/all", {
+        "access_token": "bench", "opening_id": OPENING_ID, "stage": STAGE_ID, "num_per_page": cfg.num_per_page,
+    })),
+    "candidate_detail": ("web_api", "POST", lambda rng, cfg: (
+        f"/candidate/{FIRST_CANDIDATE_ID + rng.randrange(cfg.candidates)}", {"access_token": "bench"},
+    )),
+    "candidate_messages": ("web_api", "POST", lambda rng, cfg: (
+        f"/candidate/{FIRST_CANDIDATE_ID + rng.randrange(cfg.candidates)}/messages", {"access_token": "bench"},
+    )),
+    "openings": ("web_api", "POST", lambda rng, cfg: ("/openings", {"access_token": "bench"})),
+    "api_candidates": ("api_server", "GET", lambda rng, cfg: ("/api/v1/candidates", {
+        "access_token": "bench", "opening_id": OPENING_ID, "stage": STAGE_ID,
+        "page": rng.randint(1, cfg.pages), "num_per_page": min(cfg.num_per_page, 100),
+    })),
+}
+
+SERVER_MODULES = {"web_api": "web_api:app", "api_server": "api_server:app"}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_ready(url, process, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Tiến trình thoát sớm (mã {process.returncode}) khi chờ {url}")
+        try:
+            httpx.get(url, timeout=1.0)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    raise RuntimeError(f"Hết thời gian chờ {url}")
+
+
+def memory_kb(pid):
+    """(RSS hiện tại, RSS cao nhất) của tiến trình theo KB, đọc từ /proc (Linux); None nếu không đọc được."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            fields = dict(line.split(":", 1) for line in f if ":" in line)
+        return int(fields["VmRSS"].split()[0]), int(fields["VmHWM"].split()[0])
+    except (OSError, KeyError, ValueError):
+        return None, None
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return float("nan")
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values) + 0.5) - 1))
+    return sorted_values[index]
+
+
+def start_mock(args):
+    port = free_port()
+    process = subprocess.Popen([
+        sys.executable, os.path.join(ROOT, "benchmarks", "mock_base_server.py"),
+        "--port", str(port),
+        "--candidates", str(args.candidates),
+        "--latency-ms", str(args.latency_ms),
+        "--jitter-ms", str(args.jitter_ms),
+        "--error-rate", str(args.error_rate),
+    ], cwd=ROOT)
+    wait_until_ready(f"http://127.0.0.1:{port}/publicapi/v2/opening/list", process)
+    return process, f"http://127.0.0.1:{port}/publicapi/v2"
+
+
+def start_server(name, base_api_url, args):
+    port = free_port()
+    # Giới hạn tốc độ phía client mặc định tắt để đo chính server, không đo rate limiter
+    env = dict(os.environ, BASE_API_URL=base_api_url, BASE_API_RATE_LIMIT=str(args.rate_limit))
+    if args.no_cache:
+        env["CACHE_ENABLED"] = "false"
+    process = subprocess.Popen([
+        sys.executable, "-m", "uvicorn", SERVER_MODULES[name],
+        "--host", "127.0.0.1", "--port", str(port),
+        "--log-level", "warning", "--no-access-log",
+    ], cwd=ROOT, env=env)
+    wait_until_ready(f"http://127.0.0.1:{port}/openapi.json", process)
+    return process, f"http://127.0.0.1:{port}"
+
+
+async def run_load(base_url, method, make_request, total, concurrency, cfg, seed):
+    """Gửi `total` request với `concurrency` worker; trả về (danh sách độ trễ giây, số lỗi, thời gian chạy)."""
+    rng = random.Random(seed)
+    requests = [make_request(rng, cfg) for _ in range(total)]
+    latencies, errors = [], 0
+    queue = iter(requests)
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60.0) as client:
+        async def worker():
+            nonlocal errors
+            for path, params in queue:
+                start = time.perf_counter()
+                try:
+                    response = await client.request(method, path, params=params)
+                    await response.aread()
+                    ok = response.status_code < 400
+                except httpx.HTTPError:
+                    ok = False
+                latencies.append(time.perf_counter() - start)
+                if not ok:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    return latencies, errors, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scenarios", nargs="+", default=["candidates", "candidate_detail", "api_candidates"],
+                        choices=sorted(SCENARIOS))
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--requests", type=int, default=500, help="Số request mỗi lần đo")
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--candidates", type=int, default=1000, help="Số ứng viên của opening/stage giả lập")
+    parser.add_argument("--num-per-page", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Độ trễ của Base.vn giả lập")
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=float, default=0,
+                        help="BASE_API_RATE_LIMIT của server (req/s tới Base.vn giả lập, 0 = tắt)")
+    parser.add_argument("--no-cache", action="store_true", help="Tắt response cache của server (CACHE_ENABLED=false)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="Ghi kết quả ra file JSON để so sánh giữa các lần chạy")
+    args = parser.parse_args()
+    args.pages = max(1, -(-args.candidates // args.num_per_page))
+
+    processes = []
+    results = []
+    try:
+        mock, base_api_url = start_mock(args)
+        processes.append(mock)
+        servers = {}
+        for name in sorted({SCENARIOS[s][0] for s in args.scenarios}):
+            process, url = start_server(name, base_api_url, args)
+            processes.append(process)
+            servers[name] = (process, url)
+
+        print(f"Base.vn giả lập: {args.candidates} ứng viên, độ trễ {args.latency_ms}±{args.jitter_ms} ms,"
+              f" {args.requests} request mỗi lần đo\n")
+        print(f"{'scenario':<20} {'conc':>5} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"
+              f" {'max ms':>9} {'errors':>7} {'rss MB':>8} {'peak MB':>8}")
+        for scenario in args.scenarios:
+            server, method, make_request = SCENARIOS[scenario]
+            process, url = servers[server]
+            for concurrency in args.concurrency:
+                if args.warmup:
+                    asyncio.run(run_load(url, method, make_request, args.warmup, min(concurrency, args.warmup),
+                                         args, args.seed + 1))
+                latencies, errors, elapsed = asyncio.run(
+                    run_load(url, method, make_request, args.requests, concurrency, args, args.seed)
+                )
+                latencies.sort()
+                rss, peak = memory_kb(process.pid)
+                row = {
+                    "scenario": scenario,
+                    "server": server,
+                    "concurrency": concurrency,
+                    "requests": len(latencies),
+                    "errors": errors,
+                    "rps": len(latencies) / elapsed if elapsed else 0.0,
+                    "p50_ms": percentile(latencies, 50) * 1000,
+                    "p95_ms": percentile(latencies, 95) * 1000,
+                    "p99_ms": percentile(latencies, 99) * 1000,
+                    "max_ms": latencies[-1] * 1000 if latencies else float("nan"),
+                    "rss_mb": rss / 1024 if rss else None,
+                    "peak_rss_mb": peak / 1024 if peak else None,
+                }
+                results.append(row)
+                rss_text = f"{row['rss_mb']:>8.1f} {row['peak_rss_mb']:>8.1f}" if rss else f"{'n/a':>8} {'n/a':>8}"
+                print(f"{scenario:<20} {concurrency:>5} {row['rps']:>9.1f} {row['p50_ms']:>9.1f}"
+                      f" {row['p95_ms']:>9.1f} {row['p99_ms']:>9.1f} {row['max_ms']:>9.1f} {errors:>7} {rss_text}")
+    finally:
+        for process in reversed(processes):
+            process.terminate()
+        for process in processes:
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"config": {k: v for k, v in vars(args).items() if k != "json"}, "results": results},
+                      f, ensure_ascii=False, indent=2)
+        print(f"\nĐã ghi kết quả vào {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Server giả lập public API của Base.vn cho benchmark/load test offline.
+
+Trả về dữ liệu tổng hợp (benchmarks/synthetic.py) cho candidate/list,
+candidate/get, candidate/messages, opening/list và opening/get, với kích
+thước và độ trễ cấu hình được. Trỏ các server tới đây bằng
+BASE_API_URL=http://127.0.0.1:<port>/publicapi/v2.
+
+Chạy: python benchmarks/mock_base_server.py [--port 8900] [--candidates 1000]
+      [--latency-ms 50] [--jitter-ms 10] [--error-rate 0]
+"""
+
+import argparse
+import asyncio
+import functools
+import json
+import os
+import random
+import sys
+from urllib.parse import parse_qs
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import (
+    make_candidate,
+    make_candidates_page,
+    make_messages,
+    make_openings_page,
+)
+
+
+class MockBaseApp:
+    """
+    Ứng dụng ASGI tối giản (không qua framework) để chính server giả lập
+    không trở thành nút cổ chai khi đo.
+
+    - candidates: tổng số ứng viên của mỗi opening/stage
+    - openings: tổng số opening
+    - messages: số tin nhắn mỗi ứng viên
+    - latency_ms / jitter_ms: độ trễ thêm vào mỗi yêu cầu (ngẫu nhiên ± jitter)
+    - error_rate: tỉ lệ yêu cầu trả về 503
+    """
+
+    def __init__(self, candidates=1000, openings=50, messages=20,
+                 latency_ms=50.0, jitter_ms=10.0, error_rate=0.0, seed=0):
+        self.candidates = candidates
+        self.openings = openings
+        self.messages = messages
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.requests = 0
+
+    # Payload được mã hóa sẵn và ghi nhớ, để thời gian phản hồi chỉ còn là độ trễ cấu hình
+    @functools.lru_cache(maxsize=4096)
+    def _candidate_list(self, opening_id, page, num_per_page):
+        return _encode(make_candidates_page(self.candidates, page, num_per_page, opening_id=opening_id))
+
+    @functools.lru_cache(maxsize=4096)
+    def _opening_list(self, page, num_per_page):
+        return _encode(make_openings_page(self.openings, page, num_per_page))
+
+    @functools.lru_cache(maxsize=65536)
+    def _candidate_get(self, candidate_id):
+        index = _index_of(candidate_id)
+        candidate = make_candidate(index, rng=random.Random(index))
+        candidate["id"] = candidate_id
+        candidate["summary"] = "<p>Kinh nghiệm Python, Kubernetes, PostgreSQL</p>"
+        return _encode({"code": 1, "candidate": candidate})
+
+    @functools.lru_cache(maxsize=65536)
+    def _candidate_messages(self, candidate_id):
+        return _encode(make_messages(candidate_id, self.messages, seed=_index_of(candidate_id)))
+
+    @functools.lru_cache(maxsize=4096)
+    def _opening_get(self, opening_id):
+        opening = make_openings_page(1)["openings"][0]
+        opening["id"] = opening_id
+        return _encode({"code": 1, "opening": opening})
+
+    def route(self, endpoint, params):
+        page = _to_int(params.get("page"), 1)
+        num_per_page = _to_int(params.get("num_per_page"), 50)
+        if endpoint == "candidate/list":
+            return self._candidate_list(params.get("opening_id", "9346"), page, num_per_page)
+        if endpoint == "opening/list":
+            return self._opening_list(page, num_per_page)
+        if endpoint == "candidate/get":
+            return self._candidate_get(params.get("id", "0"))
+        if endpoint == "candidate/messages":
+            return self._candidate_messages(params.get("id", "0"))
+        if endpoint == "opening/get":
+            return self._opening_get(params.get("id", "0"))
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            while (await receive())["type"] != "lifespan.shutdown":
+                await send({"type": "lifespan.startup.complete"})
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+        body = b""
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if not message.get("more_body"):
+                break
+        params = {k: v[0] for k, v in parse_qs(body.decode("utf-8")).items()}
+        self.requests += 1
+
+        if self.latency or self.jitter:
+            await asyncio.sleep(max(0.0, self.latency + self.rng.uniform(-self.jitter, self.jitter)))
+
+        endpoint = "/".join(scope["path"].rstrip("/").split("/")[-2:])
+        if self.error_rate and self.rng.random() < self.error_rate:
+            status, payload = 503, b'{"code":0,"message":"mock upstream error"}'
+        else:
+            payload = self.route(endpoint, params)
+            status = 200 if payload is not None else 404
+            if payload is None:
+                payload = b'{"code":0,"message":"not found"}'
+
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(payload)).encode())],
+        })
+        await send({"type": "http.response.body", "body": payload})
+
+
+def _encode(data):
+    return json.dumps(data, ensure_ascii=False).encode("utf-8")
+
+
+def _to_int(value, default):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _index_of(candidate_id):
+    return _to_int(candidate_id, 100000) - 100000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--candidates", type=int, default=1000, help="Số ứng viên mỗi opening/stage")
+    parser.add_argument("--openings", type=int, default=50)
+    parser.add_argument("--messages", type=int, default=20, help="Số tin nhắn mỗi ứng viên")
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    import uvicorn
+
+    app = MockBaseApp(
+        candidates=args.candidates,
+        openings=args.openings,
+        messages=args.messages,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+    )
+    print(f"Mock Base.vn: BASE_API_URL=http://{args.host}:{args.port}/publicapi/v2")
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning", access_log=False)
+
+
+if __name__ == "__main__":
+    main()
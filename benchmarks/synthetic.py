@@ -0,0 +1,87 @@
+"""
+Sinh dữ liệu giả lập có cấu trúc giống phản hồi Base.vn (candidate/list,
+opening/list, candidate/messages) để dùng cho benchmark.
+"""
+
+import random
+
+SOURCES = ["Website", "LinkedIn", "TopCV", "Giới thiệu", "Facebook"]
+STAGES = ["Ứng tuyển", "Sàng lọc", "Phỏng vấn", "Offer"]
+DOMAINS = ["gmail.com", "yahoo.com", "outlook.com", "base.vn"]
+
+
+def make_candidate(index, opening_id="9346", rng=random):
+    has_cv = rng.random() < 0.8
+    return {
+        "id": str(100000 + index),
+        "name": f"Ứng viên {index}",
+        "disp_name": f"Ứng viên {index}",
+        "email": f"candidate{index}@{rng.choice(DOMAINS)}",
+        "phone": f"09{index:08d}",
+        "gender": str(rng.choice([0, 1, 2])),
+        "opening_export": {"id": opening_id, "name": "Backend Developer", "codename": "BE"},
+        "opening_id": opening_id,
+        "stage_id": str(75440 + STAGES.index(rng.choice(STAGES))),
+        "stage_name": rng.choice(STAGES),
+        "source": rng.choice(SOURCES),
+        "cvs": [f"https://files.base.vn/cv/{index}.pdf"] if has_cv else [],
+        "time_apply": str(1700000000 + index * 60),
+        "tags": [{"id": "1", "name": "priority"}] if index % 7 == 0 else [],
+        "score": str(index % 5),
+    }
+
+
+def make_candidates_page(total, page=1, num_per_page=100, opening_id="9346", seed=0):
+    """Một trang của candidate/list với `total` ứng viên tổng cộng."""
+    rng = random.Random(seed + page)
+    start = (page - 1) * num_per_page
+    count = max(0, min(num_per_page, total - start))
+    return {
+        "code": 1,
+        "total": total,
+        "count": count,
+        "page": page,
+        "candidates": [make_candidate(start + i, opening_id, rng) for i in range(count)],
+    }
+
+
+def make_candidates_payload(count, seed=0):
+    """Một phản hồi candidate/list chứa `count` ứng viên trong một trang."""
+    return make_candidates_page(count, page=1, num_per_page=count, seed=seed)
+
+
+def make_openings_page(total, page=1, num_per_page=50):
+    start = (page - 1) * num_per_page
+    count = max(0, min(num_per_page, total - start))
+    return {
+        "code": 1,
+        "total": total,
+        "count": count,
+        "page": page,
+        "openings": [
+            {
+                "id": str(9000 + start + i),
+                "name": f"Vị trí {start + i}",
+                "stages": [{"id": str(75440 + s), "name": name} for s, name in enumerate(STAGES)],
+            }
+            for i in range(count)
+        ],
+    }
+
+
+def make_messages(candidate_id, count=20, seed=0):
+    rng = random.Random(seed)
+    return {
+        "code": 1,
+        "candidate_id": str(candidate_id),
+        "messages": [
+            {
+                "id": f"{candidate_id}-{i}",
+                "subject": f"Trao đổi {i}",
+                "content": "<p>" + " ".join(rng.choice(["Kubernetes", "Python", "phỏng vấn", "lịch hẹn", "offer"]) for _ in range(40)) + "</p>",
+                "since": str(1700000000 + i * 3600),
+                "user": {"name": "HR", "type": "user"},
+            }
+            for i in range(count)
+        ],
+    }
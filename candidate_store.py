@@ -0,0 +1,609 @@
+# candidate_store.py
+"""
+Kho dữ liệu cục bộ (SQLite) cho openings, ứng viên và tin nhắn đồng bộ từ
+Base.vn, để các truy vấn đọc từ đĩa thay vì gọi API mỗi lần.
+
+Đường dẫn file mặc định lấy từ biến môi trường CANDIDATE_STORE_PATH
+(mặc định: candidates.db cạnh mã nguồn).
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from text_utils import html_to_text
+
+DEFAULT_STORE_PATH = Path(__file__).resolve().parent / "candidates.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS openings (
+    id TEXT PRIMARY KEY,
+    name TEXT,
+    raw TEXT NOT NULL,
+    synced_at INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS candidates (
+    id TEXT PRIMARY KEY,
+    opening_id TEXT,
+    stage_id TEXT,
+    stage_name TEXT,
+    name TEXT,
+    email TEXT,
+    email_domain TEXT,
+    phone TEXT,
+    source TEXT,
+    time_apply INTEGER,
+    fingerprint TEXT NOT NULL,
+    raw TEXT NOT NULL,
+    detail TEXT,
+    synced_at INTEGER NOT NULL,
+    detail_synced_at INTEGER,
+    messages_synced_at INTEGER
+);
+
+CREATE TABLE IF NOT EXISTS messages (
+    id TEXT NOT NULL,
+    candidate_id TEXT NOT NULL,
+    subject TEXT,
+    content TEXT,
+    since INTEGER,
+    raw TEXT NOT NULL,
+    PRIMARY KEY (candidate_id, id)
+);
+
+CREATE TABLE IF NOT EXISTS sync_state (
+    scope TEXT PRIMARY KEY,
+    last_synced_at INTEGER,
+    last_time_apply INTEGER,
+    candidates_seen INTEGER,
+    candidates_changed INTEGER,
+    last_full_sync_at INTEGER
+);
+"""
+
+# Index cho các bộ lọc của query_candidates; tạo sau khi migrate cột
+INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_candidates_opening_stage ON candidates (opening_id, stage_id, time_apply);
+CREATE INDEX IF NOT EXISTS idx_candidates_stage ON candidates (stage_id);
+CREATE INDEX IF NOT EXISTS idx_candidates_source ON candidates (source);
+CREATE INDEX IF NOT EXISTS idx_candidates_email ON candidates (email COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_candidates_email_domain ON candidates (email_domain);
+CREATE INDEX IF NOT EXISTS idx_candidates_time_apply ON candidates (time_apply);
+CREATE INDEX IF NOT EXISTS idx_messages_candidate ON messages (candidate_id, since);
+"""
+
+# Chỉ mục full-text: mỗi ứng viên có một tài liệu "profile" (thông tin trong
+# danh sách + chi tiết), mỗi tin nhắn là một tài liệu "message"
+SEARCH_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(
+    candidate_id UNINDEXED,
+    kind UNINDEXED,
+    ref UNINDEXED,
+    title,
+    body,
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+"""
+
+# Trọng số bm25 theo cột (candidate_id, kind, ref, title, body)
+SEARCH_WEIGHTS = (0.0, 0.0, 0.0, 4.0, 1.0)
+
+SEARCH_KINDS = ("profile", "message")
+
+# Các khóa của candidate/get không đưa vào chỉ mục (đường dẫn, ảnh, id...)
+_SKIP_DETAIL_KEYS = {"id", "cvs", "avatar", "avatars", "gallery", "token", "hash", "url", "link"}
+
+# Cột trả về từ query_candidates
+CANDIDATE_FIELDS = (
+    "id", "opening_id", "stage_id", "stage_name", "name", "email",
+    "phone", "source", "time_apply", "synced_at",
+)
+
+# Thứ tự sắp xếp hợp lệ cho query_candidates
+ORDER_BY = {
+    "time_apply_desc": "time_apply DESC, id",
+    "time_apply_asc": "time_apply ASC, id",
+    "name": "name COLLATE NOCASE, id",
+    "id": "id",
+}
+
+
+def _to_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_text(value):
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, dict):
+        return value.get("name") or json.dumps(value, ensure_ascii=False)
+    return str(value)
+
+
+def _email_domain(email):
+    if not email or "@" not in email:
+        return None
+    return email.rsplit("@", 1)[1].strip().lower() or None
+
+
+def _collect_text(value, out):
+    if isinstance(value, dict):
+        for key, item in value.items():
+            if key not in _SKIP_DETAIL_KEYS:
+                _collect_text(item, out)
+    elif isinstance(value, list):
+        for item in value:
+            _collect_text(item, out)
+    elif isinstance(value, str):
+        if not value.startswith(("http://", "https://")):
+            text = html_to_text(value)
+            if text:
+                out.append(text)
+
+
+def _profile_document(row):
+    """Tạo (title, body) của tài liệu profile từ một dòng bảng candidates."""
+    parts = []
+    _collect_text(json.loads(row["raw"]), parts)
+    if row["detail"]:
+        _collect_text(json.loads(row["detail"]), parts)
+    # Bỏ trùng nhưng giữ thứ tự
+    body = " · ".join(dict.fromkeys(parts))
+    return row["name"] or "", body
+
+
+def _fts_query(text):
+    """
+    Chuyển chuỗi người dùng nhập thành truy vấn FTS5 an toàn: mỗi từ được đặt
+    trong ngoặc kép (tìm tất cả các từ), từ kết thúc bằng * là tìm theo tiền tố.
+    """
+    terms = []
+    for word in text.split():
+        prefix = word.endswith("*")
+        word = word.rstrip("*").replace('"', '""')
+        if word:
+            terms.append(f'"{word}"' + ("*" if prefix else ""))
+    return " ".join(terms)
+
+
+def candidate_fingerprint(candidate):
+    """
+    Dấu vân tay của một bản ghi ứng viên trong candidate/list (băm toàn bộ bản
+    ghi, nên mọi thay đổi về stage, thời gian cập nhật... đều làm nó đổi).
+    Dấu vân tay thay đổi nghĩa là ứng viên cần tải lại chi tiết và tin nhắn.
+    """
+    canonical = json.dumps(candidate, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(canonical.encode("utf-8")).hexdigest()
+
+
+class CandidateStore:
+    """Truy cập SQLite; mỗi thread dùng một kết nối riêng."""
+
+    def __init__(self, path=None):
+        if path is None:
+            path = os.getenv("CANDIDATE_STORE_PATH") or DEFAULT_STORE_PATH
+        self.path = str(path)
+        self._local = threading.local()
+        with self.connect() as conn:
+            conn.executescript(SCHEMA)
+            self._migrate(conn)
+            conn.executescript(INDEXES)
+            self._create_search_index(conn)
+
+    def _migrate(self, conn):
+        """Bổ sung cột cho các file SQLite tạo từ phiên bản cũ."""
+        columns = {row["name"] for row in conn.execute("PRAGMA table_info(candidates)")}
+        if "email_domain" not in columns:
+            conn.execute("ALTER TABLE candidates ADD COLUMN email_domain TEXT")
+            conn.execute(
+                "UPDATE candidates SET email_domain = lower(substr(email, instr(email, '@') + 1)) "
+                "WHERE instr(email, '@') > 0"
+            )
+        if "messages_synced_at" not in columns:
+            conn.execute("ALTER TABLE candidates ADD COLUMN messages_synced_at INTEGER")
+            # Ứng viên đã có tin nhắn được coi như vừa đồng bộ tin nhắn lúc đồng bộ chi tiết
+            conn.execute(
+                "UPDATE candidates SET messages_synced_at = detail_synced_at "
+                "WHERE id IN (SELECT DISTINCT candidate_id FROM messages)"
+            )
+        state_columns = {row["name"] for row in conn.execute("PRAGMA table_info(sync_state)")}
+        if "last_full_sync_at" not in state_columns:
+            conn.execute("ALTER TABLE sync_state ADD COLUMN last_full_sync_at INTEGER")
+
+    def _create_search_index(self, conn):
+        """Tạo chỉ mục full-text; nếu file đã có dữ liệu từ trước thì dựng lại từ đầu."""
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'search_index'"
+        ).fetchone()
+        conn.executescript(SEARCH_SCHEMA)
+        if not exists:
+            self._index_all(conn)
+
+    def connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    # --- Openings ---
+
+    def upsert_openings(self, openings):
+        now = int(time.time())
+        with self.connect() as conn:
+            conn.executemany(
+                """
+                INSERT INTO openings (id, name, raw, synced_at) VALUES (?, ?, ?, ?)
+                ON CONFLICT(id) DO UPDATE SET name=excluded.name, raw=excluded.raw, synced_at=excluded.synced_at
+                """,
+                [
+                    (str(o.get("id")), o.get("name"), json.dumps(o, ensure_ascii=False), now)
+                    for o in openings if o.get("id") is not None
+                ],
+            )
+        return len(openings)
+
+    # --- Candidates ---
+
+    def candidate_fingerprints(self, candidate_ids):
+        """Trả về dict id -> fingerprint đã lưu của các ứng viên cho trước."""
+        fingerprints = {}
+        ids = [str(i) for i in candidate_ids]
+        conn = self.connect()
+        # Giới hạn số biến trong một câu lệnh SQLite
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            rows = conn.execute(
+                f"SELECT id, fingerprint FROM candidates WHERE id IN ({','.join('?' * len(chunk))})",
+                chunk,
+            )
+            fingerprints.update({row["id"]: row["fingerprint"] for row in rows})
+        return fingerprints
+
+    def upsert_candidates(self, candidates, opening_id=None, stage_id=None):
+        """
+        Ghi bản ghi danh sách của các ứng viên. Fingerprint không đổi ở đây (ứng viên
+        mới có fingerprint rỗng): nó chỉ được ghi bằng mark_synced() sau khi chi tiết
+        của ứng viên đã đồng bộ xong.
+        """
+        now = int(time.time())
+        rows = []
+        for c in candidates:
+            if c.get("id") is None:
+                continue
+            opening = c.get("opening_export") or {}
+            rows.append((
+                str(c.get("id")),
+                str(c.get("opening_id") or opening.get("id") or opening_id or "") or None,
+                _to_text(c.get("stage_id") or stage_id),
+                _to_text(c.get("stage_name")),
+                _to_text(c.get("name")),
+                _to_text(c.get("email")),
+                _email_domain(_to_text(c.get("email"))),
+                _to_text(c.get("phone")),
+                _to_text(c.get("source")),
+                _to_int(c.get("time_apply")),
+                json.dumps(c, ensure_ascii=False),
+                now,
+            ))
+        with self.connect() as conn:
+            conn.executemany(
+                """
+                INSERT INTO candidates (id, opening_id, stage_id, stage_name, name, email, email_domain, phone,
+                                        source, time_apply, fingerprint, raw, synced_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, '', ?, ?)
+                ON CONFLICT(id) DO UPDATE SET
+                    opening_id=excluded.opening_id, stage_id=excluded.stage_id, stage_name=excluded.stage_name,
+                    name=excluded.name, email=excluded.email, email_domain=excluded.email_domain,
+                    phone=excluded.phone, source=excluded.source,
+                    time_apply=excluded.time_apply, raw=excluded.raw,
+                    synced_at=excluded.synced_at
+                """,
+                rows,
+            )
+            self._index_profiles(conn, [row[0] for row in rows])
+        return len(rows)
+
+    def mark_synced(self, fingerprints, messages_synced=True):
+        """
+        Ghi fingerprint (dict id -> fingerprint) của các ứng viên đã đồng bộ xong chi tiết.
+        messages_synced=False (chạy không kèm tin nhắn): xóa mốc đồng bộ tin nhắn để
+        lần đồng bộ có tin nhắn sau đó tải lại tin nhắn của các ứng viên này.
+        """
+        sql = "UPDATE candidates SET fingerprint = ? WHERE id = ?"
+        if not messages_synced:
+            sql = "UPDATE candidates SET fingerprint = ?, messages_synced_at = NULL WHERE id = ?"
+        with self.connect() as conn:
+            conn.executemany(
+                sql,
+                [(fingerprint, str(candidate_id)) for candidate_id, fingerprint in fingerprints.items()],
+            )
+
+    def _scope_filter(self, opening_id, stage_id):
+        clauses, params = ["opening_id = ?"], [str(opening_id)]
+        if stage_id is not None:
+            clauses.append("stage_id = ?")
+            params.append(str(stage_id))
+        return " AND ".join(clauses), params
+
+    def candidate_ids(self, opening_id, stage_id=None):
+        """ID của mọi ứng viên đã lưu thuộc opening (và stage, nếu có)."""
+        where, params = self._scope_filter(opening_id, stage_id)
+        return {row["id"] for row in self.connect().execute(f"SELECT id FROM candidates WHERE {where}", params)}
+
+    def candidates_needing_messages(self, opening_id, stage_id=None, older_than=None):
+        """
+        ID các ứng viên (đã có fingerprint) mà tin nhắn chưa từng được đồng bộ,
+        hoặc đồng bộ lần cuối trước thời điểm `older_than` (epoch giây).
+        """
+        where, params = self._scope_filter(opening_id, stage_id)
+        condition = "messages_synced_at IS NULL"
+        if older_than is not None:
+            condition += " OR messages_synced_at < ?"
+            params.append(int(older_than))
+        rows = self.connect().execute(
+            f"SELECT id FROM candidates WHERE {where} AND fingerprint != '' AND ({condition})", params
+        )
+        return [row["id"] for row in rows]
+
+    def delete_candidates(self, candidate_ids):
+        """Xóa ứng viên cùng tin nhắn và chỉ mục tìm kiếm của họ."""
+        ids = [str(i) for i in candidate_ids]
+        with self.connect() as conn:
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                conn.execute(f"DELETE FROM candidates WHERE id IN ({placeholders})", chunk)
+                conn.execute(f"DELETE FROM messages WHERE candidate_id IN ({placeholders})", chunk)
+                conn.execute(f"DELETE FROM search_index WHERE candidate_id IN ({placeholders})", chunk)
+        return len(ids)
+
+    def invalidate_candidates(self, candidate_ids):
+        """Xóa fingerprint để lần đồng bộ sau tải lại các ứng viên này."""
+        with self.connect() as conn:
+            conn.executemany(
+                "UPDATE candidates SET fingerprint = '' WHERE id = ?",
+                [(str(i),) for i in candidate_ids],
+            )
+
+    def save_candidate_detail(self, candidate_id, detail):
+        with self.connect() as conn:
+            conn.execute(
+                "UPDATE candidates SET detail = ?, detail_synced_at = ? WHERE id = ?",
+                (json.dumps(detail, ensure_ascii=False), int(time.time()), str(candidate_id)),
+            )
+            self._index_profiles(conn, [str(candidate_id)])
+
+    def get_candidate(self, candidate_id):
+        row = self.connect().execute(
+            "SELECT * FROM candidates WHERE id = ?", (str(candidate_id),)
+        ).fetchone()
+        return dict(row) if row else None
+
+    def query_candidates(self, opening_id=None, stage_id=None, source=None, email=None,
+                         email_domain=None, applied_from=None, applied_to=None,
+                         order_by="time_apply_desc", limit=100, offset=0, include_raw=False):
+        """
+        Lọc ứng viên đã đồng bộ theo opening, stage, nguồn, email (không phân
+        biệt hoa thường), tên miền email và khoảng thời gian ứng tuyển
+        (timestamp giây, applied_from <= time_apply < applied_to).
+        Trả về {"total": số bản ghi khớp, "candidates": [...]}.
+        """
+        conditions, params = [], []
+        for column, value in (("opening_id", opening_id), ("stage_id", stage_id), ("source", source)):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                params.append(str(value))
+        if email is not None:
+            conditions.append("email = ? COLLATE NOCASE")
+            params.append(email)
+        if email_domain is not None:
+            conditions.append("email_domain = ?")
+            params.append(email_domain.lstrip("@").lower())
+        if applied_from is not None:
+            conditions.append("time_apply >= ?")
+            params.append(int(applied_from))
+        if applied_to is not None:
+            conditions.append("time_apply < ?")
+            params.append(int(applied_to))
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        fields = ", ".join(CANDIDATE_FIELDS + (("raw",) if include_raw else ()))
+        conn = self.connect()
+        total = conn.execute(f"SELECT COUNT(*) FROM candidates {where}", params).fetchone()[0]
+        rows = conn.execute(
+            f"SELECT {fields} FROM candidates {where} ORDER BY {ORDER_BY[order_by]} LIMIT ? OFFSET ?",
+            params + [int(limit), int(offset)],
+        )
+        candidates = []
+        for row in rows:
+            candidate = dict(row)
+            if include_raw:
+                candidate["raw"] = json.loads(candidate["raw"])
+            candidates.append(candidate)
+        return {"total": total, "candidates": candidates}
+
+    def list_openings(self):
+        rows = self.connect().execute("SELECT id, name, synced_at FROM openings ORDER BY name COLLATE NOCASE")
+        return [dict(row) for row in rows]
+
+    # --- Messages ---
+
+    def replace_messages(self, candidate_id, messages):
+        candidate_id = str(candidate_id)
+        rows = [
+            (
+                str(m.get("id") or f"{candidate_id}:{index}"),
+                candidate_id,
+                _to_text(m.get("subject")),
+                _to_text(m.get("content") or m.get("body")),
+                _to_int(m.get("since")),
+                json.dumps(m, ensure_ascii=False),
+            )
+            for index, m in enumerate(messages)
+        ]
+        with self.connect() as conn:
+            conn.execute("DELETE FROM messages WHERE candidate_id = ?", (candidate_id,))
+            conn.execute(
+                "UPDATE candidates SET messages_synced_at = ? WHERE id = ?", (int(time.time()), candidate_id)
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO messages (id, candidate_id, subject, content, since, raw) VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._index_messages(conn, candidate_id, rows)
+        return len(rows)
+
+    def get_messages(self, candidate_id):
+        rows = self.connect().execute(
+            "SELECT raw FROM messages WHERE candidate_id = ? ORDER BY since", (str(candidate_id),)
+        )
+        return [json.loads(row["raw"]) for row in rows]
+
+    # --- Tìm kiếm full-text ---
+
+    def _index_profiles(self, conn, candidate_ids):
+        for start in range(0, len(candidate_ids), 500):
+            chunk = candidate_ids[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            conn.execute(
+                f"DELETE FROM search_index WHERE kind = 'profile' AND candidate_id IN ({placeholders})", chunk
+            )
+            rows = conn.execute(f"SELECT id, name, raw, detail FROM candidates WHERE id IN ({placeholders})", chunk)
+            conn.executemany(
+                "INSERT INTO search_index (candidate_id, kind, ref, title, body) VALUES (?, 'profile', NULL, ?, ?)",
+                [(row["id"], *_profile_document(row)) for row in rows],
+            )
+
+    def _index_messages(self, conn, candidate_id, rows):
+        """rows: các bộ (id, candidate_id, subject, content, ...) vừa ghi vào bảng messages."""
+        conn.execute("DELETE FROM search_index WHERE kind = 'message' AND candidate_id = ?", (candidate_id,))
+        conn.executemany(
+            "INSERT INTO search_index (candidate_id, kind, ref, title, body) VALUES (?, 'message', ?, ?, ?)",
+            [(candidate_id, row[0], html_to_text(row[2]), html_to_text(row[3])) for row in rows],
+        )
+
+    def _index_all(self, conn):
+        conn.execute("DELETE FROM search_index")
+        ids = [row["id"] for row in conn.execute("SELECT id FROM candidates")]
+        self._index_profiles(conn, ids)
+        rows = conn.execute("SELECT candidate_id, id, subject, content FROM messages")
+        conn.executemany(
+            "INSERT INTO search_index (candidate_id, kind, ref, title, body) VALUES (?, 'message', ?, ?, ?)",
+            [
+                (row["candidate_id"], row["id"], html_to_text(row["subject"]), html_to_text(row["content"]))
+                for row in rows
+            ],
+        )
+
+    def rebuild_search_index(self):
+        """Dựng lại toàn bộ chỉ mục full-text từ các bảng candidates và messages."""
+        with self.connect() as conn:
+            self._index_all(conn)
+            conn.execute("INSERT INTO search_index (search_index) VALUES ('optimize')")
+
+    def search(self, query, opening_id=None, kind=None, per_candidate=True, limit=20, offset=0):
+        """
+        Tìm kiếm full-text trong hồ sơ và tin nhắn của ứng viên đã đồng bộ,
+        xếp hạng theo bm25 (khớp ở tiêu đề/tên được ưu tiên hơn nội dung).
+        per_candidate=True chỉ giữ kết quả tốt nhất của mỗi ứng viên.
+        Trả về {"total", "results": [{candidate_id, name, kind, ref, score, snippet, ...}]}.
+        Ném ValueError nếu truy vấn rỗng.
+        """
+        match = _fts_query(query or "")
+        if not match:
+            raise ValueError("Truy vấn tìm kiếm rỗng")
+
+        conditions, params = ["search_index MATCH ?"], [match]
+        if kind is not None:
+            conditions.append("s.kind = ?")
+            params.append(kind)
+        if opening_id is not None:
+            conditions.append("c.opening_id = ?")
+            params.append(str(opening_id))
+        weights = ", ".join(str(w) for w in SEARCH_WEIGHTS)
+        hits = f"""
+            SELECT s.candidate_id, s.kind, s.ref, c.name, c.email, c.opening_id, c.stage_name,
+                   bm25(search_index, {weights}) AS score,
+                   snippet(search_index, -1, '<mark>', '</mark>', '…', 16) AS snippet
+            FROM search_index s
+            LEFT JOIN candidates c ON c.id = s.candidate_id
+            WHERE {' AND '.join(conditions)}
+        """
+        if per_candidate:
+            hits = f"""
+                SELECT * FROM (
+                    SELECT *, ROW_NUMBER() OVER (PARTITION BY candidate_id ORDER BY score) AS position
+                    FROM ({hits})
+                ) WHERE position = 1
+            """
+
+        conn = self.connect()
+        total = conn.execute(f"SELECT COUNT(*) FROM ({hits})", params).fetchone()[0]
+        rows = conn.execute(
+            f"SELECT * FROM ({hits}) ORDER BY score LIMIT ? OFFSET ?",
+            params + [int(limit), int(offset)],
+        )
+        results = []
+        for row in rows:
+            result = dict(row)
+            result.pop("position", None)
+            # bm25 trả về số âm, càng nhỏ càng khớp; đổi dấu cho dễ đọc
+            result["score"] = round(-result["score"], 6)
+            results.append(result)
+        return {"total": total, "results": results}
+
+    # --- Trạng thái đồng bộ ---
+
+    def get_sync_state(self, scope):
+        row = self.connect().execute("SELECT * FROM sync_state WHERE scope = ?", (scope,)).fetchone()
+        return dict(row) if row else None
+
+    def set_sync_state(self, scope, last_time_apply, candidates_seen, candidates_changed, full_listing=False):
+        """full_listing=True: lần đồng bộ này đã đọc hết danh sách (ghi lại last_full_sync_at)."""
+        now = int(time.time())
+        with self.connect() as conn:
+            conn.execute(
+                """
+                INSERT INTO sync_state (scope, last_synced_at, last_time_apply, candidates_seen, candidates_changed,
+                                        last_full_sync_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(scope) DO UPDATE SET
+                    last_synced_at=excluded.last_synced_at, last_time_apply=excluded.last_time_apply,
+                    candidates_seen=excluded.candidates_seen, candidates_changed=excluded.candidates_changed,
+                    last_full_sync_at=COALESCE(excluded.last_full_sync_at, sync_state.last_full_sync_at)
+                """,
+                (scope, now, last_time_apply, candidates_seen, candidates_changed, now if full_listing else None),
+            )
+
+    def counts(self):
+        conn = self.connect()
+        return {
+            table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            for table in ("openings", "candidates", "messages")
+        }
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """Trả về CandidateStore dùng chung (đường dẫn từ CANDIDATE_STORE_PATH)."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = CandidateStore()
+    return _store
@@ -0,0 +1,141 @@
+# circuit_breaker.py
+"""
+Circuit breaker theo endpoint cho các lời gọi Base.vn.
+
+Sau failure_threshold lỗi liên tiếp (lỗi kết nối, timeout hoặc 5xx) của một
+endpoint, breaker chuyển sang "open": mọi lời gọi tới endpoint đó thất bại
+ngay bằng CircuitOpenError thay vì chờ timeout. Hết recovery_timeout giây,
+breaker cho một lời gọi thử ("half_open"); thành công thì đóng lại, lỗi thì
+mở tiếp. Lỗi được tính theo lời gọi, sau khi đã hết lượt thử lại.
+"""
+
+import os
+import threading
+import time
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(ConnectionError):
+    """Endpoint đang bị ngắt mạch; là ConnectionError nên các handler hiện có trả về 502."""
+
+    def __init__(self, endpoint, retry_in):
+        super().__init__(
+            f"Base.vn endpoint {endpoint} tạm thời bị ngắt sau nhiều lỗi liên tiếp, thử lại sau {retry_in:.1f}s"
+        )
+        self.endpoint = endpoint
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """
+    - failure_threshold: số lỗi liên tiếp để mở mạch
+    - recovery_timeout: số giây mở mạch trước khi cho lời gọi thử
+    """
+
+    def __init__(self, endpoint, failure_threshold=5, recovery_timeout=30.0):
+        self.endpoint = endpoint
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.rejected = 0
+        self.times_opened = 0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def retry_in(self):
+        return max(0.0, self.opened_at + self.recovery_timeout - time.monotonic())
+
+    def before_call(self):
+        """Gọi trước khi gửi yêu cầu; ném CircuitOpenError nếu mạch đang mở."""
+        with self._lock:
+            if self.state == OPEN and self.retry_in() <= 0:
+                self.state = HALF_OPEN
+                self._probing = False
+            if self.state == CLOSED:
+                return
+            if self.state == HALF_OPEN and not self._probing:
+                # Chỉ một lời gọi thử tại một thời điểm
+                self._probing = True
+                return
+            self.rejected += 1
+            raise CircuitOpenError(self.endpoint, self.retry_in())
+
+    def record_success(self):
+        with self._lock:
+            self.state = CLOSED
+            self.failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    self.times_opened += 1
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+
+    def release(self):
+        """Lời gọi kết thúc mà không có kết quả (bị hủy, lỗi cục bộ): chỉ trả lại lượt gọi thử."""
+        with self._lock:
+            self._probing = False
+
+    def record_status(self, status_code):
+        """5xx tính là lỗi của Base.vn; các mã khác (kể cả 4xx) nghĩa là endpoint vẫn phản hồi."""
+        if status_code >= 500:
+            self.record_failure()
+        else:
+            self.record_success()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "state": self.state,
+                "failures": self.failures,
+                "times_opened": self.times_opened,
+                "rejected": self.rejected,
+                "retry_in": round(self.retry_in(), 1) if self.state == OPEN else 0,
+            }
+
+
+def _env_number(name, default, cast):
+    try:
+        return cast(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+class CircuitBreakerRegistry:
+    """Một CircuitBreaker cho mỗi endpoint, tạo khi dùng lần đầu."""
+
+    def __init__(self, failure_threshold=None, recovery_timeout=None):
+        if failure_threshold is None:
+            failure_threshold = _env_number("BASE_API_BREAKER_THRESHOLD", 5, int)
+        if recovery_timeout is None:
+            recovery_timeout = _env_number("BASE_API_BREAKER_RECOVERY", 30.0, float)
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    def get(self, endpoint):
+        breaker = self._breakers.get(endpoint)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.setdefault(
+                    endpoint, CircuitBreaker(endpoint, self.failure_threshold, self.recovery_timeout)
+                )
+        return breaker
+
+    def stats(self):
+        return {endpoint: breaker.stats() for endpoint, breaker in sorted(self._breakers.items())}
+
+
+# Dùng chung cho api_client và async_api_client
+circuit_breakers = CircuitBreakerRegistry()
@@ -2,47 +2,94 @@
 
 import pandas as pd
 
+from metrics import timed
+from tracing import traced
+
+# Các cột của bảng ứng viên, theo thứ tự hiển thị
+CANDIDATE_COLUMNS = [
+    "ID",
+    "Họ & Tên",
+    "Email",
+    "SĐT",
+    "Vị trí ứng tuyển",
+    "Giai đoạn",
+    "Nguồn",
+    "CV Link",
+]
+
+
+def extract_candidate_columns(candidates_list):
+    """
+    Trích xuất dữ liệu hiển thị theo cột: mỗi cột đầu ra được lấy trong
+    một lượt duyệt danh sách ứng viên. Trả về dict tên cột -> list giá trị.
+    """
+    columns = [
+        [c.get('id') for c in candidates_list],
+        [c.get('name') for c in candidates_list],
+        [c.get('email') for c in candidates_list],
+        [c.get('phone') for c in candidates_list],
+        [(c.get('opening_export') or {}).get('name', 'N/A') for c in candidates_list],
+        [c.get('stage_name', 'N/A') for c in candidates_list],
+        [c.get('source', 'N/A') for c in candidates_list],
+        # Lấy CV đầu tiên, nếu không có thì 'Không có'
+        [(c.get('cvs') or ['Không có'])[0] for c in candidates_list],
+    ]
+    return dict(zip(CANDIDATE_COLUMNS, columns))
+
+
+def _extract_metrics(json_data):
+    return {
+        "total": json_data.get('total', 'N/A'),
+        "count": json_data.get('count', 'N/A'),
+        "page": json_data.get('page', 'N/A'),
+    }
+
+
+@timed("process_candidate_records")
+@traced("process")
+def process_candidate_records(json_data):
+    """
+    Giống process_candidate_data nhưng trả về danh sách record (list các dict
+    theo CANDIDATE_COLUMNS) thay vì DataFrame, dùng cho các endpoint trả JSON
+    để không phải tạo rồi chuyển ngược DataFrame.
+    """
+    candidates_list = json_data.get('candidates', [])
+    metrics = _extract_metrics(json_data)
+
+    if not candidates_list:
+        return {"metrics": metrics, "records": [], "count_candidates": 0}
+
+    columns = extract_candidate_columns(candidates_list).values()
+    records = [dict(zip(CANDIDATE_COLUMNS, row)) for row in zip(*columns)]
+
+    return {
+        "metrics": metrics,
+        "records": records,
+        "count_candidates": len(candidates_list)
+    }
+
+
+@timed("process_candidate_data")
+@traced("process")
 def process_candidate_data(json_data):
     """
     Xử lý JSON phản hồi từ API Base.vn và trả về một Dict chứa
     DataFrame ứng viên và các chỉ số quan trọng.
     """
-    
+
     candidates_list = json_data.get('candidates', [])
-    
+
     # 1. Trích xuất chỉ số tổng quan
-    metrics = {
-        "total": json_data.get('total', 'N/A'),
-        "count": json_data.get('count', 'N/A'),
-        "page": json_data.get('page', 'N/A'),
-    }
+    metrics = _extract_metrics(json_data)
 
     if not candidates_list:
         return {"metrics": metrics, "dataframe": pd.DataFrame(), "count_candidates": 0}
 
-    # 2. Chuẩn bị dữ liệu cho DataFrame
-    display_data = []
-    for c in candidates_list:
-        # Xử lý CV link an toàn
-        cvs = c.get('cvs', [])
-        cv_link = cvs[0] if cvs and len(cvs) > 0 else 'Không có'
-        
-        display_data.append({
-            "ID": c.get('id'),
-            "Họ & Tên": c.get('name'),
-            "Email": c.get('email'),
-            "SĐT": c.get('phone'),
-            "Vị trí ứng tuyển": c.get('opening_export', {}).get('name', 'N/A'),
-            "Giai đoạn": c.get('stage_name', 'N/A'),
-            "Nguồn": c.get('source', 'N/A'),
-            "CV Link": cv_link
-        })
-        
-    # 3. Tạo DataFrame
-    df = pd.DataFrame(display_data)
-    
+    # 2. Chuẩn bị dữ liệu theo cột và tạo DataFrame
+    df = pd.DataFrame(extract_candidate_columns(candidates_list), columns=CANDIDATE_COLUMNS)
+
     return {
-        "metrics": metrics, 
-        "dataframe": df, 
+        "metrics": metrics,
+        "dataframe": df,
         "count_candidates": len(candidates_list)
-    }
\ No newline at end of file
+    }
@@ -0,0 +1,78 @@
+# json_backend.py
+"""
+Encode/decode JSON cho proxy với backend chọn được qua cấu hình.
+
+JSON_BACKEND=auto (mặc định) dùng orjson nếu đã cài, ngược lại dùng module
+json chuẩn; JSON_BACKEND=orjson hoặc JSON_BACKEND=std để chọn cố định.
+"""
+
+import json
+import os
+
+from fastapi.responses import JSONResponse
+
+from tracing import span
+
+try:
+    import orjson
+except ImportError:  # orjson là tùy chọn
+    orjson = None
+
+BACKENDS = ("auto", "orjson", "std")
+
+_backend = "std"
+
+
+def set_backend(name):
+    """Chọn backend JSON ('auto', 'orjson' hoặc 'std') và trả về backend thực sự được dùng."""
+    global _backend
+    name = (name or "auto").lower()
+    if name not in BACKENDS:
+        raise ValueError(f"JSON backend không hợp lệ: {name} (chọn một trong {', '.join(BACKENDS)})")
+    if name == "orjson" and orjson is None:
+        raise ImportError("JSON_BACKEND=orjson nhưng chưa cài orjson (pip install orjson)")
+    if name == "auto":
+        name = "orjson" if orjson is not None else "std"
+    _backend = name
+    return _backend
+
+
+def get_backend():
+    return _backend
+
+
+def loads(data):
+    """Giải mã JSON từ bytes/str."""
+    if _backend == "orjson":
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj):
+    """Mã hóa obj thành JSON bytes (UTF-8, không escape ký tự Unicode)."""
+    if _backend == "orjson":
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(
+        obj,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def decode_response(response):
+    """Giải mã body JSON của phản hồi upstream (requests, httpx hoặc CachedResponse)."""
+    with span("decode"):
+        return loads(response.content)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse mã hóa bằng backend đã chọn."""
+
+    def render(self, content):
+        with span("serialize"):
+            return dumps(content)
+
+
+set_backend(os.getenv("JSON_BACKEND", "auto"))
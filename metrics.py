@@ -0,0 +1,374 @@
+# metrics.py
+"""
+Metrics dạng Prometheus (text exposition format 0.0.4) cho hai server FastAPI.
+
+Không phụ thuộc prometheus_client: registry tối giản với Counter, Gauge và
+Histogram có nhãn, cộng thêm các "collector" đọc số liệu lúc scrape (cache,
+single-flight, circuit breaker, connection pool...).
+
+- MetricsMiddleware: đếm request và đo thời gian theo route (đường dẫn mẫu
+  như /candidate/{candidate_id}, không phải URL thật, để số nhãn có giới hạn)
+- observe_upstream(): thời gian và mã trạng thái của từng lời gọi Base.vn
+- timed(): decorator đo thời gian một hàm xử lý
+- render(): toàn bộ metrics dạng text cho route /metrics
+"""
+
+import functools
+import logging
+import threading
+import time
+
+logger = logging.getLogger("metrics")
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Giây; phủ từ cache hit (vài ms) tới lời gọi Base.vn chậm
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    type_name = "untyped"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} cần các nhãn {self.labelnames}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def header(self):
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def collect(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in items
+        ]
+
+
+class Gauge(_Metric):
+    type_name = "gauge"
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def collect(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in items
+        ]
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # [số đếm theo bucket..., tổng, số lần]
+                state = self._values[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+                    break
+            state[-2] += value
+            state[-1] += 1
+
+    def collect(self):
+        with self._lock:
+            items = sorted((key, list(state)) for key, state in self._values.items())
+        lines = self.header()
+        for key, state in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, state):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, ("le", _format_value(float(bound))))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key, ("le", "+Inf"))
+            lines.append(f"{self.name}_bucket{labels} {state[-1]}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(state[-2])}")
+            lines.append(f"{self.name}_count{labels} {state[-1]}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+        self.collector_errors = Counter(
+            "metrics_collector_errors_total", "Scrape-time collectors that raised, by collector.", ("collector",)
+        )
+        self.register(self.collector_errors)
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def register_collector(self, fn):
+        """fn() trả về list các metric (thường là Gauge/Counter tạo mới) tính lúc scrape."""
+        self._collectors.append(fn)
+        return fn
+
+    def render(self):
+        lines = []
+        collected = []
+        # Chạy collector trước để lỗi của lần scrape này có trong metrics_collector_errors_total
+        for collector in self._collectors:
+            try:
+                collected.extend(collector())
+            except Exception:
+                # Một collector lỗi không được làm hỏng cả trang /metrics, nhưng phải để lại dấu vết
+                name = getattr(collector, "__name__", repr(collector))
+                logger.exception("Collector metrics %s lỗi", name)
+                self.collector_errors.inc(collector=name)
+        for metric in self._metrics + collected:
+            lines.extend(metric.collect())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_requests_total = registry.register(Counter(
+    "http_requests_total", "HTTP requests handled, by route and status.", ("method", "route", "status")
+))
+http_request_duration_seconds = registry.register(Histogram(
+    "http_request_duration_seconds", "Time to fully send the HTTP response, by route.", ("method", "route")
+))
+upstream_requests_total = registry.register(Counter(
+    "base_api_requests_total",
+    "Calls sent to Base.vn, by endpoint and status code ('error' for connection errors/timeouts).",
+    ("endpoint", "status"),
+))
+upstream_request_duration_seconds = registry.register(Histogram(
+    "base_api_request_duration_seconds", "Latency of calls to Base.vn, by endpoint.", ("endpoint",)
+))
+processing_duration_seconds = registry.register(Histogram(
+    "processing_duration_seconds", "Time spent in local data processing functions.", ("function",),
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+))
+
+
+def observe_upstream(endpoint, status, seconds):
+    """Ghi nhận một lần gửi yêu cầu tới Base.vn (mỗi lần thử lại tính riêng)."""
+    upstream_requests_total.inc(endpoint=endpoint, status=status)
+    upstream_request_duration_seconds.observe(seconds, endpoint=endpoint)
+
+
+def timed(name):
+    """Decorator đo thời gian chạy của hàm vào processing_duration_seconds{function=name}."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                processing_duration_seconds.observe(time.perf_counter() - start, function=name)
+        return wrapper
+    return decorator
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware đo mỗi request HTTP tới khi gửi xong body (kể cả
+    StreamingResponse), gắn nhãn bằng route đã khớp.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "unmatched"
+            method = scope.get("method", "")
+            http_requests_total.inc(method=method, route=route_path, status=status)
+            http_request_duration_seconds.observe(time.perf_counter() - start, method=method, route=route_path)
+
+
+def render():
+    return registry.render()
+
+
+# Các collector lúc scrape, mỗi nhóm số liệu một collector để lỗi ở một nhóm
+# không làm mất các nhóm khác. Import muộn: metrics được import bởi các module này.
+
+def _cache_metrics():
+    """Kích thước và tỉ lệ trúng của cache phản hồi Base.vn."""
+    from response_cache import response_cache
+
+    cache = response_cache.stats()
+    cache_gauge = Gauge("response_cache_entries", "Entries in the upstream response cache.")
+    cache_gauge.set(cache["size"])
+    cache_counter = Counter("response_cache_lookups_total", "Response cache lookups by result.", ("result",))
+    for result, key in (("hit", "hits"), ("stale", "stale_hits"), ("miss", "misses")):
+        cache_counter.inc(cache[key], result=result)
+    cache_removed = Counter("response_cache_removed_total", "Entries removed from the response cache.", ("reason",))
+    cache_removed.inc(cache["evictions"], reason="evicted")
+    cache_removed.inc(cache["expirations"], reason="expired")
+    return [cache_gauge, cache_counter, cache_removed]
+
+
+def _singleflight_metrics():
+    """Số lời gọi Base.vn đang chạy và số lời gọi được gộp của hai client."""
+    import api_client
+    import async_api_client
+
+    inflight_gauge = Gauge("singleflight_in_flight", "Distinct upstream calls in flight.", ("client",))
+    coalesced = Counter("singleflight_calls_total", "Single-flight calls by role.", ("client", "role"))
+    for client, flight in (("sync", api_client.inflight), ("async", async_api_client.inflight)):
+        stats = flight.stats()
+        inflight_gauge.set(stats["in_flight"], client=client)
+        coalesced.inc(stats["leaders"], client=client, role="leader")
+        coalesced.inc(stats["shared"], client=client, role="shared")
+    return [inflight_gauge, coalesced]
+
+
+def _circuit_breaker_metrics():
+    """Trạng thái và số lời gọi bị từ chối của circuit breaker theo endpoint."""
+    from circuit_breaker import circuit_breakers, CLOSED, HALF_OPEN
+
+    state_values = {CLOSED: 0, HALF_OPEN: 1}
+    breaker_state = Gauge(
+        "circuit_breaker_state", "Circuit breaker state per endpoint (0 closed, 1 half-open, 2 open).", ("endpoint",)
+    )
+    breaker_rejected = Counter("circuit_breaker_rejected_total", "Calls rejected by an open breaker.", ("endpoint",))
+    for endpoint, stats in circuit_breakers.stats().items():
+        breaker_state.set(state_values.get(stats["state"], 2), endpoint=endpoint)
+        breaker_rejected.inc(stats["rejected"], endpoint=endpoint)
+    return [breaker_state, breaker_rejected]
+
+
+def _rate_limit_metrics():
+    """Tốc độ gọi Base.vn hiện tại và số lần thử lại."""
+    import rate_limit
+
+    limiter = rate_limit.rate_limiter.stats()
+    rate_gauge = Gauge("base_api_rate_limit", "Current adaptive rate limit towards Base.vn (requests/second).")
+    rate_gauge.set(limiter["rate"] if limiter["enabled"] else 0)
+    retries = Counter("base_api_retries_total", "Retried calls to Base.vn.")
+    retries.inc(rate_limit.retry_policy.stats()["retries"])
+    return [rate_gauge, retries]
+
+
+def _sync_pool_idle(client):
+    # Hàng đợi của urllib3 chứa sẵn None cho các chỗ trống; chỉ đếm kết nối thật đang rảnh
+    idle = 0
+    for adapter in set(client.session.adapters.values()):
+        for key in list(adapter.poolmanager.pools.keys()):
+            conn_pool = adapter.poolmanager.pools.get(key)
+            if conn_pool is not None and conn_pool.pool is not None:
+                idle += sum(1 for conn in list(conn_pool.pool.queue) if conn is not None)
+    return {"idle": idle}
+
+
+def _async_pool_counts(client):
+    # httpx không có API công khai cho trạng thái pool; đọc từ transport của httpcore
+    connections = client.client._transport._pool.connections
+    idle = sum(1 for c in connections if c.is_idle())
+    return {"idle": idle, "active": len(connections) - idle}
+
+
+# Client mà cấu trúc pool không còn như mong đợi (đã ghi log một lần)
+_pool_unsupported = set()
+
+
+def _pool_metrics():
+    """
+    Số kết nối tới Base.vn trong pool của hai client. Số liệu này đọc thuộc tính nội bộ
+    của urllib3/httpcore: nếu một bản nâng cấp đổi chúng, client đó bị bỏ qua (ghi log
+    một lần) thay vì làm hỏng collector.
+    """
+    import api_client
+    import async_api_client
+
+    pool = Gauge("base_api_pool_connections", "Open connections to Base.vn by client and state.", ("client", "state"))
+    for name, client, count in (
+        ("sync", api_client._client, _sync_pool_idle),
+        ("async", async_api_client._client, _async_pool_counts),
+    ):
+        if client is None or name in _pool_unsupported:
+            continue
+        try:
+            counts = count(client)
+        except (AttributeError, TypeError):
+            _pool_unsupported.add(name)
+            logger.warning("Không đọc được trạng thái connection pool của client %s, bỏ qua metric này", name,
+                           exc_info=True)
+            continue
+        for state, value in counts.items():
+            pool.set(value, client=name, state=state)
+    return [pool]
+
+
+registry.register_collector(_cache_metrics)
+registry.register_collector(_singleflight_metrics)
+registry.register_collector(_circuit_breaker_metrics)
+registry.register_collector(_rate_limit_metrics)
+registry.register_collector(_pool_metrics)
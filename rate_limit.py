@@ -0,0 +1,205 @@
+# rate_limit.py
+"""
+Giới hạn tốc độ gọi Base.vn phía client và chính sách thử lại.
+
+- AdaptiveRateLimiter: token bucket dùng chung cho mọi fetcher (cả api_client
+  lẫn async_api_client). Tốc độ tự điều chỉnh kiểu AIMD: tăng dần khi các yêu
+  cầu thành công, giảm theo cấp số nhân khi Base.vn trả về 429, và tạm dừng
+  toàn bộ theo Retry-After nếu có.
+- RetryPolicy: thử lại lỗi kết nối, 429 và 5xx với backoff lũy thừa có jitter,
+  ưu tiên thời gian chờ trong header Retry-After.
+"""
+
+import asyncio
+import os
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+# Mã trạng thái nên thử lại (bị giới hạn tốc độ hoặc lỗi tạm thời phía Base.vn)
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+def _env_float(name, default):
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def parse_retry_after(value):
+    """Đổi header Retry-After (số giây hoặc HTTP-date) thành số giây chờ; None nếu không hợp lệ."""
+    if not value:
+        return None
+    value = str(value).strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError, IndexError, OverflowError):
+        return None
+
+
+class AdaptiveRateLimiter:
+    """
+    Token bucket an toàn đa luồng với tốc độ thích nghi (AIMD).
+
+    - rate: số yêu cầu/giây ban đầu; <= 0 là tắt giới hạn
+    - burst: số token tối đa (số yêu cầu được phép dồn ngay một lúc)
+    - min_rate / max_rate: khoảng điều chỉnh tốc độ
+    - increase: số yêu cầu/giây cộng thêm sau mỗi giây gọi thành công
+    - decrease: hệ số nhân tốc độ khi gặp 429 (tối đa một lần mỗi cooldown giây)
+    """
+
+    def __init__(self, rate=10.0, burst=10, min_rate=1.0, max_rate=50.0,
+                 increase=1.0, decrease=0.5, cooldown=1.0):
+        self.enabled = rate > 0
+        self.rate = float(rate)
+        self.burst = max(1.0, float(burst))
+        self.min_rate = min(float(min_rate), self.rate) if self.enabled else float(min_rate)
+        self.max_rate = max(float(max_rate), self.rate)
+        self.increase = float(increase)
+        self.decrease = float(decrease)
+        self.cooldown = float(cooldown)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._last_decrease = 0.0
+        self._lock = threading.Lock()
+        self.throttled = 0
+        self.waited_seconds = 0.0
+
+    def _refill(self, now):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self):
+        """
+        Lấy một token và trả về số giây phải chờ trước khi gửi yêu cầu.
+        Token có thể bị "vay trước" (số âm) để các lời gọi đồng thời xếp hàng đúng thứ tự.
+        """
+        if not self.enabled:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens -= 1
+            wait = max(0.0, -self._tokens / self.rate, self._paused_until - now)
+            if wait > 0:
+                self.throttled += 1
+                self.waited_seconds += wait
+            return wait
+
+    def acquire(self):
+        """Chờ (chặn thread) tới lượt gửi yêu cầu."""
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        """Như acquire() nhưng không chặn event loop."""
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def on_response(self, status_code, retry_after=None):
+        """Cập nhật tốc độ theo kết quả một yêu cầu: tăng cộng khi thành công, giảm nhân khi 429."""
+        if not self.enabled:
+            return
+        with self._lock:
+            now = time.monotonic()
+            if status_code == 429:
+                if now - self._last_decrease >= self.cooldown:
+                    self._refill(now)
+                    self.rate = max(self.min_rate, self.rate * self.decrease)
+                    self._last_decrease = now
+                if retry_after:
+                    self._paused_until = max(self._paused_until, now + retry_after)
+            elif status_code < 500:
+                # Cộng khoảng increase yêu cầu/giây sau mỗi giây chạy ở tốc độ hiện tại
+                self._refill(now)
+                self.rate = min(self.max_rate, self.rate + self.increase / self.rate)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "rate": round(self.rate, 3),
+                "burst": self.burst,
+                "min_rate": self.min_rate,
+                "max_rate": self.max_rate,
+                "throttled": self.throttled,
+                "waited_seconds": round(self.waited_seconds, 3),
+            }
+
+
+class RetryPolicy:
+    """
+    Quyết định có thử lại không và chờ bao lâu.
+
+    - max_retries: số lần thử lại tối đa (không tính lần gọi đầu)
+    - backoff_base / backoff_max: backoff = random(0, min(backoff_max, backoff_base * 2**attempt))
+    """
+
+    def __init__(self, max_retries=3, backoff_base=0.5, backoff_max=30.0):
+        self.max_retries = int(max_retries)
+        self.backoff_base = float(backoff_base)
+        self.backoff_max = float(backoff_max)
+        self.retries = 0
+
+    def next_delay(self, attempt, status_code=None, retry_after=None):
+        """
+        attempt: số lần đã thử lại trước đó (0 cho lần gọi đầu).
+        status_code=None nghĩa là lỗi kết nối. Trả về số giây chờ, hoặc None nếu không thử lại.
+        """
+        if attempt >= self.max_retries:
+            return None
+        if status_code is not None and status_code not in RETRY_STATUSES:
+            return None
+        self.retries += 1
+        if retry_after is not None:
+            return min(retry_after, self.backoff_max)
+        # "Full jitter": tránh các client thử lại cùng một thời điểm
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def stats(self):
+        return {"max_retries": self.max_retries, "retries": self.retries}
+
+
+def _create_limiter():
+    return AdaptiveRateLimiter(
+        rate=_env_float("BASE_API_RATE_LIMIT", 10.0),
+        burst=_env_float("BASE_API_RATE_BURST", 10),
+        min_rate=_env_float("BASE_API_RATE_MIN", 1.0),
+        max_rate=_env_float("BASE_API_RATE_MAX", 50.0),
+    )
+
+
+def _create_retry_policy():
+    return RetryPolicy(
+        max_retries=int(_env_float("BASE_API_MAX_RETRIES", 3)),
+        backoff_base=_env_float("BASE_API_BACKOFF_BASE", 0.5),
+        backoff_max=_env_float("BASE_API_BACKOFF_MAX", 30.0),
+    )
+
+
+# Dùng chung cho api_client và async_api_client: giới hạn áp dụng cho toàn tiến trình
+rate_limiter = _create_limiter()
+retry_policy = _create_retry_policy()
+
+
+def configure_rate_limit(**kwargs):
+    """Thay rate_limiter dùng chung (xem tham số của AdaptiveRateLimiter)."""
+    global rate_limiter
+    rate_limiter = AdaptiveRateLimiter(**kwargs)
+    return rate_limiter
+
+
+def configure_retry(**kwargs):
+    """Thay retry_policy dùng chung (xem tham số của RetryPolicy)."""
+    global retry_policy
+    retry_policy = RetryPolicy(**kwargs)
+    return retry_policy
@@ -0,0 +1,225 @@
+# response_cache.py
+"""
+Cache trong tiến trình cho các phản hồi đọc từ Base.vn.
+
+Khóa cache gồm (endpoint, tham số, hash của access_token); mỗi endpoint có
+TTL riêng, tổng số mục bị giới hạn và mục ít dùng nhất bị loại trước (LRU).
+Hết TTL, mục còn được giữ thêm stale_ttl giây để trả về dạng "stale" trong
+khi làm mới ở nền hoặc khi Base.vn gặp sự cố (stale-while-revalidate).
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlparse
+
+# TTL mặc định (giây) theo endpoint; 0 = không cache
+DEFAULT_TTLS = {
+    "opening/list": 300,
+    "opening/get": 300,
+    "candidate/get": 120,
+    "candidate/messages": 60,
+    "candidate/list": 0,
+}
+
+
+class CachedResponse:
+    """Bản chụp của một phản hồi HTTP, dùng chung được cho cả requests và httpx."""
+
+    def __init__(self, status_code, content, headers=None, encoding=None, created_at=None, stale=False):
+        self.status_code = status_code
+        self.content = content
+        self.headers = dict(headers or {})
+        self.encoding = encoding or "utf-8"
+        self.created_at = time.time() if created_at is None else created_at
+        # True khi đã quá TTL và được trả về trong lúc chờ làm mới
+        self.stale = stale
+
+    @classmethod
+    def from_response(cls, response):
+        return cls(
+            response.status_code,
+            response.content,
+            response.headers,
+            response.encoding,
+        )
+
+    def as_stale(self):
+        return CachedResponse(
+            self.status_code, self.content, self.headers, self.encoding,
+            created_at=self.created_at, stale=True,
+        )
+
+    @property
+    def age(self):
+        """Số giây kể từ khi nhận phản hồi từ Base.vn."""
+        return max(0, int(time.time() - self.created_at))
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding, errors="replace")
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class TTLCache:
+    """
+    Cache LRU có giới hạn kích thước, mỗi mục có thời hạn riêng. Mục hết hạn
+    vẫn được giữ thêm stale_ttl giây (nếu có) để đọc bằng get_stale().
+    """
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.stale_hits = 0
+
+    def _lookup(self, key, allow_stale):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None, False
+            expires_at, stale_until, value = entry
+            fresh = expires_at > now
+            if not fresh and stale_until <= now:
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return None, False
+            if not fresh and not allow_stale:
+                self.misses += 1
+                return None, False
+            self._data.move_to_end(key)
+            if fresh:
+                self.hits += 1
+            else:
+                self.stale_hits += 1
+            return value, fresh
+
+    def get(self, key):
+        """Giá trị còn hạn, hoặc None."""
+        return self._lookup(key, allow_stale=False)[0]
+
+    def get_stale(self, key):
+        """Trả về (value, fresh): value có thể đã quá TTL nhưng còn trong stale_ttl."""
+        return self._lookup(key, allow_stale=True)
+
+    def set(self, key, value, ttl, stale_ttl=0):
+        with self._lock:
+            expires_at = time.monotonic() + ttl
+            self._data[key] = (expires_at, expires_at + stale_ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.stale_hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "stale_hits": self.stale_hits,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+def endpoint_of(url):
+    """'https://hiring.base.vn/publicapi/v2/opening/list' -> 'opening/list'"""
+    parts = urlparse(url).path.rstrip("/").split("/")
+    return "/".join(parts[-2:])
+
+
+def token_hash(access_token):
+    return hashlib.sha256(str(access_token).encode("utf-8")).hexdigest()[:16]
+
+
+class ResponseCache(TTLCache):
+    """TTLCache với chính sách TTL theo endpoint và khóa (endpoint, params, token hash)."""
+
+    def __init__(self, maxsize=1024, ttls=None, stale_ttl=0):
+        super().__init__(maxsize=maxsize)
+        self.stale_ttl = stale_ttl
+        self.ttls = dict(DEFAULT_TTLS)
+        if ttls:
+            self.ttls.update(ttls)
+
+    def ttl_for(self, endpoint):
+        return self.ttls.get(endpoint, 0)
+
+    def key_for(self, endpoint, payload_params):
+        params = tuple(sorted(
+            (k, str(v)) for k, v in payload_params.items() if k != "access_token"
+        ))
+        return (endpoint, params, token_hash(payload_params.get("access_token", "")))
+
+    def stats(self):
+        result = super().stats()
+        result["ttls"] = dict(self.ttls)
+        result["stale_ttl"] = self.stale_ttl
+        return result
+
+
+def _ttls_from_env():
+    """Đọc TTL từ biến môi trường, ví dụ CACHE_TTL_OPENING_LIST=600."""
+    ttls = {}
+    for endpoint in DEFAULT_TTLS:
+        env_name = "CACHE_TTL_" + endpoint.replace("/", "_").upper()
+        value = os.getenv(env_name)
+        if value is None:
+            continue
+        try:
+            ttls[endpoint] = float(value)
+        except ValueError:
+            pass
+    return ttls
+
+
+def _create_cache():
+    if os.getenv("CACHE_ENABLED", "true").lower() in ("0", "false", "no"):
+        return ResponseCache(maxsize=0, ttls={endpoint: 0 for endpoint in DEFAULT_TTLS})
+    try:
+        maxsize = int(os.getenv("CACHE_MAXSIZE", "1024"))
+    except ValueError:
+        maxsize = 1024
+    try:
+        stale_ttl = float(os.getenv("CACHE_STALE_TTL", "600"))
+    except ValueError:
+        stale_ttl = 600
+    return ResponseCache(maxsize=maxsize, ttls=_ttls_from_env(), stale_ttl=stale_ttl)
+
+
+# Cache dùng chung cho api_client và async_api_client
+response_cache = _create_cache()
+
+
+def configure_cache(maxsize=None, ttls=None, stale_ttl=None):
+    """Đổi kích thước tối đa, TTL theo endpoint và/hoặc stale_ttl của cache dùng chung."""
+    if maxsize is not None:
+        response_cache.maxsize = maxsize
+    if stale_ttl is not None:
+        response_cache.stale_ttl = stale_ttl
+    if ttls:
+        response_cache.ttls.update(ttls)
+    return response_cache
@@ -0,0 +1,121 @@
+# singleflight.py
+"""
+Gộp các lời gọi giống hệt nhau đang chạy đồng thời (single-flight): lời gọi
+đầu tiên với một khóa thực sự gửi yêu cầu lên Base.vn, các lời gọi đến sau
+với cùng khóa chờ và nhận chung kết quả (hoặc chung lỗi) của nó.
+"""
+
+import asyncio
+import threading
+import weakref
+
+
+class _Call:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Single-flight cho code đồng bộ chạy trên nhiều thread."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.leaders = 0
+        self.shared = 0
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = _Call()
+                self._calls[key] = call
+                self.leaders += 1
+                is_leader = True
+            else:
+                self.shared += 1
+                is_leader = False
+
+        if not is_leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+
+    def pending(self, key):
+        return key in self._calls
+
+    def in_flight(self):
+        return len(self._calls)
+
+    def stats(self):
+        return {"in_flight": self.in_flight(), "leaders": self.leaders, "shared": self.shared}
+
+
+class _AsyncCall:
+    def __init__(self, task):
+        self.task = task
+        self.waiters = 0
+
+
+class AsyncSingleFlight:
+    """Single-flight cho coroutine; mỗi event loop có bảng lời gọi riêng."""
+
+    def __init__(self):
+        self._calls = weakref.WeakKeyDictionary()
+        self.leaders = 0
+        self.shared = 0
+
+    async def do(self, key, coro_fn):
+        loop = asyncio.get_running_loop()
+        calls = self._calls.setdefault(loop, {})
+        call = calls.get(key)
+        if call is None:
+            call = _AsyncCall(loop.create_task(coro_fn()))
+            calls[key] = call
+            self.leaders += 1
+
+            def _done(finished, key=key, call=call):
+                if calls.get(key) is call:
+                    del calls[key]
+                # Tránh cảnh báo "exception was never retrieved" khi mọi lời gọi đã bị hủy
+                if not finished.cancelled():
+                    finished.exception()
+
+            call.task.add_done_callback(_done)
+        else:
+            self.shared += 1
+
+        call.waiters += 1
+        try:
+            # shield: một lời gọi bị hủy không được hủy yêu cầu chung của các lời gọi khác
+            return await asyncio.shield(call.task)
+        except asyncio.CancelledError:
+            # ... nhưng khi người chờ cuối cùng bị hủy thì không ai cần kết quả nữa
+            if call.waiters == 1:
+                call.task.cancel()
+            raise
+        finally:
+            call.waiters -= 1
+
+    def pending(self, key):
+        return key in self._calls.get(asyncio.get_running_loop(), {})
+
+    def in_flight(self):
+        return sum(len(calls) for calls in self._calls.values())
+
+    def stats(self):
+        return {"in_flight": self.in_flight(), "leaders": self.leaders, "shared": self.shared}
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+# sync_job.py
+"""
+Đồng bộ openings, ứng viên và tin nhắn từ Base.vn vào kho SQLite cục bộ
+(candidate_store). Các lần chạy sau chỉ tải lại chi tiết và tin nhắn của
+ứng viên mới hoặc có thay đổi kể từ lần đồng bộ trước.
+
+- Lần đầu, với --full, hoặc khi lần đọc hết danh sách gần nhất đã quá
+  SYNC_FULL_INTERVAL giây (mặc định 86400): đọc toàn bộ danh sách ứng viên (các
+  trang tải song song), tải lại ứng viên mới/thay đổi và xóa khỏi kho các ứng
+  viên không còn trên Base.vn.
+- Các lần khác: chỉ đọc các trang đầu (mới nhất trước) cho tới khi gặp ứng viên
+  không mới hơn mốc time_apply của lần trước. Nếu danh sách không được sắp xếp
+  theo time_apply giảm dần thì quay về đọc toàn bộ.
+- Tin nhắn của ứng viên không đổi được tải lại khi lần đồng bộ tin nhắn gần nhất
+  đã quá SYNC_MESSAGES_MAX_AGE giây (mặc định 21600), để không bỏ sót tin mới.
+- Fingerprint của ứng viên chỉ được ghi sau khi chi tiết (và tin nhắn, nếu có
+  đồng bộ tin nhắn) đã tải xong; ứng viên lỗi sẽ được tải lại lần sau. Với
+  --no-messages, ứng viên thay đổi được đánh dấu là chưa đồng bộ tin nhắn, nên
+  lần chạy có tin nhắn sau đó chỉ tải tin nhắn của họ chứ không tải lại chi tiết.
+
+Chạy:
+    python sync_job.py --openings                 # chỉ đồng bộ danh sách opening
+    python sync_job.py --opening 9346 --stage 75440
+    python sync_job.py --all-openings             # mọi opening
+    python sync_job.py --opening 9346 --full      # tải lại toàn bộ
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from dotenv import load_dotenv
+
+from api_client import (
+    DEFAULT_MAX_CONCURRENCY,
+    UpstreamError,
+    env_int,
+    page_count,
+    response_json,
+    fetch_all_candidates,
+    fetch_all_openings,
+    fetch_candidate_detail,
+    fetch_candidate_messages,
+    fetch_candidates,
+)
+from candidate_store import CandidateStore, candidate_fingerprint
+
+SYNC_FULL_INTERVAL = env_int("SYNC_FULL_INTERVAL", 86400)
+SYNC_MESSAGES_MAX_AGE = env_int("SYNC_MESSAGES_MAX_AGE", 21600)
+
+
+def _extract_messages(json_data):
+    messages = json_data.get("messages")
+    if not messages and isinstance(json_data.get("data"), dict):
+        messages = json_data["data"].get("messages")
+    return messages or []
+
+
+def _fetch_candidate_bundle(access_token, candidate_id, with_detail, with_messages):
+    """Tải chi tiết và/hoặc tin nhắn của một ứng viên; trả về (id, detail, messages, lỗi)."""
+    try:
+        detail = None
+        if with_detail:
+            detail = response_json(fetch_candidate_detail(access_token, candidate_id))
+        messages = None
+        if with_messages:
+            messages = _extract_messages(response_json(fetch_candidate_messages(access_token, candidate_id)))
+        return candidate_id, detail, messages, None
+    except (ConnectionError, UpstreamError, ValueError) as e:
+        return candidate_id, None, None, e
+
+
+def _time_apply(candidate):
+    value = str(candidate.get("time_apply") or "")
+    return int(value) if value.isdigit() else None
+
+
+def _fetch_new_candidates(access_token, opening_id, stage, watermark, num_per_page=100):
+    """
+    Đọc lần lượt các trang danh sách ứng viên cho tới trang chứa ứng viên không mới
+    hơn `watermark`. Trả về danh sách ứng viên đã đọc, hoặc None nếu thứ tự trả về
+    không phải time_apply giảm dần (không thể dừng sớm an toàn).
+    """
+    candidates = []
+    previous = None
+    page = 1
+    num_pages = None
+    while True:
+        page_data = response_json(fetch_candidates(access_token, opening_id, page, num_per_page, stage))
+        if num_pages is None:
+            # Theo số ứng viên thực nhận ở trang 1: Base.vn có thể trả ít hơn num_per_page mỗi trang
+            num_pages = page_count(page_data, num_per_page, "candidates")
+        items = [c for c in page_data.get("candidates") or [] if c.get("id") is not None]
+        times = [_time_apply(c) for c in items]
+        if None in times:
+            return None
+        ordered = ([previous] if previous is not None else []) + times
+        if any(a < b for a, b in zip(ordered, ordered[1:])):
+            return None
+        candidates.extend(items)
+        if not items or page >= num_pages or times[-1] <= watermark:
+            return candidates
+        previous = times[-1]
+        page += 1
+
+
+def sync_openings(store, access_token, max_concurrency=None):
+    """Đồng bộ toàn bộ opening; trả về danh sách opening."""
+    openings = fetch_all_openings(access_token, max_concurrency=max_concurrency).get("openings") or []
+    store.upsert_openings(openings)
+    return openings
+
+
+def sync_candidates(store, access_token, opening_id, stage=None, full=False,
+                    with_messages=True, max_concurrency=None):
+    """
+    Đồng bộ ứng viên của một opening/stage (xem docstring của module).
+
+    full=True: đọc toàn bộ danh sách và tải lại chi tiết/tin nhắn của mọi ứng viên.
+    Trả về dict tóm tắt.
+    """
+    if max_concurrency is None:
+        max_concurrency = DEFAULT_MAX_CONCURRENCY
+    started = time.monotonic()
+    now = int(time.time())
+    scope = f"opening:{opening_id}:stage:{stage or '*'}"
+    previous_state = store.get_sync_state(scope) or {}
+    watermark = previous_state.get("last_time_apply") or 0
+    last_full = previous_state.get("last_full_sync_at") or 0
+
+    candidates = None
+    if not full and watermark and now - last_full < SYNC_FULL_INTERVAL:
+        candidates = _fetch_new_candidates(access_token, opening_id, stage, watermark)
+    full_listing = candidates is None
+    if full_listing:
+        candidates = fetch_all_candidates(
+            access_token, opening_id, stage, max_concurrency=max_concurrency
+        ).get("candidates") or []
+        candidates = [c for c in candidates if c.get("id") is not None]
+
+    fingerprints = {str(c["id"]): candidate_fingerprint(c) for c in candidates}
+    stored = store.candidate_fingerprints(list(fingerprints))
+    changed_ids = [
+        candidate_id for candidate_id, fingerprint in fingerprints.items()
+        if full or stored.get(candidate_id) != fingerprint
+    ]
+    store.upsert_candidates(candidates, opening_id=opening_id, stage_id=stage)
+
+    # Ứng viên không mất khỏi Base.vn chỉ biết được khi đã đọc hết danh sách
+    removed = []
+    if full_listing:
+        removed = sorted(store.candidate_ids(opening_id, stage) - set(fingerprints))
+        store.delete_candidates(removed)
+
+    # Ứng viên không đổi nhưng tin nhắn đã cũ (hoặc chưa từng đồng bộ): chỉ tải lại tin nhắn
+    changed = set(changed_ids)
+    stale_messages = []
+    if with_messages:
+        stale_messages = [
+            candidate_id
+            for candidate_id in store.candidates_needing_messages(opening_id, stage, now - SYNC_MESSAGES_MAX_AGE)
+            if candidate_id not in changed
+        ]
+
+    failed = []
+    synced = {}
+    jobs = [(candidate_id, True) for candidate_id in changed_ids] + [(candidate_id, False) for candidate_id in stale_messages]
+    with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+        for candidate_id, detail, messages, error in executor.map(
+            lambda job: _fetch_candidate_bundle(access_token, job[0], job[1], with_messages),
+            jobs,
+        ):
+            if error is not None:
+                failed.append(candidate_id)
+                continue
+            if detail is not None:
+                store.save_candidate_detail(candidate_id, detail)
+            if messages is not None:
+                store.replace_messages(candidate_id, messages)
+            if candidate_id in changed:
+                synced[candidate_id] = fingerprints[candidate_id]
+    # Ứng viên lỗi không được ghi fingerprint nên sẽ được thử lại ở lần đồng bộ sau
+    store.mark_synced(synced, messages_synced=with_messages)
+
+    apply_times = [t for t in (_time_apply(c) for c in candidates) if t is not None]
+    last_time_apply = max(apply_times + [watermark])
+    store.set_sync_state(scope, last_time_apply, len(candidates), len(changed_ids), full_listing=full_listing)
+
+    return {
+        "scope": scope,
+        "mode": "full" if full_listing else "incremental",
+        "candidates": len(candidates),
+        "new_since_last_sync": sum(1 for t in apply_times if t > watermark),
+        "changed": len(changed_ids),
+        "messages_refreshed": len(stale_messages),
+        "removed": len(removed),
+        "failed": len(failed),
+        "seconds": round(time.monotonic() - started, 2),
+    }
+
+
+def main():
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Đồng bộ dữ liệu Base.vn vào kho SQLite cục bộ")
+    parser.add_argument("--token", default=os.getenv("BASE_TOKEN"), help="access_token (mặc định: BASE_TOKEN)")
+    parser.add_argument("--db", default=None, help="Đường dẫn file SQLite (mặc định: CANDIDATE_STORE_PATH hoặc candidates.db)")
+    parser.add_argument("--openings", action="store_true", help="Đồng bộ danh sách opening")
+    parser.add_argument("--opening", action="append", default=[], help="ID opening cần đồng bộ ứng viên (lặp lại được)")
+    parser.add_argument("--stage", default=None, help="Chỉ đồng bộ một stage")
+    parser.add_argument("--all-openings", action="store_true", help="Đồng bộ ứng viên của mọi opening")
+    parser.add_argument("--full", action="store_true", help="Đọc toàn bộ danh sách, tải lại chi tiết/tin nhắn của mọi ứng viên")
+    parser.add_argument("--no-messages", action="store_true", help="Không đồng bộ tin nhắn")
+    parser.add_argument("--max-concurrency", type=int, default=DEFAULT_MAX_CONCURRENCY)
+    args = parser.parse_args()
+
+    if not args.token:
+        print("❌ Thiếu access_token: dùng --token hoặc đặt BASE_TOKEN trong .env")
+        return 1
+
+    store = CandidateStore(args.db)
+    opening_ids = list(args.opening)
+
+    try:
+        if args.openings or args.all_openings:
+            openings = sync_openings(store, args.token, max_concurrency=args.max_concurrency)
+            print(f"✅ Đã đồng bộ {len(openings)} openings")
+            if args.all_openings:
+                opening_ids.extend(str(o.get("id")) for o in openings if o.get("id") is not None)
+
+        for opening_id in opening_ids:
+            summary = sync_candidates(
+                store,
+                args.token,
+                opening_id,
+                stage=args.stage,
+                full=args.full,
+                with_messages=not args.no_messages,
+                max_concurrency=args.max_concurrency,
+            )
+            print(
+                f"✅ {summary['scope']} ({summary['mode']}): {summary['candidates']} ứng viên, "
+                f"{summary['new_since_last_sync']} mới, {summary['changed']} thay đổi, "
+                f"{summary['messages_refreshed']} làm mới tin nhắn, {summary['removed']} đã xóa, "
+                f"{summary['failed']} lỗi ({summary['seconds']}s)"
+            )
+    except (ConnectionError, UpstreamError) as e:
+        print(f"❌ Lỗi đồng bộ: {e}")
+        return 1
+
+    print(f"📦 {store.path}: {store.counts()}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+import json
+import os
+import sys
+
+# Các module nằm phẳng ở thư mục gốc của repo
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Không giới hạn tốc độ / chờ backoff thật khi chạy test
+os.environ.setdefault("BASE_API_RATE_LIMIT", "0")
+os.environ.setdefault("BASE_API_BACKOFF_BASE", "0")
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def _clean_shared_state():
+    """Cache phản hồi và circuit breaker dùng chung giữa các module; làm sạch trước mỗi test."""
+    from circuit_breaker import circuit_breakers
+    from response_cache import response_cache
+
+    response_cache.clear()
+    circuit_breakers._breakers.clear()
+    yield
+    response_cache.clear()
+    circuit_breakers._breakers.clear()
+
+
+class FakeClock:
+    """Thay module `time` của một module cần test để điều khiển thời gian (monotonic/time/sleep)."""
+
+    def __init__(self, start=1000.0):
+        self.now = start
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def perf_counter(self):
+        return self.now
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+
+    def install(*modules):
+        for module in modules:
+            monkeypatch.setattr(module, "time", fake)
+        return fake
+
+    fake.install = install
+    return fake
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, payload=None, headers=None):
+        self.status_code = status_code
+        self.content = json.dumps(payload if payload is not None else {}).encode("utf-8")
+        self.headers = dict(headers or {})
+        self.encoding = "utf-8"
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding)
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class FakeUpstream:
+    """Thay BaseClient của api_client: trả lần lượt các phản hồi trong `responses` (phần tử cuối được lặp lại)."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses) or [FakeResponse()]
+        self.calls = []
+
+    def post(self, url, payload_params):
+        self.calls.append((url, dict(payload_params)))
+        response = self.responses[min(len(self.calls), len(self.responses)) - 1]
+        if isinstance(response, BaseException):
+            raise response
+        return response
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    import api_client
+
+    fake = FakeUpstream()
+    monkeypatch.setattr(api_client, "get_client", lambda: fake)
+    return fake
@@ -0,0 +1,81 @@
+import threading
+import time
+
+import pytest
+
+import api_client
+from api_client import UpstreamError, page_count
+from conftest import FakeResponse
+
+
+class CappedOpenings:
+    """opening/list giả lập: Base.vn trả tối đa `cap` opening mỗi trang dù num_per_page lớn hơn."""
+
+    def __init__(self, total=130, cap=50):
+        self.total = total
+        self.cap = cap
+        self.pages = []
+
+    def __call__(self, access_token, page=1, num_per_page=50, order_by="starred"):
+        self.pages.append(page)
+        size = min(num_per_page, self.cap)
+        start = (page - 1) * size
+        openings = [{"id": str(i)} for i in range(start, min(start + size, self.total))]
+        return FakeResponse(200, {"total": self.total, "openings": openings})
+
+
+def test_page_count_uses_page_size_returned_by_server():
+    page = {"total": 130, "openings": [{}] * 50}
+    assert page_count(page, 100) == 2
+    assert page_count(page, 100, "openings") == 3
+    # Trang duy nhất / danh sách rỗng: giữ num_per_page
+    assert page_count({"total": 30, "openings": [{}] * 30}, 100, "openings") == 1
+    assert page_count({"total": 0, "openings": []}, 100, "openings") == 1
+
+
+def test_fetch_all_openings_loads_every_page_when_server_caps_page_size(monkeypatch):
+    upstream = CappedOpenings()
+    monkeypatch.setattr(api_client, "fetch_openings_list", upstream)
+
+    data = api_client.fetch_all_openings("token", num_per_page=100)
+
+    assert [o["id"] for o in data["openings"]] == [str(i) for i in range(130)]
+    assert data["count"] == data["total"] == 130
+    assert sorted(upstream.pages) == [1, 2, 3]
+
+
+def test_fetch_all_openings_raises_when_a_page_fails(monkeypatch):
+    upstream = CappedOpenings()
+
+    def flaky(access_token, page=1, **kwargs):
+        if page == 2:
+            return FakeResponse(500, {})
+        return upstream(access_token, page=page, **kwargs)
+
+    monkeypatch.setattr(api_client, "fetch_openings_list", flaky)
+    with pytest.raises(UpstreamError):
+        api_client.fetch_all_openings("token", num_per_page=100)
+
+
+def test_fetch_all_pages_stops_at_first_failing_page():
+    release = threading.Event()
+    fetched = []
+
+    def fetch_page(page):
+        fetched.append(page)
+        if page == 2:
+            return FakeResponse(500, {})
+        if page > 1:
+            # Các trang khác chậm (như khi đang thử lại/backoff)
+            release.wait(5)
+        return FakeResponse(200, {"total": 1000, "openings": [{"id": str(page)}] * 50})
+
+    started = time.monotonic()
+    try:
+        with pytest.raises(UpstreamError):
+            api_client.fetch_all_pages(fetch_page, "openings", 50, max_concurrency=2)
+        assert time.monotonic() - started < 2
+    finally:
+        release.set()
+    # 20 trang: chỉ các trang đã bắt đầu khi trang 2 lỗi (tối đa một trang nữa cho mỗi worker) được tải
+    assert max(fetched) <= 4
@@ -0,0 +1,191 @@
+import threading
+
+import pytest
+
+import app
+from app import CandidatePageBrowser, SimpleResp
+from conftest import FakeResponse
+
+
+class FakePages:
+    """Thay app.load_candidate_page: 250 ứng viên, 100 ứng viên mỗi trang."""
+
+    def __init__(self, total=250):
+        self.total = total
+        # Kích thước trang tối đa phía server (None = đúng num_per_page yêu cầu)
+        self.page_cap = None
+        self.calls = []
+        self.failing = set()
+        self.gate = None
+
+    def __call__(self, access_token, opening_id, stage, page, num_per_page, use_proxy=False, shared_cache=True):
+        self.calls.append((page, shared_cache))
+        if self.gate is not None:
+            self.gate.wait(5)
+        if page in self.failing:
+            return SimpleResp(500, {}, "boom")
+        num_per_page = min(num_per_page, self.page_cap or num_per_page)
+        start = (page - 1) * num_per_page
+        candidates = [
+            {"id": str(i), "name": f"Ứng viên {i}"}
+            for i in range(start, min(start + num_per_page, self.total))
+        ]
+        return SimpleResp(200, {"total": self.total, "candidates": candidates}, "")
+
+    def pages(self):
+        return [page for page, _ in self.calls]
+
+
+@pytest.fixture
+def pages(monkeypatch):
+    fake = FakePages()
+    monkeypatch.setattr(app, "load_candidate_page", fake)
+    return fake
+
+
+def browser(max_pages=2):
+    return CandidatePageBrowser("tok", "9346", "1", 100, max_pages=max_pages)
+
+
+def wait_prefetched(b):
+    for future in list(b.pending.values()):
+        future.result(5)
+
+
+def test_get_loads_page_once_and_sets_page_count(pages):
+    b = browser()
+    response, processed = b.get(1)
+    assert response.status_code == 200
+    assert processed is not None
+    assert b.num_pages == 3
+
+    again, _ = b.get(1)
+    assert again.json() == response.json()
+    assert pages.calls == [(1, True)]
+
+
+def test_page_count_follows_page_size_returned_by_server(pages):
+    pages.total = 230
+    pages.page_cap = 50
+    b = browser()
+    b.get(1)
+    assert b.num_pages == 5
+
+    b.prefetch(5)
+    wait_prefetched(b)
+    _, processed = b.get(5)
+    assert processed is not None
+    # Trang cuối ít ứng viên hơn không làm sai số trang
+    assert b.num_pages == 5
+
+
+def test_loaded_pages_are_bounded_lru(pages):
+    b = browser(max_pages=2)
+    b.get(1)
+    b.get(2)
+    b.get(1)
+    b.get(3)
+    assert list(b.pages) == [1, 3]
+
+    b.get(2)
+    assert pages.pages() == [1, 2, 3, 2]
+
+
+def test_prefetched_page_is_reused_without_new_request(pages):
+    b = browser()
+    b.get(1)
+    b.prefetch(2)
+    wait_prefetched(b)
+
+    b.get(2)
+    assert pages.calls == [(1, True), (2, False)]
+
+
+def test_get_waits_for_page_still_being_prefetched(pages):
+    b = browser()
+    b.get(1)
+    pages.gate = threading.Event()
+    b.prefetch(2)
+    assert b.is_loaded(2)
+    threading.Timer(0.05, pages.gate.set).start()
+
+    _, processed = b.get(2)
+    assert processed is not None
+    assert pages.pages() == [1, 2]
+    assert not b.pending
+
+
+def test_prefetch_skips_loaded_pending_and_out_of_range_pages(pages):
+    b = browser()
+    b.get(1)
+    b.prefetch(1)
+    b.prefetch(0)
+    b.prefetch(4)
+    b.prefetch(2)
+    b.prefetch(2)
+    wait_prefetched(b)
+    assert pages.pages() == [1, 2]
+
+
+def test_failed_prefetch_is_not_stored_and_get_retries(pages):
+    b = browser()
+    b.get(1)
+    pages.failing.add(2)
+    b.prefetch(2)
+    wait_prefetched(b)
+
+    pages.failing.clear()
+    response, processed = b.get(2)
+    assert response.status_code == 200
+    assert processed is not None
+    assert pages.calls == [(1, True), (2, False), (2, True)]
+
+
+def test_failed_page_is_not_cached(pages):
+    b = browser()
+    pages.failing.add(1)
+    response, processed = b.get(1)
+    assert response.status_code == 500
+    assert processed is None
+    assert not b.pages
+
+    pages.failing.clear()
+    assert b.get(1)[1] is not None
+    assert pages.pages() == [1, 1]
+
+
+def test_refresh_reaches_upstream_again(upstream):
+    app.clear_data_caches()
+    upstream.responses = [FakeResponse(200, {"candidate": {"id": "1", "name": "Cũ"}}),
+                          FakeResponse(200, {"candidate": {"id": "1", "name": "Mới"}})]
+
+    first = app.cached_response(app.cached_candidate_detail, "tok", "1")
+    again = app.cached_response(app.cached_candidate_detail, "tok", "1")
+    assert again.json() == first.json()
+    assert len(upstream.calls) == 1
+
+    app.clear_data_caches()
+    refreshed = app.cached_response(app.cached_candidate_detail, "tok", "1")
+    assert len(upstream.calls) == 2
+    assert refreshed.json()["candidate"]["name"] == "Mới"
+
+
+def _opening_index(count):
+    return app.build_opening_index({f"{9000 + i} - Vị trí {i}": {} for i in range(count)})
+
+
+def test_empty_opening_search_lists_every_opening():
+    index = _opening_index(130)
+    keys, total = app.search_openings(index, "  ", limit=50)
+    assert total == 130
+    assert keys == [key for _, key in index]
+
+
+def test_opening_search_limits_only_matches():
+    index = _opening_index(130)
+    keys, total = app.search_openings(index, "vi tri", limit=50)
+    assert total == 130
+    assert len(keys) == 50
+
+    keys, total = app.search_openings(index, "9012", limit=50)
+    assert (keys, total) == (["9012 - Vị trí 12"], 1)
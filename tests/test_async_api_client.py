@@ -0,0 +1,72 @@
+import asyncio
+
+import async_api_client
+
+
+def _reset_client():
+    async_api_client._client = None
+    async_api_client._client_loop = None
+
+
+def test_get_client_reuses_client_within_a_loop():
+    _reset_client()
+
+    async def main():
+        first = async_api_client.get_client()
+        assert async_api_client.get_client() is first
+        await async_api_client.close_client()
+
+    asyncio.run(main())
+
+
+def test_get_client_closes_client_of_previous_loop():
+    _reset_client()
+
+    async def create():
+        return async_api_client.get_client()
+
+    old = asyncio.run(create())
+    assert not old.client.is_closed
+
+    async def switch():
+        new = async_api_client.get_client()
+        # Để task đóng client cũ chạy xong
+        await asyncio.gather(*async_api_client._closing)
+        await async_api_client.close_client()
+        return new
+
+    new = asyncio.run(switch())
+    assert new is not old
+    assert old.client.is_closed
+    assert new.client.is_closed
+
+
+def test_fetch_all_candidates_cancels_remaining_pages_on_failure(monkeypatch):
+    started, finished = [], []
+
+    async def fake_page(access_token, opening_id, page, num_per_page, stage):
+        if page == 1:
+            return {"total": 10, "candidates": [{"id": 1}]}
+        started.append(page)
+        if page == 3:
+            raise async_api_client.UpstreamError(500, "boom")
+        await asyncio.sleep(0.5)
+        finished.append(page)
+        return {"candidates": [{"id": page}]}
+
+    monkeypatch.setattr(async_api_client, "_fetch_candidates_page", fake_page)
+
+    async def main():
+        try:
+            await async_api_client.fetch_all_candidates("tok", "9346", "1", num_per_page=1, max_concurrency=2)
+        except async_api_client.UpstreamError as e:
+            error = e
+        # Đợi lâu hơn thời gian một trang để chắc không còn trang nào chạy ngầm
+        await asyncio.sleep(0.7)
+        return error
+
+    error = asyncio.run(main())
+    assert error.status_code == 500
+    assert finished == []
+    # Chỉ các trang vào semaphore trước khi lỗi lan ra mới được bắt đầu (không phải cả 9 trang)
+    assert len(started) <= 3
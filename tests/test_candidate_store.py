@@ -0,0 +1,111 @@
+import pytest
+
+from candidate_store import CandidateStore, _fts_query
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = CandidateStore(tmp_path / "store.db")
+    store.upsert_candidates([
+        {"id": "1", "name": "Nguyễn Văn An", "email": "an@example.com", "opening_id": "10", "stage_name": "CV"},
+        {"id": "2", "name": "Trần Thị Bình", "email": "binh@example.com", "opening_id": "10",
+         "note": "Kinh nghiệm Python, từng làm với An"},
+        {"id": "3", "name": "Lê Minh Châu", "email": "chau@example.com", "opening_id": "20"},
+    ])
+    store.replace_messages("1", [
+        {"id": "m1", "subject": "Lịch phỏng vấn", "content": "<p>Hẹn phỏng vấn <b>thứ Hai</b></p>", "since": 1},
+        {"id": "m2", "subject": "Kết quả", "content": "Bạn đã qua vòng phỏng vấn", "since": 2},
+    ])
+    store.replace_messages("3", [
+        {"id": "m3", "subject": "Offer", "content": "Mời nhận việc vị trí Python developer", "since": 3},
+    ])
+    return store
+
+
+def ids(result):
+    return [hit["candidate_id"] for hit in result["results"]]
+
+
+def test_fts_query_quotes_words_and_keeps_prefix():
+    assert _fts_query('python dev*') == '"python" "dev"*'
+    assert _fts_query('a"b OR NOT') == '"a""b" "OR" "NOT"'
+    assert _fts_query("  * ") == ""
+
+
+def test_empty_query_raises_value_error(store):
+    with pytest.raises(ValueError):
+        store.search("   ")
+
+
+def test_search_ignores_diacritics(store):
+    assert ids(store.search("nguyen van an")) == ["1"]
+    assert ids(store.search("Nguyễn")) == ["1"]
+
+
+def test_title_match_ranks_above_body_match(store):
+    # "An" là tên của ứng viên 1, chỉ xuất hiện trong nội dung hồ sơ của ứng viên 2
+    result = store.search("an")
+    assert ids(result)[:2] == ["1", "2"]
+    scores = [hit["score"] for hit in result["results"]]
+    assert scores == sorted(scores, reverse=True)
+    assert all(score > 0 for score in scores)
+
+
+def test_prefix_search(store):
+    assert ids(store.search("phon")) == []
+    assert ids(store.search("phon*")) == ["1"]
+
+
+def test_fts_syntax_in_user_input_does_not_raise(store):
+    assert store.search('"OR') == {"total": 0, "results": []}
+    assert store.search("NOT python")["total"] == 0
+    assert store.search("python)(")["total"] == store.search("python")["total"] == 2
+
+
+def test_per_candidate_keeps_best_hit_per_candidate(store):
+    grouped = store.search("phỏng vấn")
+    assert grouped["total"] == 1
+    assert ids(grouped) == ["1"]
+
+    every_hit = store.search("phỏng vấn", per_candidate=False)
+    assert every_hit["total"] == 2
+    assert {hit["ref"] for hit in every_hit["results"]} == {"m1", "m2"}
+    assert "<mark>" in every_hit["results"][0]["snippet"]
+
+
+def test_filters_by_kind_and_opening(store):
+    assert set(ids(store.search("python"))) == {"2", "3"}
+    assert ids(store.search("python", kind="message")) == ["3"]
+    assert ids(store.search("python", kind="profile")) == ["2"]
+    assert ids(store.search("python", opening_id="10")) == ["2"]
+
+
+def test_limit_and_offset_page_through_results(store):
+    first = store.search("example", limit=2)
+    second = store.search("example", limit=2, offset=2)
+    assert first["total"] == second["total"] == 3
+    assert len(first["results"]) == 2
+    assert set(ids(first)) | set(ids(second)) == {"1", "2", "3"}
+
+
+def test_html_is_stripped_from_indexed_messages(store):
+    assert store.search("b")["total"] == 0
+    assert ids(store.search("thu hai")) == ["1"]
+
+
+def test_updates_replace_index_entries_without_duplicates(store):
+    store.upsert_candidates([{"id": "1", "name": "Nguyễn Văn Anh", "opening_id": "10"}])
+    store.replace_messages("1", [{"id": "m9", "subject": "Cảm ơn", "content": "Chúc mừng", "since": 5}])
+    assert ids(store.search("anh")) == ["1"]
+    assert store.search("phỏng vấn")["total"] == 0
+    assert store.search("nguyen", per_candidate=False)["total"] == 1
+
+    store.rebuild_search_index()
+    assert store.search("nguyen", per_candidate=False)["total"] == 1
+    assert ids(store.search("chuc mung")) == ["1"]
+
+
+def test_detail_is_searchable_after_save(store):
+    store.save_candidate_detail("3", {"id": "3", "cvs": ["https://cdn/x.pdf"], "skills": "Kubernetes"})
+    assert ids(store.search("kubernetes")) == ["3"]
+    assert store.search("cdn")["total"] == 0
@@ -0,0 +1,168 @@
+import asyncio
+
+import pytest
+import requests
+
+import api_client
+import async_api_client
+import circuit_breaker
+import rate_limit
+from circuit_breaker import (
+    CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitBreakerRegistry, CircuitOpenError, circuit_breakers,
+)
+from conftest import FakeResponse
+
+
+@pytest.fixture
+def breaker(clock):
+    clock.install(circuit_breaker)
+    return CircuitBreaker("candidate/get", failure_threshold=3, recovery_timeout=30)
+
+
+def test_opens_after_consecutive_failures(breaker):
+    for _ in range(2):
+        breaker.before_call()
+        breaker.record_failure()
+    assert breaker.state == CLOSED
+
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError) as exc:
+        breaker.before_call()
+    assert isinstance(exc.value, ConnectionError)
+    assert exc.value.retry_in == pytest.approx(30)
+    assert breaker.stats()["rejected"] == 1
+
+
+def test_success_resets_failure_count(breaker):
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+    assert breaker.failures == 1
+
+
+def test_client_errors_do_not_count_as_failures(breaker):
+    for status in (400, 404, 429, 200):
+        breaker.record_status(status)
+    assert breaker.failures == 0
+    for _ in range(3):
+        breaker.record_status(503)
+    assert breaker.state == OPEN
+
+
+def test_half_open_allows_a_single_probe_then_closes(breaker, clock):
+    for _ in range(3):
+        breaker.record_failure()
+    clock.advance(30)
+
+    breaker.before_call()
+    assert breaker.state == HALF_OPEN
+    # Trong lúc lời gọi thử đang chạy, các lời gọi khác vẫn bị từ chối
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    breaker.before_call()
+
+
+def test_failed_probe_reopens_for_a_new_recovery_period(breaker, clock):
+    for _ in range(3):
+        breaker.record_failure()
+    clock.advance(31)
+    breaker.before_call()
+    breaker.record_failure()
+
+    assert breaker.state == OPEN
+    assert breaker.stats()["times_opened"] == 2
+    clock.advance(29)
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    clock.advance(1)
+    breaker.before_call()
+    assert breaker.state == HALF_OPEN
+
+
+def test_registry_keeps_one_breaker_per_endpoint():
+    registry = CircuitBreakerRegistry(failure_threshold=2, recovery_timeout=5)
+    first = registry.get("candidate/get")
+    assert registry.get("candidate/get") is first
+    assert registry.get("candidate/list") is not first
+    assert first.failure_threshold == 2
+    assert set(registry.stats()) == {"candidate/get", "candidate/list"}
+
+
+def test_release_frees_probe_without_recording_outcome(breaker, clock):
+    for _ in range(3):
+        breaker.record_failure()
+    clock.advance(30)
+    breaker.before_call()
+    breaker.release()
+    assert breaker.state == HALF_OPEN
+    breaker.before_call()
+
+
+def test_retried_call_counts_as_one_failure(upstream):
+    upstream.responses = [FakeResponse(503)]
+    response = api_client.fetch_candidate_detail("token", "1")
+
+    assert response.status_code == 503
+    assert len(upstream.calls) == rate_limit.retry_policy.max_retries + 1
+    assert circuit_breakers.get("candidate/get").failures == 1
+
+
+def test_connection_errors_count_once_after_retries(upstream):
+    upstream.responses = [requests.exceptions.ConnectionError("down")]
+    with pytest.raises(ConnectionError):
+        api_client.fetch_candidate_detail("token", "1")
+    assert len(upstream.calls) == rate_limit.retry_policy.max_retries + 1
+    assert circuit_breakers.get("candidate/get").failures == 1
+
+
+def test_retry_that_succeeds_resets_breaker(upstream):
+    breaker = circuit_breakers.get("candidate/get")
+    breaker.record_failure()
+    upstream.responses = [FakeResponse(503), FakeResponse(200, {"candidate": {}})]
+    assert api_client.fetch_candidate_detail("token", "1").status_code == 200
+    assert breaker.failures == 0
+
+
+def test_half_open_probe_may_retry(upstream, clock):
+    clock.install(circuit_breaker)
+    breaker = circuit_breakers.get("candidate/get")
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+    clock.advance(breaker.recovery_timeout)
+
+    upstream.responses = [FakeResponse(502), FakeResponse(200, {"candidate": {}})]
+    assert api_client.fetch_candidate_detail("token", "1").status_code == 200
+    assert breaker.state == CLOSED
+
+
+def test_cancelled_async_probe_releases_breaker(monkeypatch, clock):
+    clock.install(circuit_breaker)
+    breaker = circuit_breakers.get("candidate/get")
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+    clock.advance(breaker.recovery_timeout)
+
+    class HangingClient:
+        async def post(self, url, payload_params):
+            await asyncio.sleep(10)
+
+    monkeypatch.setattr(async_api_client, "get_client", lambda: HangingClient())
+
+    async def main():
+        task = asyncio.ensure_future(async_api_client.fetch_candidate_detail("token", "1"))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(main())
+    assert breaker.state == HALF_OPEN
+    assert breaker.failures == breaker.failure_threshold
+    breaker.before_call()
@@ -0,0 +1,81 @@
+import logging
+
+import metrics
+from metrics import Gauge, Registry
+
+
+def _gauge(name, value):
+    gauge = Gauge(name, "test")
+    gauge.set(value)
+    return [gauge]
+
+
+def test_failing_collector_is_logged_and_counted(caplog):
+    registry = Registry()
+
+    def broken():
+        raise RuntimeError("boom")
+
+    registry.register_collector(lambda: _gauge("before", 1))
+    registry.register_collector(broken)
+    registry.register_collector(lambda: _gauge("after", 2))
+
+    with caplog.at_level(logging.ERROR, logger="metrics"):
+        text = registry.render()
+        text = registry.render()
+
+    assert "before 1" in text
+    assert "after 2" in text
+    assert 'metrics_collector_errors_total{collector="broken"} 2' in text
+    assert len(caplog.records) == 2
+    assert "broken" in caplog.records[0].getMessage()
+    assert caplog.records[0].exc_info is not None
+
+
+def test_default_registry_reports_every_section():
+    text = metrics.render()
+    for name in (
+        "response_cache_entries", "singleflight_in_flight", "circuit_breaker_state",
+        "base_api_rate_limit", "base_api_pool_connections",
+    ):
+        assert f"# TYPE {name} gauge" in text
+
+
+def test_one_broken_section_keeps_the_others(monkeypatch):
+    import rate_limit
+
+    def broken_stats():
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(rate_limit.rate_limiter, "stats", broken_stats)
+    text = metrics.render()
+    assert "base_api_rate_limit" not in text
+    assert "# TYPE response_cache_entries gauge" in text
+    assert "# TYPE circuit_breaker_state gauge" in text
+    assert 'metrics_collector_errors_total{collector="_rate_limit_metrics"}' in text
+
+
+def test_pool_metrics_skip_client_with_unexpected_internals(monkeypatch, caplog):
+    import api_client
+
+    class OddClient:
+        session = None
+
+    monkeypatch.setattr(api_client, "_client", OddClient())
+    monkeypatch.setattr(metrics, "_pool_unsupported", set())
+
+    with caplog.at_level(logging.WARNING, logger="metrics"):
+        first = metrics.render()
+        metrics.render()
+
+    assert "# TYPE base_api_pool_connections gauge" in first
+    assert 'base_api_pool_connections{client="sync"' not in first
+    assert 'metrics_collector_errors_total{collector="_pool_metrics"}' not in first
+    assert len(caplog.records) == 1
+
+
+def test_pool_metrics_count_sync_connections():
+    import api_client
+
+    api_client.get_client()
+    assert 'base_api_pool_connections{client="sync",state="idle"} 0' in metrics.render()
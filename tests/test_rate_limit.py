@@ -0,0 +1,105 @@
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import rate_limit
+from rate_limit import AdaptiveRateLimiter, RetryPolicy, parse_retry_after
+
+
+@pytest.fixture
+def limiter(clock):
+    clock.install(rate_limit)
+    return AdaptiveRateLimiter(rate=10, burst=2, min_rate=1, max_rate=20, increase=1, decrease=0.5, cooldown=1)
+
+
+def test_disabled_limiter_never_waits():
+    limiter = AdaptiveRateLimiter(rate=0)
+    assert not limiter.enabled
+    assert [limiter.reserve() for _ in range(100)] == [0.0] * 100
+    limiter.on_response(429, 10)
+    assert limiter.reserve() == 0.0
+
+
+def test_burst_then_requests_queue_at_rate(limiter):
+    waits = [limiter.reserve() for _ in range(5)]
+    assert waits[:2] == [0.0, 0.0]
+    # Token được vay trước: mỗi yêu cầu tiếp theo chờ thêm 1/rate giây
+    assert waits[2:] == pytest.approx([0.1, 0.2, 0.3])
+    assert limiter.stats()["throttled"] == 3
+
+
+def test_tokens_refill_over_time(limiter, clock):
+    limiter.reserve()
+    limiter.reserve()
+    clock.advance(0.1)
+    assert limiter.reserve() == 0.0
+
+
+def test_429_halves_rate_once_per_cooldown(limiter, clock):
+    limiter.on_response(429)
+    assert limiter.rate == 5
+    limiter.on_response(429)
+    assert limiter.rate == 5
+    clock.advance(1)
+    limiter.on_response(429)
+    assert limiter.rate == 2.5
+    for _ in range(5):
+        clock.advance(1)
+        limiter.on_response(429)
+    assert limiter.rate == 1
+
+
+def test_retry_after_pauses_every_caller(limiter):
+    limiter.on_response(429, retry_after=4)
+    assert limiter.reserve() == pytest.approx(4)
+    assert limiter.reserve() == pytest.approx(4)
+
+
+def test_success_increases_rate_up_to_max(limiter):
+    limiter.on_response(200)
+    assert limiter.rate == pytest.approx(10.1)
+    for _ in range(10000):
+        limiter.on_response(200)
+    assert limiter.rate == 20
+    # 5xx không ảnh hưởng tốc độ
+    limiter.on_response(503)
+    assert limiter.rate == 20
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("3") == 3
+    assert parse_retry_after("-5") == 0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+    future = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=60), usegmt=True)
+    assert 55 <= parse_retry_after(future) <= 60
+
+
+def test_retry_policy_retries_only_retryable_statuses():
+    policy = RetryPolicy(max_retries=3, backoff_base=0.5, backoff_max=30)
+    assert policy.next_delay(0, 404) is None
+    assert policy.next_delay(0, 200) is None
+    for status in (None, 429, 500, 502, 503, 504):
+        assert policy.next_delay(0, status) is not None
+
+
+def test_retry_policy_stops_after_max_retries():
+    policy = RetryPolicy(max_retries=2, backoff_base=0.5, backoff_max=30)
+    assert policy.next_delay(0) is not None
+    assert policy.next_delay(1) is not None
+    assert policy.next_delay(2) is None
+    assert policy.stats()["retries"] == 2
+
+
+def test_retry_policy_backoff_is_jittered_and_capped():
+    policy = RetryPolicy(max_retries=10, backoff_base=1, backoff_max=5)
+    for attempt in range(10):
+        for _ in range(20):
+            assert 0 <= policy.next_delay(attempt, 503) <= min(5, 2 ** attempt)
+
+
+def test_retry_policy_prefers_retry_after_but_caps_it():
+    policy = RetryPolicy(max_retries=3, backoff_base=1, backoff_max=10)
+    assert policy.next_delay(0, 429, retry_after=3) == 3
+    assert policy.next_delay(0, 429, retry_after=120) == 10
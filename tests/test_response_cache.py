@@ -0,0 +1,149 @@
+import threading
+
+import pytest
+
+import api_client
+import response_cache as response_cache_module
+from conftest import FakeResponse
+from response_cache import CachedResponse, ResponseCache, TTLCache, response_cache
+
+
+@pytest.fixture
+def cache_clock(clock):
+    return clock.install(response_cache_module)
+
+
+def test_entry_expires_after_ttl(cache_clock):
+    cache = TTLCache()
+    cache.set("k", "v", ttl=10)
+    cache_clock.advance(9.9)
+    assert cache.get("k") == "v"
+    cache_clock.advance(0.1)
+    assert cache.get("k") is None
+    assert cache.stats()["expirations"] == 1
+    assert len(cache) == 0
+
+
+def test_least_recently_used_entry_is_evicted_first(cache_clock):
+    cache = TTLCache(maxsize=2)
+    cache.set("a", 1, ttl=10)
+    cache.set("b", 2, ttl=10)
+    cache.get("a")
+    cache.set("c", 3, ttl=10)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_key_ignores_param_order_but_separates_tokens():
+    cache = ResponseCache()
+    first = cache.key_for("candidate/get", {"access_token": "t1", "id": 1, "x": "a"})
+    assert first == cache.key_for("candidate/get", {"x": "a", "id": "1", "access_token": "t1"})
+    assert first != cache.key_for("candidate/get", {"access_token": "t2", "id": 1, "x": "a"})
+    # Token không nằm nguyên văn trong khóa
+    assert "t1" not in repr(first)
+
+
+def test_cached_response_round_trip():
+    cached = CachedResponse.from_response(FakeResponse(200, {"name": "Hà"}))
+    assert cached.status_code == 200
+    assert cached.json() == {"name": "Hà"}
+    assert cached.text == '{"name": "H\\u00e0"}'
+
+
+def test_post_serves_fresh_cache_without_calling_upstream(upstream):
+    upstream.responses = [FakeResponse(200, {"candidate": {"id": "1"}})]
+    first = api_client.fetch_candidate_detail("token", "1")
+    second = api_client.fetch_candidate_detail("token", "1")
+    assert len(upstream.calls) == 1
+    assert second.json() == first.json()
+    assert not second.stale
+
+
+def test_post_does_not_cache_errors(upstream):
+    upstream.responses = [FakeResponse(404), FakeResponse(200, {"candidate": {}})]
+    assert api_client.fetch_candidate_detail("token", "1").status_code == 404
+    assert api_client.fetch_candidate_detail("token", "1").status_code == 200
+    assert len(upstream.calls) == 2
+
+
+def test_uncached_endpoint_always_reaches_upstream(upstream):
+    upstream.responses = [FakeResponse(200, {"candidates": []})]
+    api_client.fetch_candidates("token", "9346", 1, 50, "1")
+    api_client.fetch_candidates("token", "9346", 1, 50, "1")
+    assert len(upstream.calls) == 2
+
+
+def test_stale_copy_keeps_original_age():
+    cached = CachedResponse.from_response(FakeResponse(200, {"name": "Hà"}))
+    stale = cached.as_stale()
+    assert stale.stale and not cached.stale
+    assert stale.created_at == cached.created_at
+    assert stale.json() == cached.json()
+
+
+def test_stale_entry_readable_only_through_get_stale(cache_clock):
+    cache = TTLCache()
+    cache.set("k", "v", ttl=10, stale_ttl=30)
+    assert cache.get_stale("k") == ("v", True)
+
+    cache_clock.advance(15)
+    assert cache.get("k") is None
+    assert cache.get_stale("k") == ("v", False)
+    assert cache.stats()["stale_hits"] == 1
+
+    cache_clock.advance(25)
+    assert cache.get_stale("k") == (None, False)
+    assert len(cache) == 0
+
+
+def test_post_returns_stale_copy_and_refreshes_in_background(upstream, cache_clock, monkeypatch):
+    refreshed = threading.Event()
+    original_refresh = api_client._refresh
+
+    def refresh(*args):
+        original_refresh(*args)
+        refreshed.set()
+
+    monkeypatch.setattr(api_client, "_refresh", refresh)
+    monkeypatch.setattr(response_cache, "stale_ttl", 600)
+    upstream.responses = [FakeResponse(200, {"v": 1}), FakeResponse(200, {"v": 2})]
+
+    assert api_client.fetch_candidate_detail("token", "1").json() == {"v": 1}
+    cache_clock.advance(response_cache.ttl_for("candidate/get") + 1)
+
+    stale = api_client.fetch_candidate_detail("token", "1")
+    assert stale.stale
+    assert stale.json() == {"v": 1}
+    assert refreshed.wait(5)
+    assert len(upstream.calls) == 2
+
+    fresh = api_client.fetch_candidate_detail("token", "1")
+    assert not fresh.stale
+    assert fresh.json() == {"v": 2}
+    assert len(upstream.calls) == 2
+
+
+def test_post_keeps_stale_copy_when_refresh_fails(upstream, cache_clock, monkeypatch):
+    refreshed = threading.Event()
+    original_refresh = api_client._refresh
+
+    def refresh(*args):
+        original_refresh(*args)
+        refreshed.set()
+
+    monkeypatch.setattr(api_client, "_refresh", refresh)
+    monkeypatch.setattr(response_cache, "stale_ttl", 600)
+    upstream.responses = [FakeResponse(200, {"v": 1}), FakeResponse(404)]
+
+    api_client.fetch_candidate_detail("token", "1")
+    cache_clock.advance(response_cache.ttl_for("candidate/get") + 1)
+    assert api_client.fetch_candidate_detail("token", "1").stale
+    assert refreshed.wait(5)
+
+    refreshed.clear()
+    again = api_client.fetch_candidate_detail("token", "1")
+    assert again.stale
+    assert again.json() == {"v": 1}
+    assert refreshed.wait(5)
@@ -0,0 +1,162 @@
+import asyncio
+import threading
+
+import pytest
+
+from singleflight import AsyncSingleFlight, SingleFlight
+
+
+def test_async_last_waiter_cancelled_cancels_shared_call():
+    flight = AsyncSingleFlight()
+    state = {}
+
+    async def slow():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            state["cancelled"] = True
+            raise
+
+    async def main():
+        waiter = asyncio.ensure_future(flight.do("k", slow))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        await asyncio.sleep(0)
+        return flight.in_flight()
+
+    assert asyncio.run(main()) == 0
+    assert state == {"cancelled": True}
+
+
+def test_async_cancelling_one_waiter_keeps_call_for_others():
+    flight = AsyncSingleFlight()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def main():
+        first = asyncio.ensure_future(flight.do("k", work))
+        second = asyncio.ensure_future(flight.do("k", work))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(main()) == "done"
+    assert calls == [1]
+
+
+def test_sync_concurrent_callers_share_one_call():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+    results = []
+
+    def work():
+        calls.append(1)
+        release.wait(5)
+        return "done"
+
+    def caller():
+        results.append(flight.do("k", work))
+
+    leader = threading.Thread(target=caller)
+    leader.start()
+    while not flight.pending("k"):
+        pass
+    followers = [threading.Thread(target=caller) for _ in range(4)]
+    for thread in followers:
+        thread.start()
+    while flight.shared < 4:
+        pass
+    release.set()
+    for thread in [leader] + followers:
+        thread.join(5)
+
+    assert calls == [1]
+    assert results == ["done"] * 5
+    assert (flight.leaders, flight.shared) == (1, 4)
+    assert not flight.pending("k")
+
+
+def test_sync_error_is_raised_to_every_caller_and_key_released():
+    flight = SingleFlight()
+    release = threading.Event()
+    errors = []
+
+    def work():
+        release.wait(5)
+        raise ValueError("boom")
+
+    def caller():
+        try:
+            flight.do("k", work)
+        except ValueError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=caller) for _ in range(3)]
+    threads[0].start()
+    while not flight.pending("k"):
+        pass
+    for thread in threads[1:]:
+        thread.start()
+    while flight.shared < 2:
+        pass
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(errors) == 3
+    assert len({id(e) for e in errors}) == 1
+    # Lần gọi sau chạy lại hàm chứ không dùng lại lỗi cũ
+    assert flight.do("k", lambda: "retry") == "retry"
+
+
+def test_sync_different_keys_run_independently():
+    flight = SingleFlight()
+    assert flight.do("a", lambda: 1) == 1
+    assert flight.do("b", lambda: 2) == 2
+    assert flight.leaders == 2 and flight.shared == 0
+
+
+def test_async_concurrent_callers_share_one_call():
+    flight = AsyncSingleFlight()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "done"
+
+    async def main():
+        results = await asyncio.gather(*(flight.do("k", work) for _ in range(5)))
+        return results, flight.in_flight()
+
+    results, in_flight = asyncio.run(main())
+    assert results == ["done"] * 5
+    assert calls == [1]
+    assert (flight.leaders, flight.shared) == (1, 4)
+    assert in_flight == 0
+
+
+def test_async_error_propagates_and_key_released():
+    flight = AsyncSingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0)
+        raise ValueError("boom")
+
+    async def ok():
+        return "ok"
+
+    async def main():
+        results = await asyncio.gather(flight.do("k", fail), flight.do("k", fail), return_exceptions=True)
+        return results, await flight.do("k", ok)
+
+    results, after = asyncio.run(main())
+    assert all(isinstance(r, ValueError) for r in results)
+    assert after == "ok"
@@ -0,0 +1,231 @@
+import pytest
+
+import sync_job
+from api_client import UpstreamError
+from candidate_store import CandidateStore
+
+
+class FakeResponse:
+    def __init__(self, data, status_code=200):
+        self._data = data
+        self.status_code = status_code
+        self.text = str(data)
+
+    def json(self):
+        return self._data
+
+
+class FakeBase:
+    """Base.vn giả lập trong bộ nhớ: danh sách trả về ứng viên mới nhất trước."""
+
+    def __init__(self, count=5):
+        self.candidates = {}
+        self.messages = {}
+        self.failing_messages = set()
+        # Kích thước trang tối đa phía server (None = đúng num_per_page yêu cầu)
+        self.page_cap = None
+        self.list_pages = []
+        self.full_listings = 0
+        self.detail_calls = []
+        self.message_calls = []
+        for i in range(count):
+            self.add(i)
+
+    def add(self, index):
+        candidate_id = str(1000 + index)
+        self.candidates[candidate_id] = {
+            "id": candidate_id, "name": f"Ứng viên {index}", "opening_id": "9346",
+            "stage_id": "1", "time_apply": str(1700000000 + index * 60),
+        }
+        self.messages[candidate_id] = [{"id": f"{candidate_id}-1", "subject": "Chào", "content": "xin chào", "since": 1}]
+        return candidate_id
+
+    def ordered(self):
+        return sorted(self.candidates.values(), key=lambda c: int(c["time_apply"]), reverse=True)
+
+    def fetch_candidates(self, access_token, opening_id, page, num_per_page, stage):
+        self.list_pages.append(page)
+        items = self.ordered()
+        num_per_page = min(num_per_page, self.page_cap or num_per_page)
+        start = (page - 1) * num_per_page
+        return FakeResponse({"total": len(items), "candidates": items[start:start + num_per_page]})
+
+    def fetch_all_candidates(self, access_token, opening_id, stage, max_concurrency=None):
+        self.full_listings += 1
+        return {"candidates": self.ordered()}
+
+    def fetch_candidate_detail(self, access_token, candidate_id):
+        self.detail_calls.append(candidate_id)
+        return FakeResponse({"candidate": dict(self.candidates[candidate_id])})
+
+    def fetch_candidate_messages(self, access_token, candidate_id):
+        self.message_calls.append(candidate_id)
+        if candidate_id in self.failing_messages:
+            raise UpstreamError(500, "boom")
+        return FakeResponse({"messages": self.messages[candidate_id]})
+
+    def reset_calls(self):
+        self.list_pages, self.full_listings, self.detail_calls, self.message_calls = [], 0, [], []
+
+
+@pytest.fixture
+def base(monkeypatch):
+    fake = FakeBase()
+    for name in ("fetch_candidates", "fetch_all_candidates", "fetch_candidate_detail", "fetch_candidate_messages"):
+        monkeypatch.setattr(sync_job, name, getattr(fake, name))
+    return fake
+
+
+@pytest.fixture
+def store(tmp_path):
+    return CandidateStore(tmp_path / "store.db")
+
+
+def sync(store, **kwargs):
+    return sync_job.sync_candidates(store, "tok", "9346", stage="1", max_concurrency=2, **kwargs)
+
+
+def test_incremental_sync_only_reads_pages_newer_than_watermark(base, store, monkeypatch):
+    for i in range(5, 250):
+        base.add(i)
+    first = sync(store)
+    assert first["mode"] == "full"
+    assert base.full_listings == 1
+
+    base.reset_calls()
+    new_id = base.add(999)
+    second = sync(store)
+
+    assert second["mode"] == "incremental"
+    assert base.full_listings == 0
+    # Trang 1 (100 ứng viên mới nhất) đã chứa ứng viên cũ hơn watermark nên dừng ở đó
+    assert base.list_pages == [1]
+    assert base.detail_calls == [new_id]
+    assert store.get_candidate(new_id) is not None
+    assert second["new_since_last_sync"] == 1
+
+
+def test_incremental_sync_reads_every_page_when_server_caps_page_size(base, store):
+    sync(store)
+    base.reset_calls()
+    base.page_cap = 50
+    new_ids = [base.add(i) for i in range(100, 300)]
+
+    summary = sync(store)
+
+    assert summary["mode"] == "incremental"
+    # 205 ứng viên, 50 mỗi trang: 200 ứng viên mới nằm ở trang 1-4, trang 5 chứa ứng viên cũ
+    assert base.list_pages == [1, 2, 3, 4, 5]
+    assert summary["new_since_last_sync"] == 200
+    assert set(new_ids) <= store.candidate_ids("9346", "1")
+
+
+def test_unsorted_listing_falls_back_to_full_listing(base, store, monkeypatch):
+    sync(store)
+    base.reset_calls()
+    monkeypatch.setattr(base, "ordered", lambda: sorted(base.candidates.values(), key=lambda c: c["id"]))
+    summary = sync(store)
+    assert summary["mode"] == "full"
+    assert base.full_listings == 1
+
+
+def test_full_sync_is_forced_after_interval(base, store, monkeypatch):
+    sync(store)
+    base.reset_calls()
+    monkeypatch.setattr(sync_job, "SYNC_FULL_INTERVAL", 0)
+    assert sync(store)["mode"] == "full"
+
+
+def test_fingerprint_is_stored_only_after_messages_are_synced(base, store):
+    failing = "1002"
+    base.failing_messages.add(failing)
+    summary = sync(store)
+    assert summary["failed"] == 1
+    assert store.candidate_fingerprints([failing]) == {failing: ""}
+
+    base.failing_messages.clear()
+    base.reset_calls()
+    sync(store, full=False)
+    assert base.detail_calls == [failing]
+    assert base.message_calls == [failing]
+    assert store.candidate_fingerprints([failing])[failing] != ""
+
+
+def test_no_messages_run_does_not_hide_messages_from_later_runs(base, store):
+    sync(store, with_messages=False)
+    assert store.counts()["messages"] == 0
+
+    base.reset_calls()
+    sync(store)
+    assert base.detail_calls == []
+    assert sorted(base.message_calls) == sorted(base.candidates)
+    assert store.counts()["messages"] == len(base.candidates)
+
+
+def test_repeated_no_messages_runs_only_fetch_changed_details(base, store):
+    sync(store, with_messages=False)
+    base.reset_calls()
+    assert sync(store, with_messages=False)["changed"] == 0
+    assert base.detail_calls == []
+
+    base.candidates["1001"]["stage_name"] = "Phỏng vấn"
+    base.reset_calls()
+    summary = sync(store, with_messages=False)
+    assert summary["changed"] == 1
+    assert base.detail_calls == ["1001"]
+    assert base.message_calls == []
+
+
+def test_candidate_changed_during_no_messages_run_gets_messages_refreshed(base, store):
+    sync(store)
+    base.candidates["1001"]["stage_name"] = "Phỏng vấn"
+    base.messages["1001"].append({"id": "1001-2", "subject": "Mời phỏng vấn", "content": "hẹn lịch", "since": 2})
+    sync(store, with_messages=False)
+
+    base.reset_calls()
+    sync(store)
+    assert base.detail_calls == []
+    assert base.message_calls == ["1001"]
+    assert len(store.get_messages("1001")) == 2
+
+
+def test_new_messages_of_unchanged_candidates_are_picked_up(base, store, monkeypatch):
+    sync(store)
+    candidate_id = "1001"
+    base.messages[candidate_id].append({"id": f"{candidate_id}-2", "subject": "Mới", "content": "lịch phỏng vấn", "since": 2})
+
+    # Chưa quá hạn: ứng viên không đổi thì không tải lại gì
+    base.reset_calls()
+    sync(store)
+    assert base.message_calls == []
+
+    # Quá hạn SYNC_MESSAGES_MAX_AGE: tải lại tin nhắn, không tải lại chi tiết
+    monkeypatch.setattr(sync_job, "SYNC_MESSAGES_MAX_AGE", -1)
+    base.reset_calls()
+    summary = sync(store)
+    assert summary["messages_refreshed"] == len(base.candidates)
+    assert base.detail_calls == []
+    assert len(store.get_messages(candidate_id)) == 2
+
+
+def test_full_listing_prunes_candidates_removed_upstream(base, store):
+    sync(store)
+    removed = "1003"
+    del base.candidates[removed]
+
+    summary = sync(store, full=True)
+    assert summary["removed"] == 1
+    assert store.get_candidate(removed) is None
+    assert store.get_messages(removed) == []
+    hits = store.search("xin chào", per_candidate=False, limit=50)["results"]
+    assert hits
+    assert all(hit["candidate_id"] != removed for hit in hits)
+
+
+def test_incremental_listing_does_not_prune(base, store):
+    sync(store)
+    del base.candidates["1000"]
+    summary = sync(store)
+    assert summary["mode"] == "incremental"
+    assert summary["removed"] == 0
+    assert store.get_candidate("1000") is not None
@@ -0,0 +1,59 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import web_api
+from api_client import UpstreamError
+
+
+def _failing_pages(*args, **kwargs):
+    async def pages():
+        yield {"total": 3, "candidates": [{"id": 1, "name": "A"}]}
+        raise UpstreamError(500, "boom")
+    return pages()
+
+
+EXPORT_PARAMS = {"access_token": "tok", "opening_id": 9346, "stage": "1", "num_per_page": 1}
+
+
+def test_csv_export_aborts_when_a_later_page_fails(monkeypatch):
+    monkeypatch.setattr(web_api, "iter_candidate_pages", _failing_pages)
+    client = TestClient(web_api.app)
+    # Lỗi giữa chừng phải làm hỏng response (kết nối bị ngắt), không trả 200 với file bị cắt
+    with pytest.raises(UpstreamError):
+        client.post("/candidates/export", params={**EXPORT_PARAMS, "format": "csv"})
+
+
+def test_ndjson_export_ends_with_error_line_when_a_later_page_fails(monkeypatch):
+    monkeypatch.setattr(web_api, "iter_candidate_pages", _failing_pages)
+    client = TestClient(web_api.app)
+    response = client.post("/candidates/export", params={**EXPORT_PARAMS, "format": "ndjson"})
+    lines = response.text.strip().splitlines()
+    assert response.status_code == 200
+    assert len(lines) == 2
+    assert "error" in lines[-1]
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("1714521600", 1714521600),
+    ("2024-05-01", 1714521600),
+    ("2024-05-01T00:00:00", 1714521600),
+    ("2024-05-01T07:00:00+07:00", 1714521600),
+    ("2024-05-01T00:00:00Z", 1714521600),
+])
+def test_parse_time_normalises_to_utc(value, expected, monkeypatch):
+    # Kết quả không được phụ thuộc múi giờ của server
+    monkeypatch.setenv("TZ", "Asia/Ho_Chi_Minh")
+    import time
+    time.tzset()
+    try:
+        assert web_api._parse_time(value, "applied_from") == expected
+    finally:
+        monkeypatch.delenv("TZ")
+        time.tzset()
+
+
+def test_parse_time_rejects_invalid_value():
+    from fastapi import HTTPException
+    with pytest.raises(HTTPException) as exc:
+        web_api._parse_time("yesterday", "applied_from")
+    assert exc.value.status_code == 422
@@ -0,0 +1,19 @@
+# text_utils.py
+"""
+Xử lý văn bản dùng chung cho kho dữ liệu (chỉ mục tìm kiếm) và giao diện
+Streamlit (đoạn xem trước tin nhắn).
+"""
+
+import html
+import re
+
+_TAG_RE = re.compile(r"<(script|style)\b.*?</\1>|<[^>]+>", re.S | re.I)
+_SPACE_RE = re.compile(r"\s+")
+
+
+def html_to_text(value):
+    """Bỏ thẻ HTML và gộp khoảng trắng, dùng cho nội dung tin nhắn/chi tiết."""
+    if not value:
+        return ""
+    text = html.unescape(_TAG_RE.sub(" ", str(value)))
+    return _SPACE_RE.sub(" ", text).strip()
@@ -0,0 +1,184 @@
+# tracing.py
+"""
+Đo thời gian từng giai đoạn của một request (gọi Base.vn, giải mã JSON, xử lý
+dữ liệu, mã hóa phản hồi) mà không cần profiler.
+
+- ServerTimingMiddleware: mở một Trace cho mỗi request HTTP và trả về header
+  Server-Timing (xem được trong tab Network của trình duyệt), ví dụ
+  "upstream;dur=412.3, decode;dur=8.1, process;dur=2.4, serialize;dur=5.0, total;dur=431.2"
+- span(name, **attrs): context manager ghi một giai đoạn vào Trace hiện tại
+  (lưu trong contextvars nên đi theo cả các task con của asyncio.gather)
+- traced(name): decorator tương đương cho một hàm
+
+Cấu hình qua biến môi trường:
+- SERVER_TIMING=true|false (mặc định true): thêm header Server-Timing
+- TRACE_LOG=true|false (mặc định false): ghi mỗi request thành một dòng JSON
+  vào logger "trace" (route, status, thời gian và các span)
+- TRACE_OTEL=true|false (mặc định false): tạo thêm span OpenTelemetry nếu đã
+  cài opentelemetry-api (exporter do ứng dụng cấu hình)
+"""
+
+import contextvars
+import functools
+import inspect
+import json
+import logging
+import os
+import time
+
+try:
+    from opentelemetry import trace as otel_trace
+except ImportError:  # OpenTelemetry là tùy chọn
+    otel_trace = None
+
+
+def _env_flag(name, default):
+    return os.getenv(name, default).lower() in ("1", "true", "yes")
+
+
+SERVER_TIMING = _env_flag("SERVER_TIMING", "true")
+TRACE_LOG = _env_flag("TRACE_LOG", "false")
+TRACE_OTEL = _env_flag("TRACE_OTEL", "false") and otel_trace is not None
+
+logger = logging.getLogger("trace")
+_tracer = otel_trace.get_tracer("base_vn_proxy") if TRACE_OTEL else None
+
+_current = contextvars.ContextVar("current_trace", default=None)
+
+
+class Trace:
+    """Các span đã hoàn thành của một request."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.spans = []
+
+    def add(self, name, start, duration, attrs):
+        self.spans.append((name, start - self.start, duration, attrs))
+
+    def elapsed(self):
+        return time.perf_counter() - self.start
+
+    def summary(self):
+        """Gộp các span cùng tên: name -> (tổng thời gian, số lần)."""
+        totals = {}
+        for name, _, duration, _ in self.spans:
+            total, count = totals.get(name, (0.0, 0))
+            totals[name] = (total + duration, count + 1)
+        return totals
+
+    def server_timing(self):
+        parts = []
+        for name, (total, count) in self.summary().items():
+            entry = f"{name};dur={total * 1000:.1f}"
+            if count > 1:
+                entry += f';desc="{count} calls"'
+            parts.append(entry)
+        parts.append(f"total;dur={self.elapsed() * 1000:.1f}")
+        return ", ".join(parts)
+
+
+def current_trace():
+    return _current.get()
+
+
+class span:
+    """
+    with span("upstream", endpoint="candidate/list"): ...
+
+    Không làm gì (chi phí gần như bằng 0) khi không có Trace và OpenTelemetry bị tắt.
+    """
+
+    __slots__ = ("name", "attrs", "trace", "started", "otel")
+
+    def __init__(self, name, **attrs):
+        self.name = name
+        self.attrs = attrs
+        self.trace = None
+        self.otel = None
+
+    def __enter__(self):
+        self.trace = _current.get()
+        if _tracer is not None:
+            self.otel = _tracer.start_as_current_span(
+                self.name, attributes={k: str(v) for k, v in self.attrs.items()}
+            )
+            self.otel.__enter__()
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration = time.perf_counter() - self.started
+        if self.trace is not None:
+            self.trace.add(self.name, self.started, duration, self.attrs)
+        if self.otel is not None:
+            self.otel.__exit__(exc_type, exc, tb)
+        return False
+
+
+def traced(name):
+    """Decorator ghi thời gian chạy của hàm (thường hoặc async) thành span `name`."""
+    def decorator(fn):
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with span(name):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class ServerTimingMiddleware:
+    """ASGI middleware: mỗi request HTTP có một Trace; thêm header Server-Timing khi gửi phản hồi."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not (SERVER_TIMING or TRACE_LOG or TRACE_OTEL):
+            await self.app(scope, receive, send)
+            return
+
+        trace = Trace()
+        token = _current.set(trace)
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if SERVER_TIMING:
+                    # Với StreamingResponse, header chỉ gồm các span xong trước khi gửi byte đầu tiên
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", trace.server_timing().encode("latin-1")))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            if _tracer is not None:
+                with _tracer.start_as_current_span(f"{scope.get('method', '')} {scope.get('path', '')}"):
+                    await self.app(scope, receive, send_wrapper)
+            else:
+                await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            if TRACE_LOG:
+                route = scope.get("route")
+                logger.info(json.dumps({
+                    "method": scope.get("method"),
+                    "path": scope.get("path"),
+                    "route": getattr(route, "path", None),
+                    "status": status,
+                    "duration_ms": round(trace.elapsed() * 1000, 2),
+                    "spans": [
+                        {"name": name, "offset_ms": round(offset * 1000, 2),
+                         "duration_ms": round(duration * 1000, 2), **attrs}
+                        for name, offset, duration, attrs in trace.spans
+                    ],
+                }, ensure_ascii=False, default=str))
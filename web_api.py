@@ -1,17 +1,117 @@
-from typing import Optional
+from contextlib import asynccontextmanager
+from typing import List, Optional
+import csv
+import gzip
+import hashlib
+import io
 import os
-from fastapi import FastAPI, HTTPException, Query
-from fastapi.responses import HTMLResponse
-from pydantic import BaseModel
-from api_client import fetch_openings_list, fetch_opening, fetch_candidates
-from data_processor import process_candidate_data
-from api_client import fetch_candidate_detail, fetch_candidate_messages
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import HTMLResponse, Response, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel, Field
+from async_api_client import fetch_openings_list, fetch_opening, fetch_candidates
+from data_processor import process_candidate_records, extract_candidate_columns, CANDIDATE_COLUMNS
+from async_api_client import fetch_candidate_detail, fetch_candidate_messages, close_client
+from async_api_client import fetch_all_candidates, iter_candidate_pages, DEFAULT_MAX_CONCURRENCY
+from async_api_client import fetch_candidate_details_bulk, iter_candidate_messages_bulk, list_candidate_ids
+from api_client import UpstreamError
+from response_cache import response_cache
+from circuit_breaker import circuit_breakers
+import rate_limit
+import metrics
+from tracing import ServerTimingMiddleware
+from json_backend import FastJSONResponse, decode_response, dumps, loads
+from candidate_store import get_store, ORDER_BY, SEARCH_KINDS
 
-app = FastAPI(title="Base.vn Proxy API", version="0.1.0")
 
+@asynccontextmanager
+async def lifespan(app):
+    yield
+    # Đóng connection pool tới Base.vn khi server shutdown
+    await close_client()
 
-@app.get("/html", response_class=HTMLResponse)
-def read_root_html():
+
+def _cache_headers(resp):
+    """Mark responses served from an expired cache entry (stale-while-revalidate)."""
+    if getattr(resp, "stale", False):
+        return {"X-Cache": "stale", "Age": str(resp.age)}
+    return None
+
+
+# Cache-Control max-age (seconds) for the static documentation pages (/ and /html)
+DOCS_CACHE_MAX_AGE = int(os.getenv("DOCS_CACHE_MAX_AGE", "300"))
+
+
+def _accepts_gzip(accept_encoding):
+    """True if an Accept-Encoding header allows gzip (explicitly or via *) with a non-zero q."""
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        if coding.strip().lower() not in ("gzip", "*"):
+            continue
+        q = params.strip()
+        if q.lower().startswith("q="):
+            try:
+                return float(q[2:]) > 0
+            except ValueError:
+                return False
+        return True
+    return False
+
+
+class _StaticDocument:
+    """
+    A response body rendered once at import and served from memory, gzip-compressed
+    when the client accepts it, with ETag/Last-Modified/Cache-Control and 304 support.
+    """
+
+    def __init__(self, body, media_type, last_modified, max_age=DOCS_CACHE_MAX_AGE):
+        self.media_type = media_type
+        self.body = body
+        self.gzip_body = gzip.compress(body, compresslevel=9, mtime=0)
+        digest = hashlib.sha256(body).hexdigest()[:32]
+        # Each encoding is a different representation, so it gets its own strong ETag
+        self.etag = f'"{digest}"'
+        self.gzip_etag = f'"{digest}-gzip"'
+        # HTTP dates have 1 s resolution; compare at that precision
+        self.last_modified = last_modified.replace(microsecond=0)
+        self.headers = {
+            "Cache-Control": f"public, max-age={max_age}",
+            "Last-Modified": format_datetime(self.last_modified, usegmt=True),
+            "Vary": "Accept-Encoding",
+        }
+
+    def _not_modified(self, request):
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+            return "*" in tags or self.etag in tags or self.gzip_etag in tags
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since:
+            try:
+                return self.last_modified <= parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def response(self, request):
+        use_gzip = _accepts_gzip(request.headers.get("accept-encoding", ""))
+        headers = dict(self.headers, ETag=self.gzip_etag if use_gzip else self.etag)
+        if self._not_modified(request):
+            return Response(status_code=304, headers=headers)
+        if use_gzip:
+            headers["Content-Encoding"] = "gzip"
+            return Response(content=self.gzip_body, media_type=self.media_type, headers=headers)
+        return Response(content=self.body, media_type=self.media_type, headers=headers)
+
+
+app = FastAPI(title="Base.vn Proxy API", version="0.1.0", lifespan=lifespan, default_response_class=FastJSONResponse)
+app.add_middleware(metrics.MetricsMiddleware)
+app.add_middleware(ServerTimingMiddleware)
+
+
+def _build_root_html():
     """HTML landing page with complete API documentation."""
     html_content = """
     <!DOCTYPE html>
@@ -247,11 +347,59 @@ def read_root_html():
                         </div>
                         <div class="description">Lấy danh sách ứng viên với dữ liệu đã được xử lý</div>
                         <div class="params">
-                            <strong>Parameters:</strong> access_token, opening_id, page, num_per_page, stage
+                            <strong>Parameters:</strong> access_token, opening_id, page, num_per_page, stage, include_raw, fields
                         </div>
                         <div class="example">curl -X POST 'http://localhost:8000/candidates?access_token=token&opening_id=9346&page=1&num_per_page=50&stage=75440'</div>
                     </div>
                     
+                    <div class="endpoint">
+                        <div>
+                            <span class="method">POST</span>
+                            <span class="path">/candidates/all</span>
+                        </div>
+                        <div class="description">Lấy toàn bộ ứng viên của opening/stage (tải song song mọi trang và gộp lại)</div>
+                        <div class="params">
+                            <strong>Parameters:</strong> access_token, opening_id, stage, num_per_page, max_concurrency, include_raw, fields
+                        </div>
+                        <div class="example">curl -X POST 'http://localhost:8000/candidates/all?access_token=token&opening_id=9346&stage=75440&num_per_page=100&max_concurrency=8'</div>
+                    </div>
+                    
+                    <div class="endpoint">
+                        <div>
+                            <span class="method">POST</span>
+                            <span class="path">/candidates/export</span>
+                        </div>
+                        <div class="description">Xuất toàn bộ ứng viên dạng NDJSON hoặc CSV (stream, trả dữ liệu ngay khi các trang sau còn đang tải)</div>
+                        <div class="params">
+                            <strong>Parameters:</strong> access_token, opening_id, stage, format (ndjson|csv), num_per_page, max_concurrency
+                        </div>
+                        <div class="example">curl -X POST 'http://localhost:8000/candidates/export?access_token=token&opening_id=9346&stage=75440&format=csv' -o candidates.csv</div>
+                    </div>
+                    
+                    <div class="endpoint">
+                        <div>
+                            <span class="method">POST</span>
+                            <span class="path">/candidates/details</span>
+                        </div>
+                        <div class="description">Lấy chi tiết nhiều ứng viên song song, trả kết quả (hoặc lỗi) cho từng ID</div>
+                        <div class="params">
+                            <strong>Parameters:</strong> access_token, max_concurrency, body JSON {"candidate_ids": [...]}
+                        </div>
+                        <div class="example">curl -X POST 'http://localhost:8000/candidates/details?access_token=token' -H 'Content-Type: application/json' -d '{"candidate_ids": [518156, 510943]}'</div>
+                    </div>
+                    
+                    <div class="endpoint">
+                        <div>
+                            <span class="method">POST</span>
+                            <span class="path">/candidates/messages</span>
+                        </div>
+                        <div class="description">Lấy tin nhắn của nhiều ứng viên song song (theo danh sách ID hoặc toàn bộ opening/stage), stream NDJSON khi từng kết quả hoàn thành</div>
+                        <div class="params">
+                            <strong>Parameters:</strong> access_token, opening_id, stage, max_concurrency, body JSON {"candidate_ids": [...]} (tùy chọn)
+                        </div>
+                        <div class="example">curl -X POST 'http://localhost:8000/candidates/messages?access_token=token&opening_id=9346&stage=75440'</div>
+                    </div>
+                    
                     <div class="endpoint">
                         <div>
                             <span class="method">POST</span>
@@ -278,6 +426,87 @@ def read_root_html():
                 </div>
             </div>
 
+            <div class="endpoints">
+                <h2>💾 Dữ liệu cục bộ (sau khi chạy sync_job.py)</h2>
+
+                <div class="endpoint-group">
+                    <div class="endpoint">
+                        <div>
+                            <span class="method">GET</span>
+                            <span class="path">/local/candidates</span>
+                        </div>
+                        <div class="description">Lọc ứng viên trong SQLite cục bộ (có index), không gọi Base.vn</div>
+                        <div class="params">
+                            <strong>Parameters:</strong> opening_id, stage, source, email, email_domain, applied_from, applied_to, order_by, limit, offset, include_raw
+                        </div>
+                        <div class="example">curl 'http://localhost:8000/local/candidates?opening_id=9346&email_domain=gmail.com&applied_from=2024-01-01'</div>
+                    </div>
+
+                    <div class="endpoint">
+                        <div>
+                            <span class="method">GET</span>
+                            <span class="path">/local/candidates/{candidate_id}</span>
+                        </div>
+                        <div class="description">Ứng viên đã đồng bộ kèm chi tiết và tin nhắn</div>
+                        <div class="example">curl 'http://localhost:8000/local/candidates/518156'</div>
+                    </div>
+
+                    <div class="endpoint">
+                        <div>
+                            <span class="method">GET</span>
+                            <span class="path">/local/search</span>
+                        </div>
+                        <div class="description">Tìm kiếm full-text trong hồ sơ, chi tiết và tin nhắn của ứng viên đã đồng bộ (xếp hạng bm25, kèm đoạn trích)</div>
+                        <div class="params">
+                            <strong>Parameters:</strong> q, opening_id, kind (profile|message), per_candidate, limit, offset
+                        </div>
+                        <div class="example">curl 'http://localhost:8000/local/search?q=kubernetes'</div>
+                    </div>
+
+                    <div class="endpoint">
+                        <div>
+                            <span class="method">GET</span>
+                            <span class="path">/local/openings</span>
+                        </div>
+                        <div class="description">Danh sách vị trí tuyển dụng đã đồng bộ</div>
+                        <div class="example">curl 'http://localhost:8000/local/openings'</div>
+                    </div>
+                </div>
+            </div>
+
+            <div class="endpoints">
+                <h2>⚙️ Vận hành</h2>
+
+                <div class="endpoint-group">
+                    <div class="endpoint">
+                        <div>
+                            <span class="method">GET</span>
+                            <span class="path">/cache/stats</span>
+                        </div>
+                        <div class="description">Thống kê cache phản hồi từ Base.vn (hit/miss, kích thước, TTL theo endpoint)</div>
+                        <div class="example">curl 'http://localhost:8000/cache/stats'</div>
+                    </div>
+
+                    <div class="endpoint">
+                        <div>
+                            <span class="method">GET</span>
+                            <span class="path">/upstream/stats</span>
+                        </div>
+                        <div class="description">Trạng thái circuit breaker theo endpoint Base.vn, tốc độ giới hạn hiện tại và số lần thử lại</div>
+                        <div class="example">curl 'http://localhost:8000/upstream/stats'</div>
+                    </div>
+
+                    <div class="endpoint">
+                        <div>
+                            <span class="method">GET</span>
+                            <span class="path">/metrics</span>
+                        </div>
+                        <div class="description">Metrics dạng Prometheus: số request và độ trễ theo route, độ trễ/mã trạng thái Base.vn theo endpoint, thời gian xử lý dữ liệu, cache và connection pool</div>
+                        <div class="example">curl 'http://localhost:8000/metrics'</div>
+                    </div>
+                </div>
+            </div>
+
             <div class="docs-links">
                 <h2>📚 Tài liệu API</h2>
                 <a href="/docs" target="_blank">Interactive API Docs (Swagger UI)</a>
@@ -292,11 +521,10 @@ def read_root_html():
     </body>
     </html>
     """
-    return HTMLResponse(content=html_content)
+    return html_content
 
 
-@app.get("/")
-def read_root():
+def _build_root_info():
     """Root endpoint with comprehensive API information and examples."""
     return {
         "message": "Base.vn Proxy API - Complete API Wrapper",
@@ -328,9 +556,37 @@ def read_root():
                     "method": "POST",
                     "path": "/candidates",
                     "description": "Get list of candidates with processed data",
-                    "parameters": ["access_token", "opening_id", "page", "num_per_page", "stage"],
+                    "parameters": ["access_token", "opening_id", "page", "num_per_page", "stage", "include_raw", "fields"],
                     "example": "curl -X POST 'http://localhost:8000/candidates?access_token=token&opening_id=9346&page=1&num_per_page=50&stage=75440'"
                 },
+                "list_all": {
+                    "method": "POST",
+                    "path": "/candidates/all",
+                    "description": "Get all pages of candidates for an opening/stage, fetched concurrently and merged",
+                    "parameters": ["access_token", "opening_id", "stage", "num_per_page", "max_concurrency", "include_raw", "fields"],
+                    "example": "curl -X POST 'http://localhost:8000/candidates/all?access_token=token&opening_id=9346&stage=75440&num_per_page=100&max_concurrency=8'"
+                },
+                "export": {
+                    "method": "POST",
+                    "path": "/candidates/export",
+                    "description": "Stream all candidates of an opening/stage as NDJSON or CSV",
+                    "parameters": ["access_token", "opening_id", "stage", "format", "num_per_page", "max_concurrency"],
+                    "example": "curl -X POST 'http://localhost:8000/candidates/export?access_token=token&opening_id=9346&stage=75440&format=csv' -o candidates.csv"
+                },
+                "details_bulk": {
+                    "method": "POST",
+                    "path": "/candidates/details",
+                    "description": "Get details of many candidates concurrently, with a result or error per ID",
+                    "parameters": ["access_token", "max_concurrency", "body: {\"candidate_ids\": [...]}"],
+                    "example": "curl -X POST 'http://localhost:8000/candidates/details?access_token=token&max_concurrency=8' -H 'Content-Type: application/json' -d '{\"candidate_ids\": [518156, 510943]}'"
+                },
+                "messages_bulk": {
+                    "method": "POST",
+                    "path": "/candidates/messages",
+                    "description": "Stream message histories (NDJSON) for many candidates, given by ID or by opening/stage",
+                    "parameters": ["access_token", "opening_id", "stage", "max_concurrency", "body: {\"candidate_ids\": [...]} (optional)"],
+                    "example": "curl -X POST 'http://localhost:8000/candidates/messages?access_token=token&opening_id=9346&stage=75440'"
+                },
                 "get": {
                     "method": "POST",
                     "path": "/candidate/{candidate_id}",
@@ -345,6 +601,59 @@ def read_root():
                     "parameters": ["access_token", "candidate_id"],
                     "example": "curl -X POST 'http://localhost:8000/candidate/510943/messages?access_token=token'"
                 }
+            },
+            "local": {
+                "candidates": {
+                    "method": "GET",
+                    "path": "/local/candidates",
+                    "description": "Filter candidates in the local SQLite store (indexed, no upstream call)",
+                    "parameters": ["opening_id", "stage", "source", "email", "email_domain", "applied_from", "applied_to", "order_by", "limit", "offset", "include_raw"],
+                    "example": "curl 'http://localhost:8000/local/candidates?opening_id=9346&email_domain=gmail.com&applied_from=2024-01-01'"
+                },
+                "get": {
+                    "method": "GET",
+                    "path": "/local/candidates/{candidate_id}",
+                    "description": "Synced candidate with stored detail and messages",
+                    "parameters": ["candidate_id"],
+                    "example": "curl 'http://localhost:8000/local/candidates/518156'"
+                },
+                "search": {
+                    "method": "GET",
+                    "path": "/local/search",
+                    "description": "Full-text search over synced profiles, details and messages (bm25 ranking, snippets)",
+                    "parameters": ["q", "opening_id", "kind", "per_candidate", "limit", "offset"],
+                    "example": "curl 'http://localhost:8000/local/search?q=kubernetes'"
+                },
+                "openings": {
+                    "method": "GET",
+                    "path": "/local/openings",
+                    "description": "Openings stored by the last sync",
+                    "parameters": [],
+                    "example": "curl 'http://localhost:8000/local/openings'"
+                }
+            },
+            "cache": {
+                "stats": {
+                    "method": "GET",
+                    "path": "/cache/stats",
+                    "description": "Upstream response cache statistics (hits, misses, size, TTL per endpoint)",
+                    "parameters": [],
+                    "example": "curl 'http://localhost:8000/cache/stats'"
+                },
+                "upstream": {
+                    "method": "GET",
+                    "path": "/upstream/stats",
+                    "description": "Circuit breaker state per Base.vn endpoint, adaptive rate limit and retry counters",
+                    "parameters": [],
+                    "example": "curl 'http://localhost:8000/upstream/stats'"
+                },
+                "metrics": {
+                    "method": "GET",
+                    "path": "/metrics",
+                    "description": "Prometheus text metrics: per-route requests and latency, Base.vn latency and status per endpoint, processing time, cache and pool state",
+                    "parameters": [],
+                    "example": "curl 'http://localhost:8000/metrics'"
+                }
             }
         },
         "features": [
@@ -364,40 +673,88 @@ class OpeningsListParams(BaseModel):
     order_by: Optional[str] = "starred"
 
 
+# Both documentation pages are static: render, encode and compress them once at import.
+# Last-Modified is this file's mtime so every worker process sends the same validators.
+_DOCS_LAST_MODIFIED = datetime.fromtimestamp(os.path.getmtime(__file__), tz=timezone.utc)
+_ROOT_HTML = _StaticDocument(_build_root_html().encode("utf-8"), "text/html; charset=utf-8", _DOCS_LAST_MODIFIED)
+_ROOT_INFO = _StaticDocument(dumps(_build_root_info()), "application/json", _DOCS_LAST_MODIFIED)
+
+
+@app.get("/html", response_class=HTMLResponse)
+def read_root_html(request: Request):
+    """HTML landing page with complete API documentation (precomputed, cacheable, gzip)."""
+    return _ROOT_HTML.response(request)
+
+
+@app.get("/")
+def read_root(request: Request):
+    """Root endpoint with comprehensive API information and examples (precomputed, cacheable, gzip)."""
+    return _ROOT_INFO.response(request)
+
+
 @app.post("/openings")
-def openings_list(access_token: str = Query(...), page: int = Query(1), num_per_page: int = Query(50), order_by: str = Query("starred")):
+async def openings_list(access_token: str = Query(...), page: int = Query(1), num_per_page: int = Query(50), order_by: str = Query("starred")):
     """Proxy to Base.vn /opening/list endpoint. Returns JSON from upstream."""
     try:
-        resp = fetch_openings_list(access_token, page=page, num_per_page=num_per_page, order_by=order_by)
+        resp = await fetch_openings_list(access_token, page=page, num_per_page=num_per_page, order_by=order_by)
     except ConnectionError as e:
         raise HTTPException(status_code=502, detail=str(e))
 
     try:
-        return resp.json()
+        return FastJSONResponse(decode_response(resp), headers=_cache_headers(resp))
     except Exception:
         # return raw text if not JSON
         return {"status_code": resp.status_code, "text": resp.text}
 
 
 @app.post("/opening/{opening_id}")
-def opening_get(opening_id: int, access_token: str = Query(...)):
+async def opening_get(opening_id: int, access_token: str = Query(...)):
     """Proxy to Base.vn /opening/get endpoint."""
     try:
-        resp = fetch_opening(access_token, opening_id)
+        resp = await fetch_opening(access_token, opening_id)
     except ConnectionError as e:
         raise HTTPException(status_code=502, detail=str(e))
 
     try:
-        return resp.json()
+        return FastJSONResponse(decode_response(resp), headers=_cache_headers(resp))
     except Exception:
         return {"status_code": resp.status_code, "text": resp.text}
 
 
+def _project_raw(json_data, fields):
+    """Copy of the upstream JSON where each candidate keeps only the requested fields."""
+    wanted = [f.strip() for f in fields.split(",") if f.strip()]
+    raw = dict(json_data)
+    raw["candidates"] = [
+        {k: c[k] for k in wanted if k in c}
+        for c in json_data.get("candidates") or []
+    ]
+    return raw
+
+
+def _candidates_payload(json_data, include_raw=True, fields=None):
+    """Build the /candidates response body: processed records plus (optionally projected) raw upstream JSON."""
+    processed = process_candidate_records(json_data)
+
+    payload = {
+        "metrics": processed["metrics"],
+        "count_candidates": processed["count_candidates"],
+        "candidates_table": processed["records"],
+    }
+    if include_raw:
+        payload["raw"] = _project_raw(json_data, fields) if fields else json_data
+    return payload
+
+
+INCLUDE_RAW_QUERY = Query(True, description="Include the upstream JSON under `raw`; set to false for lighter responses")
+FIELDS_QUERY = Query(None, description="Comma-separated candidate fields to keep in `raw.candidates`, e.g. `id,name,email`")
+
+
 @app.post("/candidates")
-def candidates(access_token: str = Query(...), opening_id: int = Query(...), page: int = Query(1), num_per_page: int = Query(50), stage: Optional[str] = Query(None)):
+async def candidates(access_token: str = Query(...), opening_id: int = Query(...), page: int = Query(1), num_per_page: int = Query(50), stage: Optional[str] = Query(None), include_raw: bool = INCLUDE_RAW_QUERY, fields: Optional[str] = FIELDS_QUERY):
     """Get candidate list for an opening and return processed DataFrame summary and raw JSON."""
     try:
-        resp = fetch_candidates(access_token, opening_id, page, num_per_page, stage)
+        resp = await fetch_candidates(access_token, opening_id, page, num_per_page, stage)
     except ConnectionError as e:
         raise HTTPException(status_code=502, detail=str(e))
 
@@ -405,43 +762,278 @@ def candidates(access_token: str = Query(...), opening_id: int = Query(...), pag
         raise HTTPException(status_code=resp.status_code, detail=resp.text)
 
     try:
-        json_data = resp.json()
+        json_data = decode_response(resp)
     except Exception:
         raise HTTPException(status_code=500, detail="Upstream returned non-JSON")
 
-    processed = process_candidate_data(json_data)
+    return FastJSONResponse(_candidates_payload(json_data, include_raw=include_raw, fields=fields))
 
-    return {
-        "metrics": processed.get("metrics"),
-        "count_candidates": processed.get("count_candidates"),
-        "candidates_table": processed.get("dataframe").to_dict(orient="records") if not processed.get("dataframe").empty else [],
-        "raw": json_data
-    }
+
+@app.post("/candidates/all")
+async def candidates_all(access_token: str = Query(...), opening_id: int = Query(...), stage: Optional[str] = Query(None), num_per_page: int = Query(100, ge=1, le=100), max_concurrency: int = Query(DEFAULT_MAX_CONCURRENCY, ge=1, le=50), include_raw: bool = INCLUDE_RAW_QUERY, fields: Optional[str] = FIELDS_QUERY):
+    """Fetch every page of candidates for an opening/stage concurrently and return one merged, processed result."""
+    try:
+        json_data = await fetch_all_candidates(access_token, opening_id, stage, num_per_page=num_per_page, max_concurrency=max_concurrency)
+    except ConnectionError as e:
+        raise HTTPException(status_code=502, detail=str(e))
+    except UpstreamError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.text)
+    except ValueError:
+        raise HTTPException(status_code=500, detail="Upstream returned non-JSON")
+
+    return FastJSONResponse(_candidates_payload(json_data, include_raw=include_raw, fields=fields))
+
+
+def _ndjson_rows(page_data):
+    return b"".join(dumps(record) + b"\n" for record in process_candidate_records(page_data)["records"])
+
+
+def _csv_rows(page_data, header=False):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(CANDIDATE_COLUMNS)
+    candidates_list = page_data.get("candidates") or []
+    if candidates_list:
+        writer.writerows(zip(*extract_candidate_columns(candidates_list).values()))
+    return buffer.getvalue().encode("utf-8")
+
+
+@app.post("/candidates/export")
+async def candidates_export(access_token: str = Query(...), opening_id: int = Query(...), stage: Optional[str] = Query(None), format: str = Query("ndjson", pattern="^(ndjson|csv)$"), num_per_page: int = Query(100, ge=1, le=100), max_concurrency: int = Query(DEFAULT_MAX_CONCURRENCY, ge=1, le=50)):
+    """Stream every candidate of an opening/stage as NDJSON or CSV while later pages are still being fetched."""
+    pages = iter_candidate_pages(access_token, opening_id, stage, num_per_page=num_per_page, max_concurrency=max_concurrency)
+
+    # Fetch page 1 before streaming so upstream errors still map to a proper status code
+    try:
+        first_page = await anext(pages)
+    except ConnectionError as e:
+        raise HTTPException(status_code=502, detail=str(e))
+    except UpstreamError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.text)
+    except ValueError:
+        raise HTTPException(status_code=500, detail="Upstream returned non-JSON")
+
+    async def stream():
+        try:
+            if format == "csv":
+                # BOM so Excel opens the Vietnamese headers as UTF-8
+                yield "\ufeff".encode("utf-8") + _csv_rows(first_page, header=True)
+                async for page_data in pages:
+                    yield _csv_rows(page_data)
+            else:
+                yield _ndjson_rows(first_page)
+                async for page_data in pages:
+                    yield _ndjson_rows(page_data)
+        except (ConnectionError, UpstreamError, ValueError) as e:
+            # Headers are already sent: report the failure in-band for NDJSON and stop
+            if format == "ndjson":
+                yield dumps({"error": str(e)}) + b"\n"
+            else:
+                # CSV has no room for an error row, so abort the response instead: the chunked
+                # body never gets its terminating chunk and clients see an incomplete transfer
+                # rather than a truncated file that looks complete
+                raise
+        finally:
+            await pages.aclose()
+
+    filename = f"candidates_{opening_id}_{stage or 'all'}.{format}"
+    media_type = "text/csv; charset=utf-8" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        stream(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+class CandidateIdsBody(BaseModel):
+    candidate_ids: List[int] = Field(..., min_length=1, max_length=5000, description="Candidate IDs to fetch")
+
+
+@app.post("/candidates/details")
+async def candidates_details(body: CandidateIdsBody, access_token: str = Query(...), max_concurrency: int = Query(DEFAULT_MAX_CONCURRENCY, ge=1, le=50)):
+    """Fetch details for many candidates concurrently; returns one result (data or error) per ID."""
+    results = await fetch_candidate_details_bulk(access_token, body.candidate_ids, max_concurrency=max_concurrency)
+    succeeded = sum(1 for r in results if r["ok"])
+    return FastJSONResponse({
+        "count": len(results),
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+        "results": results
+    })
+
+
+@app.post("/candidates/messages")
+async def candidates_messages(access_token: str = Query(...), body: Optional[CandidateIdsBody] = None, opening_id: Optional[int] = Query(None), stage: Optional[str] = Query(None), max_concurrency: int = Query(DEFAULT_MAX_CONCURRENCY, ge=1, le=50)):
+    """Fetch message histories for many candidates (given IDs, or all candidates of an opening/stage) and stream NDJSON results as they complete."""
+    if body is not None:
+        candidate_ids = body.candidate_ids
+    elif opening_id is not None:
+        try:
+            candidate_ids = await list_candidate_ids(access_token, opening_id, stage, max_concurrency=max_concurrency)
+        except ConnectionError as e:
+            raise HTTPException(status_code=502, detail=str(e))
+        except UpstreamError as e:
+            raise HTTPException(status_code=e.status_code, detail=e.text)
+        except ValueError:
+            raise HTTPException(status_code=500, detail="Upstream returned non-JSON")
+    else:
+        raise HTTPException(status_code=422, detail="Provide candidate_ids in the body or opening_id (and optionally stage)")
+
+    async def stream():
+        results = iter_candidate_messages_bulk(access_token, candidate_ids, max_concurrency=max_concurrency)
+        try:
+            async for result in results:
+                yield dumps(result) + b"\n"
+        finally:
+            await results.aclose()
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
 
 
 @app.post("/candidate/{candidate_id}")
-def candidate_get(candidate_id: int, access_token: str = Query(...)):
+async def candidate_get(candidate_id: int, access_token: str = Query(...)):
     """Proxy to /candidate/get"""
     try:
-        resp = fetch_candidate_detail(access_token, candidate_id)
+        resp = await fetch_candidate_detail(access_token, candidate_id)
     except ConnectionError as e:
         raise HTTPException(status_code=502, detail=str(e))
 
     try:
-        return resp.json()
+        return FastJSONResponse(decode_response(resp), headers=_cache_headers(resp))
     except Exception:
         return {"status_code": resp.status_code, "text": resp.text}
 
 
 @app.post("/candidate/{candidate_id}/messages")
-def candidate_messages(candidate_id: int, access_token: str = Query(...)):
+async def candidate_messages(candidate_id: int, access_token: str = Query(...)):
     """Proxy to /candidate/messages"""
     try:
-        resp = fetch_candidate_messages(access_token, candidate_id)
+        resp = await fetch_candidate_messages(access_token, candidate_id)
     except ConnectionError as e:
         raise HTTPException(status_code=502, detail=str(e))
 
     try:
-        return resp.json()
+        return FastJSONResponse(decode_response(resp), headers=_cache_headers(resp))
     except Exception:
         return {"status_code": resp.status_code, "text": resp.text}
+
+
+@app.get("/cache/stats")
+async def cache_stats():
+    """Hit/miss counters, size and per-endpoint TTLs of the upstream response cache."""
+    return response_cache.stats()
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics_endpoint():
+    """Prometheus text metrics: per-route requests/latency, Base.vn latency/status, processing time, cache/pool state."""
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+
+@app.get("/upstream/stats")
+async def upstream_stats():
+    """Circuit breaker state per Base.vn endpoint, adaptive rate limiter and retry counters."""
+    return {
+        "circuit_breakers": circuit_breakers.stats(),
+        "rate_limit": rate_limit.rate_limiter.stats(),
+        "retry": rate_limit.retry_policy.stats(),
+    }
+
+
+def _parse_time(value, name):
+    """
+    Accept a unix timestamp or an ISO date/datetime (e.g. 2024-05-01) and return epoch seconds.
+    Values without a UTC offset are taken as UTC, so results don't depend on the server's timezone.
+    """
+    if value is None:
+        return None
+    if value.isdigit():
+        return int(value)
+    try:
+        parsed = datetime.fromisoformat(value)
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        return int(parsed.astimezone(timezone.utc).timestamp())
+    except ValueError:
+        raise HTTPException(status_code=422, detail=f"{name} must be a unix timestamp or ISO date")
+
+
+@app.get("/local/candidates")
+async def local_candidates(
+    opening_id: Optional[str] = Query(None),
+    stage: Optional[str] = Query(None, description="Stage ID"),
+    source: Optional[str] = Query(None),
+    email: Optional[str] = Query(None, description="Exact email, case-insensitive"),
+    email_domain: Optional[str] = Query(None, description="e.g. gmail.com"),
+    applied_from: Optional[str] = Query(None, description="Unix timestamp or ISO date (inclusive)"),
+    applied_to: Optional[str] = Query(None, description="Unix timestamp or ISO date (exclusive)"),
+    order_by: str = Query("time_apply_desc", pattern="^(" + "|".join(ORDER_BY) + ")$"),
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    include_raw: bool = Query(False),
+):
+    """Filter candidates from the local synced store (see sync_job.py) without calling Base.vn."""
+    result = await run_in_threadpool(
+        get_store().query_candidates,
+        opening_id=opening_id,
+        stage_id=stage,
+        source=source,
+        email=email,
+        email_domain=email_domain,
+        applied_from=_parse_time(applied_from, "applied_from"),
+        applied_to=_parse_time(applied_to, "applied_to"),
+        order_by=order_by,
+        limit=limit,
+        offset=offset,
+        include_raw=include_raw,
+    )
+    result.update({"limit": limit, "offset": offset})
+    return FastJSONResponse(result)
+
+
+@app.get("/local/candidates/{candidate_id}")
+async def local_candidate_get(candidate_id: str):
+    """Synced candidate with its stored detail and messages."""
+    store = get_store()
+    candidate = await run_in_threadpool(store.get_candidate, candidate_id)
+    if candidate is None:
+        raise HTTPException(status_code=404, detail="Candidate not found in local store")
+    candidate.pop("fingerprint", None)
+    candidate["raw"] = loads(candidate["raw"])
+    candidate["detail"] = loads(candidate["detail"]) if candidate["detail"] else None
+    candidate["messages"] = await run_in_threadpool(store.get_messages, candidate_id)
+    return FastJSONResponse(candidate)
+
+
+@app.get("/local/search")
+async def local_search(
+    q: str = Query(..., min_length=1, description="Words to find (all must match); end a word with * for prefix search"),
+    opening_id: Optional[str] = Query(None),
+    kind: Optional[str] = Query(None, pattern="^(" + "|".join(SEARCH_KINDS) + ")$", description="profile or message"),
+    per_candidate: bool = Query(True, description="Keep only the best hit of each candidate"),
+    limit: int = Query(20, ge=1, le=200),
+    offset: int = Query(0, ge=0),
+):
+    """Full-text search over synced candidate profiles/details and message bodies, ranked by bm25 with snippets."""
+    try:
+        result = await run_in_threadpool(
+            get_store().search,
+            q,
+            opening_id=opening_id,
+            kind=kind,
+            per_candidate=per_candidate,
+            limit=limit,
+            offset=offset,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    result.update({"query": q, "limit": limit, "offset": offset})
+    return FastJSONResponse(result)
+
+
+@app.get("/local/openings")
+async def local_openings():
+    """Openings stored by the last sync."""
+    openings = await run_in_threadpool(get_store().list_openings)
+    return FastJSONResponse({"count": len(openings), "openings": openings})